@@ -1,107 +1,362 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+
 import numpy as np
 from simulator import FlightSimulator
+from src.utils.events import EventSink, TRACE_OFF
+from src.utils.profiling import add_profile_arguments, default_profiler, profiler_from_args
+from src.utils.shared_data import attach_loader, share_loader
+from src.utils.statistics import RunningStats, QuantileSketch
+
+# Simulator owned by each worker process, built once by _init_worker
+_worker_simulator = None
+
+
+def _init_worker(data_path, shared=None):
+    """Build the worker's simulator once per process.
+    
+    With a shared descriptor the data loader attaches to the parent's
+    arrays in shared memory instead of loading the data again.
+    """
+    global _worker_simulator
+    events = EventSink(TRACE_OFF)
+    data_loader = attach_loader(shared, events=events) if shared is not None else None
+    _worker_simulator = FlightSimulator(events=events, data_path=data_path, data_loader=data_loader)
+
+
+class AnalysisAccumulator:
+    """Streaming summary of many simulations in O(days) memory.
+    
+    Keeps Welford running statistics per metric and per day, a quantile
+    sketch of revenue for the value-at-risk, and the best run seen.
+    Accumulators from separate chunks or workers combine with merge.
+    """
+    
+    METRICS = ('revenue', 'unsold_seats', 'avg_price', 'load_factor', 'opportunity_cost')
+    
+    def __init__(self, days):
+        self.metrics = {name: RunningStats() for name in self.METRICS}
+        self.daily_prices = RunningStats(days)
+        self.daily_sales = RunningStats(days)
+        self.revenue_sketch = QuantileSketch(relative_accuracy=0.0001)
+        self.best = None
+    
+    @property
+    def count(self):
+        return int(self.metrics['revenue'].count)
+    
+    def add_batch(self, chunk):
+        """Fold a chunk of simulation metrics (arrays from _simulate_chunk) into the summary."""
+        for name in self.METRICS:
+            self.metrics[name].update_batch(chunk[name])
+        self.revenue_sketch.update_batch(chunk['revenue'])
+        self.daily_prices.update_batch(chunk['daily_prices'])
+        self.daily_sales.update_batch(chunk['daily_sales'])
+        
+        best = int(np.argmax(chunk['revenue']))
+        if self.best is None or chunk['revenue'][best] > self.best['revenue']:
+            self.best = {name: float(chunk[name][best]) for name in self.METRICS}
+    
+    def merge(self, other):
+        """Fold another accumulator into this one."""
+        for name in self.METRICS:
+            self.metrics[name].merge(other.metrics[name])
+        self.daily_prices.merge(other.daily_prices)
+        self.daily_sales.merge(other.daily_sales)
+        self.revenue_sketch.merge(other.revenue_sketch)
+        if other.best is not None and (self.best is None or other.best['revenue'] > self.best['revenue']):
+            self.best = other.best
+        return self
+    
+    def to_arrays(self):
+        """Export the full state as named arrays; from_arrays restores it bit for bit."""
+        arrays = {}
+        for name in self.METRICS:
+            arrays.update(self.metrics[name].to_arrays(f"{name}."))
+        arrays.update(self.daily_prices.to_arrays('daily_prices.'))
+        arrays.update(self.daily_sales.to_arrays('daily_sales.'))
+        arrays.update(self.revenue_sketch.to_arrays('revenue_sketch.'))
+        if self.best is not None:
+            arrays['best'] = np.array([self.best[name] for name in self.METRICS])
+        return arrays
+    
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Restore an accumulator exported with to_arrays."""
+        accumulator = cls(len(arrays['daily_prices.count']))
+        for name in cls.METRICS:
+            accumulator.metrics[name] = RunningStats.from_arrays(arrays, f"{name}.")
+        accumulator.daily_prices = RunningStats.from_arrays(arrays, 'daily_prices.')
+        accumulator.daily_sales = RunningStats.from_arrays(arrays, 'daily_sales.')
+        accumulator.revenue_sketch = QuantileSketch.from_arrays(arrays, 'revenue_sketch.')
+        if 'best' in arrays:
+            accumulator.best = dict(zip(cls.METRICS, arrays['best'].tolist()))
+        return accumulator
+
+
+def _simulate_chunk(entropy, start, stop, simulator=None):
+    """Run simulations start..stop-1 and return their AnalysisAccumulator.
+    
+    Simulation i draws from its own RNG stream derived from (entropy, i),
+    so the numbers do not depend on which process runs the chunk. Per-run
+    metrics are only held for the current chunk.
+    """
+    simulator = simulator or _worker_simulator
+    n = stop - start
+    days = simulator.max_days
+    
+    chunk = {
+        'revenue': np.zeros(n),
+        'unsold_seats': np.zeros(n),
+        'avg_price': np.zeros(n),
+        'load_factor': np.zeros(n),
+        'opportunity_cost': np.zeros(n),
+        # Days after a flight sells out are not simulated and stay NaN
+        'daily_prices': np.full((n, days), np.nan),
+        'daily_sales': np.full((n, days), np.nan),
+    }
+    
+    for row, index in enumerate(range(start, stop)):
+        rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(index,)))
+        result = simulator.run_simulation(rng=rng)
+        
+        avg_price = np.mean(result['daily_prices'])
+        
+        # Calculate load factor (percentage of seats sold)
+        load_factor = (simulator.total_seats - result['remaining_seats']) / simulator.total_seats
+        
+        # Calculate opportunity cost (potential revenue lost from unsold seats)
+        potential_revenue = simulator.total_seats * avg_price
+        opportunity_cost = potential_revenue - result['total_revenue']
+        
+        chunk['revenue'][row] = result['total_revenue']
+        chunk['unsold_seats'][row] = result['remaining_seats']
+        chunk['avg_price'][row] = avg_price
+        chunk['load_factor'][row] = load_factor
+        chunk['opportunity_cost'][row] = opportunity_cost
+        n_days = len(result['daily_prices'])
+        chunk['daily_prices'][row, :n_days] = result['daily_prices']
+        chunk['daily_sales'][row, :n_days] = result['daily_sales']
+    
+    accumulator = AnalysisAccumulator(days)
+    accumulator.add_batch(chunk)
+    return accumulator
+
 
 class PricingAnalysis:
-    def __init__(self, n_simulations=100):
+    def __init__(self, n_simulations=100, seed=None,
+                 data_path='assets/SynthData/large_airline_pricing_simulation.csv',
+                 chunk_size=1000, profiler=None):
         self.n_simulations = n_simulations
-        self.simulator = FlightSimulator()
-        self.results = []
-        
-    def run_analysis(self):
-        """Run multiple simulations and collect comprehensive metrics."""
-        total_revenues = []
-        unsold_seats = []
-        avg_prices = []
-        load_factors = []
-        opportunity_costs = []
-        
-        for _ in range(self.n_simulations):
-            result = self.simulator.run_simulation()
-            
-            # Basic metrics
-            total_revenues.append(result['total_revenue'])
-            unsold_seats.append(result['remaining_seats'])
-            avg_prices.append(np.mean(result['daily_prices']))
-            
-            # Calculate load factor (percentage of seats sold)
-            load_factor = (self.simulator.total_seats - result['remaining_seats']) / self.simulator.total_seats
-            load_factors.append(load_factor)
-            
-            # Calculate opportunity cost (potential revenue lost from unsold seats)
-            avg_demand = np.mean(result['daily_demand'])
-            avg_price = np.mean(result['daily_prices'])
-            potential_revenue = self.simulator.total_seats * avg_price
-            opportunity_cost = potential_revenue - result['total_revenue']
-            opportunity_costs.append(opportunity_cost)
+        self.data_path = data_path
+        self.chunk_size = chunk_size
+        self.profiler = profiler or default_profiler()
+        self.simulator = FlightSimulator(events=EventSink(TRACE_OFF), data_path=data_path,
+                                         profiler=self.profiler)
+        self.seed = seed
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.accumulator = None
+        
+    def run_analysis(self, workers=1, checkpoint_path=None, checkpoint_every=10):
+        """Run multiple simulations and collect comprehensive metrics.
+        
+        Simulations run in fixed-size chunks, each summarized by its own
+        AnalysisAccumulator, so memory does not grow with n_simulations.
+        With workers > 1 the chunks run on a process pool. Chunks are merged
+        in the same order either way and every simulation has its own seeded
+        RNG stream, so the results are identical to a serial run with the
+        same seed.
+        
+        With checkpoint_path, the merged accumulator and the position in
+        the run (next chunk and the seed entropy every simulation's RNG
+        stream derives from) are written to an .npz file every
+        checkpoint_every chunks and at the end, via a temporary file and
+        an atomic rename. If the file already exists the run resumes from
+        it; since chunks are merged in the same order and the saved state
+        round-trips exactly, the result is bit-identical to an
+        uninterrupted run.
+        
+        When profiling, serial runs nest the simulator's stages under
+        run_analysis;simulate_chunk; with workers only the parent's time
+        waiting on and merging chunks is counted.
+        """
+        timing = self.profiler.enabled
+        if timing:
+            start = time.perf_counter_ns()
+            self.profiler.push('run_analysis')
+        
+        entropy = self.seed_sequence.entropy
+        starts = list(range(0, self.n_simulations, self.chunk_size))
+        stops = [min(start + self.chunk_size, self.n_simulations) for start in starts]
+        
+        accumulator = AnalysisAccumulator(self.simulator.max_days)
+        first_chunk = 0
+        if checkpoint_path is not None and os.path.exists(checkpoint_path):
+            accumulator, first_chunk, entropy = self._load_checkpoint(checkpoint_path)
+        
+        def serial_chunks():
+            for chunk_start, chunk_stop in zip(starts[first_chunk:], stops[first_chunk:]):
+                if timing:
+                    self.profiler.push('simulate_chunk')
+                chunk = _simulate_chunk(entropy, chunk_start, chunk_stop, self.simulator)
+                if timing:
+                    self.profiler.pop()
+                yield chunk
+        
+        if timing:
+            t = time.perf_counter_ns()
+        with ExitStack() as stack:
+            if workers <= 1:
+                chunks = serial_chunks()
+            else:
+                # Workers map the parent's data from shared memory; the
+                # segments are unlinked when the stack unwinds
+                shared = None
+                if self.simulator.use_synth_data:
+                    shared = stack.enter_context(share_loader(self.simulator.data_loader)).descriptor
+                pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                               initargs=(self.data_path, shared)))
+                remaining = len(starts) - first_chunk
+                chunks = pool.map(_simulate_chunk, [entropy] * remaining,
+                                  starts[first_chunk:], stops[first_chunk:])
             
-            self.results.append({
-                'revenue': result['total_revenue'],
-                'unsold_seats': result['remaining_seats'],
-                'avg_price': np.mean(result['daily_prices']),
-                'load_factor': load_factor,
-                'opportunity_cost': opportunity_cost,
-                'daily_stats': {
-                    'prices': result['daily_prices'],
-                    'demand': result['daily_demand'],
-                    'sales': result['daily_sales'],
-                    'revenue': result['daily_revenue']
-                }
-            })
+            for index, chunk in enumerate(chunks, first_chunk):
+                if timing:
+                    t = self.profiler.lap('simulate_chunk', t)
+                accumulator.merge(chunk)
+                if timing:
+                    t = self.profiler.lap('merge', t)
+                
+                done = index + 1
+                if checkpoint_path is not None and (done % checkpoint_every == 0 or done == len(starts)):
+                    self._save_checkpoint(checkpoint_path, accumulator, done, entropy)
+                    if timing:
+                        t = self.profiler.lap('checkpoint', t)
+        
+        self.accumulator = accumulator
+        if timing:
+            self.profiler.pop()
+            self.profiler.lap('run_analysis', start)
+    
+    def _save_checkpoint(self, path, accumulator, next_chunk, entropy):
+        """Atomically write the run state after next_chunk chunks."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f,
+                     next_chunk=next_chunk,
+                     n_simulations=self.n_simulations,
+                     chunk_size=self.chunk_size,
+                     entropy=str(entropy),
+                     **accumulator.to_arrays())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    
+    def _load_checkpoint(self, path):
+        """Read a checkpoint; returns (accumulator, next_chunk, entropy)."""
+        with np.load(path) as checkpoint:
+            arrays = dict(checkpoint)
+        
+        if (int(arrays['n_simulations']) != self.n_simulations
+                or int(arrays['chunk_size']) != self.chunk_size
+                or len(arrays['daily_prices.count']) != self.simulator.max_days):
+            raise ValueError(f"Checkpoint {path} is for a different run configuration")
+        entropy = int(str(arrays['entropy']))
+        if self.seed is not None and entropy != self.seed_sequence.entropy:
+            raise ValueError(f"Checkpoint {path} was written with a different seed")
+        
+        accumulator = AnalysisAccumulator.from_arrays(arrays)
+        print(f"Resuming from {path}: {accumulator.count} of {self.n_simulations} simulations done")
+        return accumulator, int(arrays['next_chunk']), entropy
+    
+    def summary(self):
+        """Return the headline metrics of the last run as a JSON-ready dict."""
+        if self.accumulator is None:
+            self.run_analysis()
+        
+        metrics = self.accumulator.metrics
+        summary = {'n_simulations': self.accumulator.count}
+        for name, stats in metrics.items():
+            summary[name] = {'mean': float(stats.mean), 'std': float(stats.std),
+                             'min': float(stats.min), 'max': float(stats.max)}
+        summary['revenue_var_5pct'] = float(metrics['revenue'].mean - self.accumulator.revenue_sketch.quantile(0.05))
+        summary['best'] = self.accumulator.best
+        return summary
     
     def print_analysis(self):
         """Print comprehensive analysis of the pricing strategy."""
-        if not self.results:
+        if self.accumulator is None:
             self.run_analysis()
-            
-        revenues = [r['revenue'] for r in self.results]
-        unsold = [r['unsold_seats'] for r in self.results]
-        load_factors = [r['load_factor'] for r in self.results]
-        opportunity_costs = [r['opportunity_cost'] for r in self.results]
+        timing = self.profiler.enabled
+        if timing:
+            t = time.perf_counter_ns()
+        
+        metrics = self.accumulator.metrics
+        revenues = metrics['revenue']
+        unsold = metrics['unsold_seats']
+        load_factors = metrics['load_factor']
+        opportunity_costs = metrics['opportunity_cost']
         
         print("\n=== PRICING STRATEGY ANALYSIS ===")
-        print(f"\nBased on {self.n_simulations} simulations:")
+        print(f"\nBased on {self.accumulator.count} simulations:")
         
         print("\n1. Revenue Metrics:")
-        print(f"   Average Revenue: ${np.mean(revenues):.2f}")
-        print(f"   Revenue Std Dev: ${np.std(revenues):.2f}")
-        print(f"   Min Revenue: ${np.min(revenues):.2f}")
-        print(f"   Max Revenue: ${np.max(revenues):.2f}")
+        print(f"   Average Revenue: ${revenues.mean:.2f}")
+        print(f"   Revenue Std Dev: ${revenues.std:.2f}")
+        print(f"   Min Revenue: ${revenues.min:.2f}")
+        print(f"   Max Revenue: ${revenues.max:.2f}")
         
         print("\n2. Capacity Utilization:")
-        print(f"   Average Unsold Seats: {np.mean(unsold):.1f}")
-        print(f"   Average Load Factor: {np.mean(load_factors):.1%}")
-        print(f"   Load Factor Std Dev: {np.std(load_factors):.1%}")
+        print(f"   Average Unsold Seats: {unsold.mean:.1f}")
+        print(f"   Average Load Factor: {load_factors.mean:.1%}")
+        print(f"   Load Factor Std Dev: {load_factors.std:.1%}")
         
         print("\n3. Loss Analysis:")
-        print(f"   Average Opportunity Cost: ${np.mean(opportunity_costs):.2f}")
-        print(f"   Worst Case Loss: ${np.max(opportunity_costs):.2f}")
+        print(f"   Average Opportunity Cost: ${opportunity_costs.mean:.2f}")
+        print(f"   Worst Case Loss: ${opportunity_costs.max:.2f}")
         
-        # Analyze daily patterns
-        daily_prices = np.array([r['daily_stats']['prices'] for r in self.results])
-        daily_sales = np.array([r['daily_stats']['sales'] for r in self.results])
+        # Analyze daily patterns; only days actually simulated (before
+        # selling out) count towards the weekly averages
+        daily_prices = self.accumulator.daily_prices
+        price_sums = daily_prices.mean * daily_prices.count
         
         print("\n4. Daily Patterns:")
         print("   Average Price by Week:")
-        weekly_prices = np.mean(daily_prices.reshape(-1, 7), axis=1)
-        for week, avg_price in enumerate(weekly_prices, 1):
-            print(f"   Week {week}: ${avg_price:.2f}")
+        for week, start in enumerate(range(0, len(price_sums), 7), 1):
+            count = daily_prices.count[start:start + 7].sum()
+            if count:
+                print(f"   Week {week}: ${price_sums[start:start + 7].sum() / count:.2f}")
             
         print("\n5. Risk Analysis:")
-        revenue_at_risk = np.percentile(revenues, 5)
-        print(f"   5% Value at Risk: ${np.mean(revenues) - revenue_at_risk:.2f}")
-        print(f"   Revenue Volatility: {np.std(revenues) / np.mean(revenues):.1%}")
+        revenue_at_risk = self.accumulator.revenue_sketch.quantile(0.05)
+        print(f"   5% Value at Risk: ${revenues.mean - revenue_at_risk:.2f}")
+        print(f"   Revenue Volatility: {revenues.std / revenues.mean:.1%}")
         
         # Calculate optimal revenue scenarios
-        max_revenue_sim = self.results[np.argmax(revenues)]
+        best = self.accumulator.best
         print("\n6. Best Performance Analysis:")
-        print(f"   Best Revenue: ${max_revenue_sim['revenue']:.2f}")
-        print(f"   With Load Factor: {max_revenue_sim['load_factor']:.1%}")
-        print(f"   And Average Price: ${max_revenue_sim['avg_price']:.2f}")
+        print(f"   Best Revenue: ${best['revenue']:.2f}")
+        print(f"   With Load Factor: {best['load_factor']:.1%}")
+        print(f"   And Average Price: ${best['avg_price']:.2f}")
+        
+        if timing:
+            self.profiler.lap('print_analysis', t)
 
 def main():
-    analyzer = PricingAnalysis(n_simulations=100)
+    parser = argparse.ArgumentParser(description="Monte Carlo analysis of the pricing strategy.")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profiler = profiler_from_args(args)
+    
+    analyzer = PricingAnalysis(n_simulations=100, profiler=profiler)
     analyzer.run_analysis()
     analyzer.print_analysis()
+    
+    if profiler.enabled:
+        profiler.print_report()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,90 @@
+"""
+Throughput benchmark for the scalar and batch pricing APIs.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pricing --quotes 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from pricing_function import (pricing_function, calculate_expected_revenue,
+                              pricing_function_batch, calculate_expected_revenue_batch)
+from src.models.pricing_model import BusinessClassPricingModel
+
+
+def make_quotes(n_quotes: int, seed: int = 0):
+    """Random (days_left, tickets_left, demand_level) quotes covering every branch."""
+    rng = np.random.default_rng(seed)
+    days_left = rng.integers(1, 61, n_quotes)
+    tickets_left = rng.integers(0, 51, n_quotes)
+    demand_level = rng.uniform(10, 50, n_quotes)
+    return days_left, tickets_left, demand_level
+
+
+def bench(name, scalar_fn, batch_fn, quotes, scalar_sample, repeat=5):
+    """
+    Time the scalar loop on a sample and the batch call on all quotes.
+    
+    The scalar rate is measured on the first scalar_sample quotes and
+    extrapolated; the batch rate is the best of `repeat` calls. The batch
+    output is checked bit-for-bit against the scalar output on the sample.
+    """
+    days_left, tickets_left, demand_level = quotes
+    n_quotes = len(days_left)
+    sample = [(int(d), int(t), float(q)) for d, t, q in
+              zip(days_left[:scalar_sample], tickets_left[:scalar_sample], demand_level[:scalar_sample])]
+    
+    start = time.perf_counter()
+    scalar = np.array([scalar_fn(*quote) for quote in sample], dtype=float)
+    scalar_rate = len(sample) / (time.perf_counter() - start)
+    
+    batch_time = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        batch = batch_fn(days_left, tickets_left, demand_level)
+        batch_time = min(batch_time, time.perf_counter() - start)
+    batch_rate = n_quotes / batch_time
+    
+    identical = np.array_equal(scalar, batch[:scalar_sample])
+    print(f"{name}: scalar {scalar_rate:,.0f} quotes/s, batch {batch_rate:,.0f} quotes/s, "
+          f"speedup {batch_rate / scalar_rate:.0f}x, bit-identical: {identical}")
+    return batch_rate / scalar_rate, identical
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--quotes', type=int, default=1_000_000)
+    parser.add_argument('--scalar-sample', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    quotes = make_quotes(args.quotes)
+    model = BusinessClassPricingModel()
+    
+    def model_quote(days_left, tickets_left, demand_level):
+        price = model.calculate_price(days_left, tickets_left, demand_level)
+        return model.calculate_revenue(price, demand_level, tickets_left)[0]
+    
+    def model_batch(days_left, tickets_left, demand_level):
+        prices = model.calculate_prices(days_left, tickets_left, demand_level)
+        return model.calculate_revenues(prices, demand_level, tickets_left)[0]
+    
+    def function_quote(days_left, tickets_left, demand_level):
+        price = pricing_function(days_left, tickets_left, demand_level)
+        return calculate_expected_revenue(price, demand_level, tickets_left)
+    
+    def function_batch(days_left, tickets_left, demand_level):
+        prices = pricing_function_batch(days_left, tickets_left, demand_level)
+        return calculate_expected_revenue_batch(prices, demand_level, tickets_left)
+    
+    print(f"Pricing {args.quotes:,} quotes (price + revenue)")
+    bench('BusinessClassPricingModel', model_quote, model_batch, quotes, args.scalar_sample, args.repeat)
+    bench('pricing_function', function_quote, function_batch, quotes, args.scalar_sample, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
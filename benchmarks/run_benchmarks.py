@@ -0,0 +1,177 @@
+"""
+Benchmark suite for the simulation and pricing hot paths.
+
+Generates a synthetic dataset, times the main entry points and writes the
+results as JSON. Run from the repository root:
+
+    python -m benchmarks.run_benchmarks --flights 2000 --days 30 --output bench.json
+    python -m benchmarks.run_benchmarks --compare bench.json   # against a previous run
+"""
+
+import argparse
+import json
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+from analysis import PricingAnalysis
+from src.simulation.batch_simulator import BatchFlightSimulator
+from src.simulation.simulator import FlightSimulator
+from src.utils.data_loader import FlightDataLoader
+from src.utils.events import EventSink, TRACE_OFF
+from src.utils.synth_data import generate_dataset
+
+
+def measure(fn: Callable[[], Any], repeat: int = 1) -> Dict[str, float]:
+    """
+    Time fn (best of repeat), then record its peak traced memory.
+    
+    Memory is measured in a separate call because tracemalloc slows
+    Python-level code down considerably.
+    
+    Returns:
+        Dict with 'seconds' and 'peak_mb'
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': best, 'peak_mb': peak / 2**20}
+
+
+def git_commit() -> str:
+    """Current commit hash, or 'unknown' outside a git checkout."""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_suite(data_path: Path,
+              n_lookups: int,
+              n_flights_sim: int,
+              n_sims: int,
+              workers: int = 1) -> Dict[str, Any]:
+    """Run every benchmark against data_path and return the results."""
+    quiet = EventSink(TRACE_OFF)
+    results: Dict[str, Any] = {}
+    
+    # Load time: CSV parse (cold, no cache) and memory-mapped cache (warm)
+    results['load_csv'] = measure(lambda: FlightDataLoader(data_path, events=quiet, use_cache=False).load_data())
+    FlightDataLoader(data_path, events=quiet).load_data()
+    results['load_cached'] = measure(lambda: FlightDataLoader(data_path, events=quiet).load_data(), repeat=3)
+    
+    # Per-lookup latency
+    loader = FlightDataLoader(data_path, events=quiet)
+    loader.load_data()
+    rng = np.random.default_rng(0)
+    flight_ids = rng.choice(loader.available_flight_ids, n_lookups).tolist()
+    days = rng.integers(1, loader.max_days + 1, n_lookups).tolist()
+    
+    def lookups():
+        for flight_id, days_before in zip(flight_ids, days):
+            loader.get_flight_data(flight_id, days_before)
+    
+    stats = measure(lookups, repeat=3)
+    stats['per_lookup_us'] = stats['seconds'] / n_lookups * 1e6
+    results['get_flight_data'] = stats
+    
+    # Per-flight scalar simulation
+    simulator = FlightSimulator(data_path=str(data_path), events=quiet)
+    sim_flights = simulator.available_flights[:n_flights_sim]
+    stats = measure(lambda: [simulator.run_simulation(f) for f in sim_flights])
+    stats['per_flight_ms'] = stats['seconds'] / len(sim_flights) * 1e3
+    results['run_simulation'] = stats
+    
+    # Whole-fleet batch simulation
+    batch = BatchFlightSimulator(data_loader=loader)
+    all_flights = batch.available_flights
+    stats = measure(lambda: batch.run_flights(all_flights), repeat=3)
+    stats['flights_per_second'] = len(all_flights) / stats['seconds']
+    results['batch_run_flights'] = stats
+    
+    # Monte Carlo throughput
+    analysis = PricingAnalysis(n_simulations=n_sims, seed=0, data_path=str(data_path))
+    stats = measure(lambda: analysis.run_analysis(workers=workers))
+    stats['simulations_per_second'] = n_sims / stats['seconds']
+    results['run_analysis'] = stats
+    
+    return results
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print per-benchmark time ratios against a previous results file."""
+    print(f"\nComparison against {baseline['meta']['commit'][:10]}:")
+    for name, stats in current['benchmarks'].items():
+        old = baseline['benchmarks'].get(name)
+        if old is None:
+            continue
+        ratio = stats['seconds'] / old['seconds']
+        print(f"   {name:<20} {old['seconds']:.4f}s -> {stats['seconds']:.4f}s ({ratio:.2f}x)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the simulation and pricing hot paths.")
+    parser.add_argument('--flights', type=int, default=2000, help='Flights in the synthetic dataset')
+    parser.add_argument('--days', type=int, default=30, help='Days before departure per flight')
+    parser.add_argument('--lookups', type=int, default=100000, help='get_flight_data calls to time')
+    parser.add_argument('--sim-flights', type=int, default=200, help='Flights for the scalar simulator')
+    parser.add_argument('--n-sims', type=int, default=200, help='Monte Carlo simulations')
+    parser.add_argument('--workers', type=int, default=1, help='Processes for the Monte Carlo benchmark')
+    parser.add_argument('--seed', type=int, default=0, help='Dataset seed')
+    parser.add_argument('--output', default='benchmark_results.json', help='Results JSON path')
+    parser.add_argument('--compare', help='Previous results JSON to compare against')
+    args = parser.parse_args(argv)
+    
+    work_dir = Path(tempfile.mkdtemp(prefix='airline_bench_'))
+    try:
+        # Without the columnar cache, so the first cached load below builds it
+        data_path = generate_dataset(work_dir / 'bench.csv', args.flights, args.days, args.seed,
+                                     columnar=False)
+        benchmarks = run_suite(data_path, args.lookups, args.sim_flights, args.n_sims, args.workers)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'flights': args.flights,
+            'days': args.days,
+            'rows': args.flights * args.days * 2,
+        },
+        'benchmarks': benchmarks,
+    }
+    
+    print(f"Benchmarks ({args.flights} flights x {args.days} days):")
+    for name, stats in benchmarks.items():
+        extra = ', '.join(f"{k}={v:.3g}" for k, v in stats.items() if k not in ('seconds', 'peak_mb'))
+        print(f"   {name:<20} {stats['seconds']:.4f}s  peak {stats['peak_mb']:.1f} MB  {extra}")
+    
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,16 +2,25 @@
 Main script for running airline pricing simulations.
 """
 
+import argparse
+
 import numpy as np
 from src.simulation.simulator import FlightSimulator
+from src.utils.profiling import add_profile_arguments, profiler_from_args
 
 
 def main():
     """Run airline pricing simulations."""
+    parser = argparse.ArgumentParser(description="Run airline pricing simulations.")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profiler = profiler_from_args(args)
+    
     # Initialize simulator
     simulator = FlightSimulator(
         total_seats=50,
-        data_path='assets/SynthData/large_airline_pricing_simulation.csv'
+        data_path='assets/SynthData/large_airline_pricing_simulation.csv',
+        profiler=profiler
     )
     
     # Run simulations for multiple flights
@@ -35,6 +44,9 @@ def main():
     print(f"Standard Deviation: ${np.std(total_revenues):.2f}")
     print(f"Min Revenue: ${np.min(total_revenues):.2f}")
     print(f"Max Revenue: ${np.max(total_revenues):.2f}")
+    
+    if profiler.enabled:
+        profiler.print_report()
 
 
 if __name__ == "__main__":
@@ -1,5 +1,8 @@
 import numpy as np
 
+# Vectorized versions live in the package so simulations can use them
+from src.models.pricing_function import calculate_expected_revenue_batch, pricing_function_batch  # noqa: F401
+
 def pricing_function(days_left, tickets_left, demand_level):
     """
     Optimize ticket pricing to maximize expected revenue with dynamic seat-based pricing.
@@ -62,4 +65,4 @@ def calculate_expected_revenue(price, demand_level, tickets_left):
     
     # Calculate quantity sold
     quantity = min(actual_demand, tickets_left)
-    return price * quantity 
\ No newline at end of file
+    return price * quantity
\ No newline at end of file
@@ -1,9 +1,18 @@
+import argparse
+import time
+
 import numpy as np
-import pandas as pd
 from pricing_function import pricing_function, calculate_expected_revenue
+from src.utils.data_loader import FlightDataLoader
+from src.utils.events import EventSink
+from src.utils.profiling import add_profile_arguments, default_profiler, profiler_from_args
 
 class FlightSimulator:
-    def __init__(self, total_seats=50):  # Reduced seats for business class
+    def __init__(self, total_seats=50, events=None,
+                 data_path='assets/SynthData/large_airline_pricing_simulation.csv',
+                 profiler=None, data_loader=None):  # Reduced seats for business class
+        self.events = events or EventSink()
+        self.profiler = profiler or default_profiler()
         self.total_seats = total_seats
         self.remaining_seats = total_seats
         self.total_revenue = 0
@@ -11,81 +20,88 @@ class FlightSimulator:
         self.daily_prices = []
         self.daily_demand = []
         self.daily_sales = []
+        self.rng = np.random.default_rng()
+        self.max_days = 30  # Default horizon when no synthetic data is available
         
-        # Load synthetic data
-        try:
-            self.synth_data = pd.read_csv('assets/SynthData/large_airline_pricing_simulation.csv')
-            print("\nLoaded synthetic data with columns:", self.synth_data.columns.tolist())
-            print("\nSample of synthetic data:")
-            print(self.synth_data.head())
-            self.use_synth_data = True
-            
-            # Get maximum days from data
-            self.max_days = self.synth_data['Days Before Departure'].max()
-            print(f"\nMaximum days before departure in data: {self.max_days}")
-            
-            # Filter for business class only
-            self.synth_data = self.synth_data[self.synth_data['Class'] == 'Business']
-            print(f"Number of business class records: {len(self.synth_data)}")
-        except Exception as e:
-            print(f"Warning: Could not load synthetic data ({str(e)}). Using random generation instead.")
-            self.use_synth_data = False
+        # Load synthetic data (parsed once, then served from the columnar cache),
+        # unless an already loaded loader (e.g. attached to shared memory) is given
+        if data_loader is not None:
+            self.data_loader = data_loader
+            self.use_synth_data = data_loader.columns is not None
+        else:
+            self.data_loader = FlightDataLoader(data_path, events=self.events)
+            self.use_synth_data = self.data_loader.load_data(class_type='Business')
+        if self.use_synth_data:
+            self.max_days = self.data_loader.max_days
+            self.flight_rows = self.data_loader._flight_rows
+            self.demand_table = self.data_loader.demand_table
+            self.price_table = self.data_loader.price_table
+        else:
+            self.events.summary("Warning: Could not load synthetic data. Using random generation instead.")
+    
+    def _lookup(self, table, day_index, flight_index):
+        """Return the table entry for a flight and day, or None if there is no record."""
+        row = self.flight_rows.get(flight_index)
+        days_before_departure = self.max_days - day_index
+        if row is None or not 0 <= days_before_departure <= self.max_days:
+            return None
+        value = table[row, days_before_departure]
+        return None if np.isnan(value) else float(value)
     
     def get_demand_level(self, day_index, flight_index=0):
         """Get demand level either from synthetic data or generate randomly."""
         if self.use_synth_data:
-            try:
-                # Convert day_index to match the data format
-                days_before_departure = self.max_days - day_index
-                
-                # Get demand for this flight and day
-                demand = self.synth_data.loc[
-                    (self.synth_data['Flight ID'] == flight_index) & 
-                    (self.synth_data['Days Before Departure'] == days_before_departure),
-                    'Demand'
-                ].iloc[0]
-                
-                return float(demand)
-            except Exception as e:
-                print(f"Warning: Error reading synthetic data ({str(e)}). Falling back to random generation.")
-                return np.random.uniform(20, 40)  # Adjusted for business class
-        else:
-            return np.random.uniform(20, 40)  # Adjusted for business class
+            demand = self._lookup(self.demand_table, day_index, flight_index)
+            if demand is not None:
+                return demand
+            if self.events.per_day:
+                self.events.detail(f"Warning: No synthetic data for flight {flight_index}, day {day_index}. Falling back to random generation.")
+        return self.rng.uniform(20, 40)  # Adjusted for business class
     
     def get_historical_price(self, day_index, flight_index=0):
         """Get historical price from synthetic data if available."""
         if self.use_synth_data:
-            try:
-                days_before_departure = self.max_days - day_index
-                price = self.synth_data.loc[
-                    (self.synth_data['Flight ID'] == flight_index) & 
-                    (self.synth_data['Days Before Departure'] == days_before_departure),
-                    'Price'
-                ].iloc[0]
-                return float(price)
-            except Exception:
-                return None
+            return self._lookup(self.price_table, day_index, flight_index)
         return None
     
+    def get_flight_trajectory(self, flight_index=0):
+        """Get a flight's demand and price arrays, indexed by days before departure."""
+        row = self.flight_rows.get(flight_index) if self.use_synth_data else None
+        if row is None:
+            return None
+        return {'demand': self.demand_table[row], 'price': self.price_table[row]}
+    
     def simulate_day(self, day_index, flight_index=0):
         """Simulate one day of ticket sales."""
         if self.remaining_seats <= 0:
             return 0
         
+        timing = self.profiler.enabled
+        if timing:
+            t = time.perf_counter_ns()
+        
         # Get demand level from synthetic data
         demand_level = self.get_demand_level(day_index, flight_index)
+        if timing:
+            t = self.profiler.lap('run_simulation;get_demand_level', t)
         
         # Get price from pricing function
         price = pricing_function(self.max_days - day_index, self.remaining_seats, demand_level)
+        if timing:
+            t = self.profiler.lap('run_simulation;pricing_function', t)
         
         # Get historical price for comparison
         historical_price = self.get_historical_price(day_index, flight_index)
-        if historical_price is not None:
-            print(f"Day {day_index + 1}: Our price: ${price:.2f}, Historical price: ${historical_price:.2f}, Demand: {demand_level:.1f}")
+        if self.events.per_day:
+            self.events.record_day(flight_index, day_index, price, historical_price, demand_level)
+        if timing:
+            t = self.profiler.lap('run_simulation;trace', t)
         
         # Calculate quantity sold using the revenue calculator
         revenue = calculate_expected_revenue(price, demand_level, self.remaining_seats)
         quantity = revenue / price if price > 0 else 0
+        if timing:
+            t = self.profiler.lap('run_simulation;calculate_expected_revenue', t)
         
         # Update state
         self.total_revenue += revenue
@@ -96,11 +112,22 @@ class FlightSimulator:
         self.daily_prices.append(price)
         self.daily_demand.append(demand_level)
         self.daily_sales.append(quantity)
+        if timing:
+            self.profiler.lap('run_simulation;record', t)
         
         return revenue
     
-    def run_simulation(self, flight_index=0):
-        """Run a complete simulation for one flight."""
+    def run_simulation(self, flight_index=0, rng=None):
+        """Run a complete simulation for one flight.
+        
+        rng is an optional np.random.Generator used for random demand; pass
+        a seeded one to make the run reproducible.
+        """
+        timing = self.profiler.enabled
+        if timing:
+            start = time.perf_counter_ns()
+        if rng is not None:
+            self.rng = rng
         self.remaining_seats = self.total_seats
         self.total_revenue = 0
         self.daily_revenue = []
@@ -108,9 +135,15 @@ class FlightSimulator:
         self.daily_demand = []
         self.daily_sales = []
         
-        print(f"\nRunning simulation for Flight ID: {flight_index}")
+        self.events.summary(f"\nRunning simulation for Flight ID: {flight_index}")
         for day in range(self.max_days):
             self.simulate_day(day, flight_index)
+        if timing:
+            t = time.perf_counter_ns()
+        self.events.end_run()
+        if timing:
+            self.profiler.lap('run_simulation;end_run', t)
+            self.profiler.lap('run_simulation', start)
         
         return {
             'total_revenue': self.total_revenue,
@@ -122,11 +155,16 @@ class FlightSimulator:
         }
 
 def main():
+    parser = argparse.ArgumentParser(description="Simulate a few flights with pricing_function.")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profiler = profiler_from_args(args)
+    
     # Run simulations for a few different flights
     n_simulations = 3  # Reduced number of simulations to better see the comparison
     total_revenues = []
     
-    simulator = FlightSimulator()
+    simulator = FlightSimulator(profiler=profiler)
     
     for i in range(n_simulations):
         results = simulator.run_simulation(flight_index=i+1)  # Using Flight ID starting from 1
@@ -145,6 +183,9 @@ def main():
     print(f"Standard Deviation: ${np.std(total_revenues):.2f}")
     print(f"Min Revenue: ${np.min(total_revenues):.2f}")
     print(f"Max Revenue: ${np.max(total_revenues):.2f}")
+    
+    if profiler.enabled:
+        profiler.print_report()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
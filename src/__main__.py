@@ -0,0 +1,271 @@
+"""
+Command-line entry point: python -m src {simulate,analyze,benchmark,coordinate,work,generate}.
+
+Only argparse is imported up front; NumPy, the simulators and pandas are
+imported by the subcommand that needs them, and pandas only when the CSV
+has to be parsed because no columnar cache exists yet.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+DEFAULT_DATA_PATH = 'assets/SynthData/large_airline_pricing_simulation.csv'
+
+# Where generate writes by default, kept apart from the dataset the other
+# commands read
+DEFAULT_GENERATED_PATH = 'assets/SynthData/generated.csv'
+
+# Batch engine owned by each simulate worker process, built once by _init_worker
+_worker_simulator = None
+
+
+def _init_worker(data_path: str,
+                 class_type: str,
+                 total_seats: int,
+                 seed: Optional[int],
+                 shared: Optional[Dict[str, Any]] = None) -> None:
+    """Build the worker's batch simulator once per process, on the parent's shared data if given."""
+    global _worker_simulator
+    _worker_simulator = _batch_simulator(data_path, class_type, total_seats, seed, shared)
+
+
+def _batch_simulator(data_path: str,
+                     class_type: str,
+                     total_seats: int,
+                     seed: Optional[int],
+                     shared: Optional[Dict[str, Any]] = None):
+    """Batch simulator over one class of the dataset, with quiet logging."""
+    from .simulation.batch_simulator import BatchFlightSimulator
+    from .utils.data_loader import FlightDataLoader
+    from .utils.events import EventSink, TRACE_OFF
+    
+    if shared is not None:
+        from .utils.shared_data import attach_loader
+        loader = attach_loader(shared, events=EventSink(TRACE_OFF))
+    else:
+        loader = FlightDataLoader(data_path, events=EventSink(TRACE_OFF))
+        if not loader.load_data(class_type=class_type):
+            raise SystemExit(f"Could not load {class_type} data from {data_path}")
+    return BatchFlightSimulator(total_seats=total_seats, data_loader=loader, seed=seed)
+
+
+def _simulate_shard(flight_ids: List[int], simulator=None) -> Dict[str, Any]:
+    """Simulate one shard of flights and keep only the per-flight totals."""
+    simulator = simulator or _worker_simulator
+    results = simulator.run_flights(flight_ids)
+    return {key: results[key] for key in ('total_revenue', 'remaining_seats', 'days_active')}
+
+
+def simulate(args: argparse.Namespace) -> Dict[str, Any]:
+    """Simulate flights from the dataset with the vectorized batch engine."""
+    import numpy as np
+    
+    if args.seed is not None:
+        # Missing records fall back to np.random demand
+        np.random.seed(args.seed)
+    simulator = _batch_simulator(args.data, args.cabin, args.seats, args.seed)
+    flight_ids = simulator.available_flights
+    if args.flights is not None:
+        flight_ids = flight_ids[:args.flights]
+    if not flight_ids:
+        raise SystemExit(f"No flights in {args.data}")
+    
+    if args.workers <= 1:
+        totals = _simulate_shard(flight_ids, simulator)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        from .utils.shared_data import share_loader
+        
+        shards = [list(shard) for shard in np.array_split(flight_ids, args.workers) if len(shard)]
+        # Workers attach to the loaded data in shared memory rather than reloading it
+        with share_loader(simulator.data_loader) as shared, \
+                ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                                    initargs=(args.data, args.cabin, args.seats, args.seed,
+                                              shared.descriptor)) as pool:
+            parts = list(pool.map(_simulate_shard, shards))
+        totals = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+    
+    revenue = totals['total_revenue']
+    print(f"Simulated {len(flight_ids)} {args.cabin} flights ({args.seats} seats each):")
+    print(f"   Average Revenue: ${revenue.mean():.2f}")
+    print(f"   Standard Deviation: ${revenue.std():.2f}")
+    print(f"   Min Revenue: ${revenue.min():.2f}")
+    print(f"   Max Revenue: ${revenue.max():.2f}")
+    print(f"   Average Remaining Seats: {totals['remaining_seats'].mean():.1f}")
+    
+    return {
+        'flight_ids': [int(fid) for fid in flight_ids],
+        'total_revenue': revenue.tolist(),
+        'remaining_seats': totals['remaining_seats'].tolist(),
+        'days_active': totals['days_active'].tolist(),
+    }
+
+
+def analyze(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the Monte Carlo pricing analysis."""
+    from analysis import PricingAnalysis
+    
+    analyzer = PricingAnalysis(n_simulations=args.n_sims, seed=args.seed, data_path=args.data)
+    analyzer.run_analysis(workers=args.workers, checkpoint_path=args.checkpoint,
+                          checkpoint_every=args.checkpoint_every)
+    analyzer.print_analysis()
+    return analyzer.summary()
+
+
+def benchmark(args: argparse.Namespace) -> None:
+    """Run the benchmark suite on a generated dataset."""
+    from benchmarks.run_benchmarks import main as run_benchmarks
+    
+    argv = ['--workers', str(args.workers),
+            '--seed', str(args.seed if args.seed is not None else 0),
+            '--output', args.output or 'benchmark_results.json']
+    if args.flights is not None:
+        argv += ['--flights', str(args.flights)]
+    if args.n_sims is not None:
+        argv += ['--n-sims', str(args.n_sims)]
+    run_benchmarks(argv)
+
+
+def _address(value: str) -> Tuple[str, int]:
+    """Parse 'host:port'."""
+    host, _, port = value.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def coordinate(args: argparse.Namespace) -> Dict[str, Any]:
+    """Shard the dataset's flights over TCP workers and merge their results."""
+    from .simulation.distributed import SimulationCoordinator, _worker_main
+    from .utils.data_loader import FlightDataLoader
+    from .utils.events import EventSink, TRACE_OFF
+    
+    loader = FlightDataLoader(args.data, events=EventSink(TRACE_OFF))
+    if not loader.load_data():
+        raise SystemExit(f"Could not load data from {args.data}")
+    flight_ids = loader.available_flight_ids
+    if args.flights is not None:
+        flight_ids = flight_ids[:args.flights]
+    
+    host, port = _address(args.bind)
+    coordinator = SimulationCoordinator(flight_ids, args.data, total_seats=args.seats,
+                                        unit_size=args.unit_size, max_attempts=args.max_attempts,
+                                        host=host, port=port)
+    print(f"Coordinator listening on {coordinator.address[0]}:{coordinator.address[1]}")
+    
+    if args.workers > 0:
+        import multiprocessing
+        
+        coordinator.start()
+        for _ in range(args.workers):
+            multiprocessing.Process(target=_worker_main, args=(coordinator.address, args.data),
+                                    daemon=True).start()
+    fleet = coordinator.run(timeout=args.timeout)
+    
+    print(f"Simulated {len(fleet)} flights ({args.seats} seats each):")
+    print(f"   Average Revenue: ${fleet.total_revenue.mean():.2f}")
+    print(f"   Average Remaining Seats: {fleet.remaining_seats.mean():.1f}")
+    return {
+        'flight_ids': fleet.flight_ids.tolist(),
+        'total_revenue': fleet.total_revenue.tolist(),
+        'remaining_seats': fleet.remaining_seats.tolist(),
+        'days_active': fleet.days_active.tolist(),
+        'coordinator': coordinator.stats,
+    }
+
+
+def work(args: argparse.Namespace) -> None:
+    """Simulate units for a coordinator until it is done."""
+    from .simulation.distributed import SimulationWorker
+    
+    completed = SimulationWorker(_address(args.connect), data_path=args.data).run(args.connect_timeout)
+    print(f"Worker finished {completed} units")
+
+
+def generate(args: argparse.Namespace) -> None:
+    """Write a synthetic dataset (CSV plus the loader's columnar cache)."""
+    from .utils.synth_data import SyntheticDataset
+    
+    if os.path.exists(args.data) and not args.force:
+        raise SystemExit(f"{args.data} already exists; pass --force to overwrite it")
+    dataset = SyntheticDataset(args.flights, args.days, seed=args.seed if args.seed is not None else 0,
+                               chunk_flights=args.chunk_flights)
+    path = dataset.write(args.data, columnar=not args.no_columnar, workers=args.workers)
+    print(f"Wrote {dataset.n_rows} rows ({args.flights} flights x {args.days} days) to {path}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line parser."""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--workers', type=int, default=1, help='worker processes')
+    common.add_argument('--seed', type=int, default=None, help='random seed')
+    common.add_argument('--flights', type=int, default=None,
+                        help='number of flights (default: all for simulate)')
+    common.add_argument('--n-sims', type=int, default=None, help='Monte Carlo simulations')
+    common.add_argument('--output', default=None, help='write results to this JSON file')
+    
+    parser = argparse.ArgumentParser(prog='python -m src', description="Airline pricing simulations.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    sim = commands.add_parser('simulate', parents=[common], help='simulate flights from the dataset')
+    sim.add_argument('--data', default=DEFAULT_DATA_PATH, help='CSV dataset path')
+    sim.add_argument('--cabin', default='Business', help='class to simulate')
+    sim.add_argument('--seats', type=int, default=50, help='seats per flight')
+    sim.set_defaults(handler=simulate)
+    
+    ana = commands.add_parser('analyze', parents=[common], help='Monte Carlo analysis of the pricing strategy')
+    ana.add_argument('--data', default=DEFAULT_DATA_PATH, help='CSV dataset path')
+    ana.add_argument('--checkpoint', default=None,
+                     help='.npz checkpoint to write periodically and resume from')
+    ana.add_argument('--checkpoint-every', type=int, default=10, help='chunks between checkpoints')
+    ana.set_defaults(handler=analyze, n_sims=100)
+    
+    bench = commands.add_parser('benchmark', parents=[common], help='run the benchmark suite')
+    bench.set_defaults(handler=benchmark)
+    
+    coord = commands.add_parser('coordinate', parents=[common],
+                                help='serve flights to TCP workers (--workers starts local ones)')
+    coord.add_argument('--data', default=DEFAULT_DATA_PATH, help='CSV dataset path')
+    coord.add_argument('--seats', type=int, default=50, help='seats per flight')
+    coord.add_argument('--bind', default='127.0.0.1:5555', help='host:port to listen on')
+    coord.add_argument('--unit-size', type=int, default=64, help='flights per work unit')
+    coord.add_argument('--max-attempts', type=int, default=3,
+                       help='failed attempts after which a unit fails the run')
+    coord.add_argument('--timeout', type=float, default=None, help='seconds to wait for the run')
+    coord.set_defaults(handler=coordinate, workers=0)
+    
+    wrk = commands.add_parser('work', help='simulate flights for a coordinator')
+    wrk.add_argument('--connect', default='127.0.0.1:5555', help='coordinator host:port')
+    wrk.add_argument('--data', default=None, help="local CSV path (default: the coordinator's)")
+    wrk.add_argument('--connect-timeout', type=float, default=10.0,
+                     help='seconds to keep retrying the connection')
+    wrk.set_defaults(handler=work, output=None)
+    
+    gen = commands.add_parser('generate', parents=[common], help='write a synthetic dataset')
+    gen.add_argument('--data', default=DEFAULT_GENERATED_PATH, help='CSV path to write')
+    gen.add_argument('--force', action='store_true', help='overwrite an existing CSV and its cache')
+    gen.add_argument('--days', type=int, default=30, help='days before departure per flight')
+    gen.add_argument('--chunk-flights', type=int, default=20000, help='flights generated per chunk')
+    gen.add_argument('--no-columnar', action='store_true', help='skip writing the columnar cache')
+    gen.set_defaults(handler=generate, flights=10000, output=None)
+    
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    start = time.perf_counter()
+    result = args.handler(args)
+    
+    if args.output and result is not None:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"Results written to {args.output}")
+    print(f"Done in {time.perf_counter() - start:.3f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,328 @@
+"""
+Online demand forecasting by route and days before departure.
+"""
+
+from typing import Any, Optional, Tuple, Union
+
+import numpy as np
+
+
+class DemandForecaster:
+    """
+    Exponentially weighted demand estimates per (route, days before departure).
+    
+    State is three fixed-size (n_routes, max_days + 1) arrays, so it costs
+    the same to keep, update and save whatever the volume of history. The
+    synthetic data has no route column, so flights are bucketed onto routes
+    by flight ID modulo n_routes (n_routes=1 pools every flight).
+    
+    Each update moves the cell's mean and variance towards the observation
+    with weight max(decay, 1 / count): the first 1 / decay observations
+    give the exact running mean, later ones an exponentially weighted one
+    that tracks drift.
+    """
+    
+    def __init__(self, n_routes: int = 1, max_days: int = 30, decay: float = 0.05):
+        """
+        Initialize an empty forecaster.
+        
+        Args:
+            n_routes: Number of route buckets
+            max_days: Largest days-before-departure value tracked
+            decay: Floor on the weight of a new observation (0-1)
+        """
+        self.n_routes = n_routes
+        self.max_days = max_days
+        self.decay = decay
+        
+        shape = (n_routes, max_days + 1)
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.mean = np.zeros(shape)
+        self.var = np.zeros(shape)
+    
+    def route_of(self, flight_id: Union[int, np.ndarray]) -> Union[int, np.ndarray]:
+        """Route bucket of a flight (or array of flights)."""
+        return flight_id % self.n_routes
+    
+    def update(self, flight_id: int, days_before: int, demand: float) -> None:
+        """
+        Fold one observed demand level into the estimates in O(1).
+        
+        Args:
+            flight_id: Flight identifier
+            days_before: Days before departure of the observation
+            demand: Observed demand level
+        """
+        if not 0 <= days_before <= self.max_days:
+            return
+        cell = (flight_id % self.n_routes, days_before)
+        count = self.count[cell] + 1
+        weight = max(self.decay, 1.0 / count)
+        delta = demand - self.mean[cell]
+        
+        self.count[cell] = count
+        self.mean[cell] += weight * delta
+        self.var[cell] = (1 - weight) * (self.var[cell] + weight * delta * delta)
+    
+    def update_batch(self,
+                     flight_ids: np.ndarray,
+                     days_before: np.ndarray,
+                     demand: np.ndarray) -> None:
+        """
+        Fold many observations into the estimates.
+        
+        Gives the same state as calling update on each observation in
+        order: observations that hit the same cell are applied in rounds,
+        the k-th hit of every cell in round k.
+        
+        Args:
+            flight_ids: Flight identifier of each observation
+            days_before: Days before departure of each observation
+            demand: Observed demand levels (NaN entries are skipped)
+        """
+        flight_ids, days_before, demand = np.broadcast_arrays(
+            np.asarray(flight_ids, dtype=np.int64),
+            np.asarray(days_before, dtype=np.int64),
+            np.asarray(demand, dtype=float))
+        keep = ~np.isnan(demand) & (days_before >= 0) & (days_before <= self.max_days)
+        routes = self.route_of(flight_ids[keep])
+        days = days_before[keep]
+        demand = demand[keep]
+        if not len(demand):
+            return
+        
+        # Rank of each observation among earlier ones hitting the same cell
+        cells = routes * (self.max_days + 1) + days
+        order = np.argsort(cells, kind='stable')
+        sorted_cells = cells[order]
+        starts = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1]])
+        rank = np.empty(len(cells), dtype=np.int64)
+        rank[order] = np.arange(len(cells)) - np.repeat(starts, np.diff(np.r_[starts, len(cells)]))
+        
+        for k in range(int(rank.max()) + 1):
+            hit = rank == k
+            r, d, x = routes[hit], days[hit], demand[hit]
+            count = self.count[r, d] + 1
+            weight = np.maximum(self.decay, 1.0 / count)
+            delta = x - self.mean[r, d]
+            
+            self.count[r, d] = count
+            self.mean[r, d] += weight * delta
+            self.var[r, d] = (1 - weight) * (self.var[r, d] + weight * delta * delta)
+    
+    def fit(self, data_loader: Any) -> 'DemandForecaster':
+        """
+        Learn from every record held by a loaded FlightDataLoader.
+        
+        Flights are folded in the loader's flight ID order.
+        
+        Args:
+            data_loader: Loader whose load_data has been called
+        
+        Returns:
+            DemandForecaster: self
+        """
+        table = np.asarray(data_loader.demand_table, dtype=float)[:, :self.max_days + 1]
+        flight_ids = np.asarray(data_loader.flight_ids, dtype=np.int64)[:, None]
+        days_before = np.arange(table.shape[1])[None, :]
+        self.update_batch(flight_ids, days_before, table)
+        return self
+    
+    def expected_demand(self, flight_id: int, days_before: int) -> Optional[float]:
+        """
+        Get the estimated demand level for one flight and day.
+        
+        Returns:
+            Optional[float]: Mean demand, or None if the cell has no data
+        """
+        if not 0 <= days_before <= self.max_days:
+            return None
+        cell = (flight_id % self.n_routes, days_before)
+        if self.count[cell] == 0:
+            return None
+        return float(self.mean[cell])
+    
+    def expected_future_demand(self,
+                               flight_ids: Union[int, np.ndarray],
+                               days_left: Union[int, np.ndarray]) -> np.ndarray:
+        """
+        Mean expected demand over the days after today.
+        
+        Averages the estimates for 1 .. days_left - 1 days before departure,
+        skipping cells with no data.
+        
+        Args:
+            flight_ids: Flight identifier(s)
+            days_left: Days until the flight (today's days before departure)
+        
+        Returns:
+            np.ndarray: Mean expected daily demand, NaN where nothing is known
+        """
+        if np.ndim(flight_ids) == 0 and np.ndim(days_left) == 0:
+            # Single quote: only one route's row is needed
+            route = int(flight_ids) % self.n_routes
+            upper = min(max(int(days_left), 1), self.max_days + 1)
+            seen = self.count[route, 1:upper] > 0
+            n_known = int(seen.sum())
+            if n_known == 0:
+                return np.array(np.nan)
+            return np.array(self.mean[route, 1:upper][seen].sum() / n_known)
+        
+        routes = self.route_of(np.asarray(flight_ids, dtype=np.int64))
+        upper = np.clip(np.asarray(days_left, dtype=np.int64), 1, self.max_days + 1)
+        
+        seen = self.count > 0
+        # Prefix sums over days before departure, with a leading zero column
+        total = np.zeros((self.n_routes, self.max_days + 2))
+        known = np.zeros((self.n_routes, self.max_days + 2))
+        np.cumsum(np.where(seen, self.mean, 0.0), axis=1, out=total[:, 1:])
+        np.cumsum(seen, axis=1, out=known[:, 1:])
+        
+        demand_sum = total[routes, upper] - total[routes, 1]
+        n_known = known[routes, upper] - known[routes, 1]
+        return np.divide(demand_sum, n_known,
+                         out=np.full(np.broadcast(demand_sum, n_known).shape, np.nan),
+                         where=n_known > 0)
+    
+    def sample(self, flight_id: int, days_before: int) -> float:
+        """
+        Draw a demand level from the cell's estimated distribution.
+        
+        Falls back to uniform(20, 40) demand where the cell has no data.
+        
+        Args:
+            flight_id: Flight identifier
+            days_before: Days before departure
+        
+        Returns:
+            float: Non-negative sampled demand
+        """
+        mean = self.expected_demand(flight_id, days_before)
+        if mean is None:
+            return np.random.uniform(20, 40)
+        std = float(np.sqrt(self.var[flight_id % self.n_routes, days_before]))
+        return max(0.0, np.random.normal(mean, std))
+    
+    def sample_batch(self, flight_ids: np.ndarray, days_before: np.ndarray) -> np.ndarray:
+        """Vectorized counterpart of sample."""
+        routes, days = np.broadcast_arrays(self.route_of(np.asarray(flight_ids, dtype=np.int64)),
+                                           np.asarray(days_before, dtype=np.int64))
+        in_range = (days >= 0) & (days <= self.max_days)
+        cells = (routes[in_range], days[in_range])
+        
+        demand = np.random.uniform(20, 40, size=routes.shape)
+        seen = np.zeros(routes.shape, dtype=bool)
+        seen[in_range] = self.count[cells] > 0
+        
+        mean = np.zeros(routes.shape)
+        std = np.zeros(routes.shape)
+        mean[in_range] = self.mean[cells]
+        std[in_range] = np.sqrt(self.var[cells])
+        demand[seen] = np.maximum(0.0, np.random.normal(mean[seen], std[seen]))
+        return demand
+    
+    def save(self, path: str) -> None:
+        """Write the estimator state to an .npz file."""
+        np.savez(path, n_routes=self.n_routes, max_days=self.max_days, decay=self.decay,
+                 count=self.count, mean=self.mean, var=self.var)
+    
+    @classmethod
+    def load(cls, path: str) -> 'DemandForecaster':
+        """Restore an estimator written by save."""
+        with np.load(path) as state:
+            forecaster = cls(int(state['n_routes']), int(state['max_days']), float(state['decay']))
+            forecaster.count[...] = state['count']
+            forecaster.mean[...] = state['mean']
+            forecaster.var[...] = state['var']
+        return forecaster
+
+
+class ForecastPricingModel:
+    """
+    Pricing model that prices on a blend of today's and expected future demand.
+    
+    Wraps another model: the demand level it is quoted with is replaced by
+    (1 - forecast_weight) * today + forecast_weight * the forecaster's mean
+    expected demand over the remaining days, so a flight whose strong days
+    are still ahead is priced up and one whose demand is tailing off is
+    priced down. Revenue is still computed from the actual demand.
+    """
+    
+    def __init__(self,
+                 pricing_model: Any,
+                 forecaster: DemandForecaster,
+                 forecast_weight: float = 0.5):
+        """
+        Initialize the wrapper.
+        
+        Args:
+            pricing_model: Underlying pricing model
+            forecaster: Demand forecaster consulted on every quote
+            forecast_weight: Weight of the forecast in the demand level (0-1)
+        """
+        self.pricing_model = pricing_model
+        self.forecaster = forecaster
+        self.forecast_weight = forecast_weight
+        self.flight_id = 0
+    
+    def set_flight(self, flight_id: int) -> None:
+        """Select the flight (and so the route) that scalar quotes are for."""
+        self.flight_id = flight_id
+    
+    def _blend(self, flight_ids: Any, days_left: Any, demand_level: Any) -> Any:
+        """Demand level the underlying model is quoted with."""
+        future = self.forecaster.expected_future_demand(flight_ids, days_left)
+        blended = (1 - self.forecast_weight) * np.asarray(demand_level, dtype=float) \
+            + self.forecast_weight * future
+        # No forecast (unseen cells or last day): price on today's demand
+        return np.where(np.isnan(future), demand_level, blended)
+    
+    def calculate_price(self, days_left: int, tickets_left: float, demand_level: float) -> float:
+        """
+        Calculate the ticket price for the current flight.
+        
+        Args:
+            days_left: Number of days until flight
+            tickets_left: Number of seats remaining
+            demand_level: Today's demand level
+        
+        Returns:
+            float: Ticket price
+        """
+        demand = float(self._blend(self.flight_id, days_left, demand_level))
+        return self.pricing_model.calculate_price(days_left, tickets_left, demand)
+    
+    def calculate_revenue(self,
+                          price: float,
+                          demand_level: float,
+                          tickets_left: float) -> Tuple[float, float]:
+        """Calculate (revenue, quantity_sold) with the underlying model."""
+        return self.pricing_model.calculate_revenue(price, demand_level, tickets_left)
+    
+    def calculate_prices(self,
+                         days_left: np.ndarray,
+                         tickets_left: np.ndarray,
+                         demand_level: np.ndarray,
+                         flight_ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Vectorized counterpart of calculate_price.
+        
+        Args:
+            days_left: Days until flight for each quote
+            tickets_left: Seats remaining for each quote
+            demand_level: Today's demand level for each quote
+            flight_ids: Flight of each quote (defaults to the current flight)
+        
+        Returns:
+            np.ndarray: Ticket prices
+        """
+        flight_ids = self.flight_id if flight_ids is None else flight_ids
+        demand = self._blend(flight_ids, days_left, demand_level)
+        return self.pricing_model.calculate_prices(days_left, tickets_left, demand)
+    
+    def calculate_revenues(self,
+                           prices: np.ndarray,
+                           demand_level: np.ndarray,
+                           tickets_left: Any) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized (revenue, quantity_sold) from the underlying model."""
+        return self.pricing_model.calculate_revenues(prices, demand_level, tickets_left)
@@ -0,0 +1,259 @@
+"""
+Dynamic-programming pricing model for the problem.txt demand model.
+"""
+
+import os
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+from ..utils.events import EventSink
+from ..utils.files import unique_sibling
+
+
+class OptimalPricingModel:
+    """
+    Expected-revenue-optimal pricing policy solved by backward induction.
+    
+    Follows the model in problem.txt: each day's demand level is drawn
+    uniformly from [demand_low, demand_high], and at price p the airline
+    sells min(demand_level - p, tickets_left) seats. Choosing a price is
+    therefore equivalent to choosing an integer quantity q and charging
+    demand_level - q.
+    
+    The value table V[days_left, tickets_left] (expected revenue from
+    following the optimal policy) is built once and cached on disk.
+    
+    Today's objective q * (D - q) + V[t - 1, s - q] is concave in q (V is
+    concave in seats), so selling one more seat pays off exactly while D
+    exceeds 2q + 1 + V[t - 1, s - q] - V[t - 1, s - q - 1]. These
+    thresholds are increasing in q and are precomputed per (days, seats),
+    so a quote is a table lookup plus a search of one threshold row.
+    """
+    
+    # Bump when build_value_table changes, so stale cached tables are not loaded
+    ALGORITHM_VERSION = 2
+    
+    def __init__(self,
+                 horizon: int = 100,
+                 total_seats: int = 50,
+                 demand_low: float = 100,
+                 demand_high: float = 200,
+                 demand_points: int = 101,
+                 cache_dir: Optional[str] = '.cache/pricing',
+                 events: Optional[EventSink] = None):
+        """
+        Initialize the model and build (or load) the value table.
+        
+        Args:
+            horizon: Maximum number of days before departure
+            total_seats: Seat capacity
+            demand_low: Lower bound of the daily demand distribution
+            demand_high: Upper bound of the daily demand distribution
+            demand_points: Number of grid points discretizing demand
+            cache_dir: Directory for the cached value table, or None to
+                disable caching
+            events: Sink for log messages (defaults to summary level)
+        """
+        self.horizon = horizon
+        self.total_seats = total_seats
+        self.demand_low = demand_low
+        self.demand_high = demand_high
+        self.demand_points = demand_points
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.events = events or EventSink()
+        
+        self.value_table = self._load_or_build()
+        self.thresholds = self._build_thresholds()
+    
+    @property
+    def cache_path(self) -> Optional[Path]:
+        """Path of the cached value table for this configuration."""
+        if self.cache_dir is None:
+            return None
+        name = (f"dp_value_v{self.ALGORITHM_VERSION}_h{self.horizon}_c{self.total_seats}"
+                f"_u{self.demand_low:g}-{self.demand_high:g}_n{self.demand_points}.npy")
+        return self.cache_dir / name
+    
+    def _load_or_build(self) -> np.ndarray:
+        """Load the value table from the cache, building it on a miss."""
+        path = self.cache_path
+        if path is not None and path.exists():
+            try:
+                return np.load(path)
+            except Exception as e:
+                self.events.summary(f"Error loading cached value table: {str(e)}")
+        
+        table = self.build_value_table()
+        
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Private temporary file, so concurrent builders never share it
+            tmp_path = unique_sibling(path)
+            try:
+                np.save(tmp_path, table)
+                os.replace(tmp_path, path)
+            finally:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+        return table
+    
+    def build_value_table(self) -> np.ndarray:
+        """
+        Solve the pricing problem by backward induction.
+        
+        Each day is vectorized over the demand grid, remaining seats and
+        candidate quantities at once.
+        
+        Returns:
+            np.ndarray: V of shape (horizon + 1, total_seats + 1)
+        """
+        capacity = self.total_seats
+        demand = np.linspace(self.demand_low, self.demand_high, self.demand_points)
+        seats = np.arange(capacity + 1)
+        quantity = np.arange(capacity + 1)
+        
+        # Immediate revenue q * (D - q), only for quantities the demand supports
+        immediate = quantity[None, :] * (demand[:, None] - quantity[None, :])
+        immediate = np.where(quantity[None, :] <= demand[:, None], immediate, -np.inf)
+        
+        feasible = quantity[None, :] <= seats[:, None]
+        leftover = np.clip(seats[:, None] - quantity[None, :], 0, None)
+        
+        value = np.zeros((self.horizon + 1, capacity + 1))
+        for days in range(1, self.horizon + 1):
+            future = np.where(feasible, value[days - 1][leftover], -np.inf)
+            # Shape (demand, seats, quantity): best quantity for every pair
+            best = (immediate[:, None, :] + future[None, :, :]).max(axis=2)
+            value[days] = best.mean(axis=0)
+        
+        return value
+    
+    def _build_thresholds(self) -> np.ndarray:
+        """
+        Demand above which selling one more seat increases the objective.
+        
+        Returns:
+            np.ndarray: T of shape (horizon + 1, total_seats + 1, total_seats)
+            with T[t, s, q] = 2q + 1 + V[t - 1, s - q] - V[t - 1, s - q - 1]
+            for q < s and +inf otherwise (row t = 0 is unused)
+        """
+        capacity = self.total_seats
+        seats = np.arange(capacity + 1)[:, None]
+        quantity = np.arange(capacity)[None, :]
+        leftover = seats - quantity
+        valid = leftover >= 1
+        leftover = np.where(valid, leftover, 1)
+        
+        marginal = self.value_table[:-1, leftover] - self.value_table[:-1, leftover - 1]
+        thresholds = np.full((self.horizon + 1, capacity + 1, capacity), np.inf)
+        thresholds[1:] = np.where(valid, 2 * quantity + 1 + marginal, np.inf)
+        return thresholds
+    
+    def _horizon_error(self) -> ValueError:
+        """Error for quotes beyond the horizon the table was built for."""
+        return ValueError(f"days_left exceeds the model horizon of {self.horizon} days; "
+                          f"build the model with a larger horizon")
+    
+    def _optimal_quantity(self, days_left: int, tickets_left: int, demand_level: float) -> int:
+        """Best integer quantity to sell today: the thresholds below the demand."""
+        if days_left > self.horizon:
+            raise self._horizon_error()
+        days = max(int(days_left), 1)
+        seats = min(int(tickets_left), self.total_seats)
+        quantity = int(self.thresholds[days, seats].searchsorted(demand_level))
+        # Concave objective, so capping at the feasible maximum stays optimal
+        return min(quantity, seats, int(np.floor(demand_level)))
+    
+    def calculate_price(self,
+                        days_left: int,
+                        tickets_left: int,
+                        demand_level: float) -> float:
+        """
+        Calculate the expected-revenue-optimal ticket price.
+        
+        Args:
+            days_left: Number of days until flight
+            tickets_left: Number of seats remaining
+            demand_level: Current demand level
+            
+        Returns:
+            float: Optimal ticket price
+            
+        Raises:
+            ValueError: If days_left exceeds the model horizon
+        """
+        if tickets_left <= 0:
+            return 0
+        return float(demand_level - self._optimal_quantity(days_left, tickets_left, demand_level))
+    
+    def calculate_revenue(self,
+                          price: float,
+                          demand_level: float,
+                          tickets_left: int) -> Tuple[float, float]:
+        """
+        Calculate revenue and quantity sold under the problem.txt demand model.
+        
+        Args:
+            price: Ticket price
+            demand_level: Current demand level
+            tickets_left: Number of seats remaining
+            
+        Returns:
+            Tuple[float, float]: (revenue, quantity_sold)
+        """
+        quantity = max(0, min(demand_level - price, tickets_left))
+        return price * quantity, quantity
+    
+    def calculate_prices(self,
+                         days_left: np.ndarray,
+                         tickets_left: np.ndarray,
+                         demand_level: np.ndarray) -> np.ndarray:
+        """
+        Vectorized counterpart of calculate_price.
+        
+        Args:
+            days_left: Days until flight for each quote
+            tickets_left: Seats remaining for each quote
+            demand_level: Current demand level for each quote
+            
+        Returns:
+            np.ndarray: Optimal ticket prices (0 where no seats are left)
+            
+        Raises:
+            ValueError: If any days_left exceeds the model horizon
+        """
+        days_left, tickets_left, demand_level = np.broadcast_arrays(
+            np.asarray(days_left), np.asarray(tickets_left), np.asarray(demand_level, dtype=float))
+        if days_left.size and days_left.max() > self.horizon:
+            raise self._horizon_error()
+        days = np.maximum(days_left.astype(np.int64), 1).ravel()
+        seats = np.clip(tickets_left.astype(np.int64), 0, self.total_seats).ravel()
+        demand = demand_level.ravel()
+        
+        # Count of thresholds below the demand, capped at the feasible maximum
+        quantity = (self.thresholds[days, seats] < demand[:, None]).sum(axis=1)
+        quantity = np.minimum(quantity, np.minimum(seats, np.floor(demand).astype(np.int64)))
+        
+        prices = demand - quantity
+        prices = np.where(tickets_left.ravel() > 0, prices, 0.0)
+        return prices.reshape(demand_level.shape)
+    
+    def calculate_revenues(self,
+                           price: np.ndarray,
+                           demand_level: np.ndarray,
+                           tickets_left: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized counterpart of calculate_revenue.
+        
+        Args:
+            price: Ticket prices
+            demand_level: Current demand levels
+            tickets_left: Seats remaining
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (revenues, quantities_sold)
+        """
+        quantity = np.maximum(0, np.minimum(np.asarray(demand_level) - price, tickets_left))
+        return price * quantity, quantity
@@ -0,0 +1,91 @@
+"""
+Vectorized versions of the pricing_function heuristic for batch quoting.
+"""
+
+import numpy as np
+
+
+def pricing_function_batch(days_left, tickets_left, demand_level):
+    """
+    Vectorized pricing_function over arrays of quotes.
+    
+    Inputs broadcast against each other; every element equals the scalar
+    pricing_function.pricing_function (repository root) result for the
+    same inputs.
+    
+    Args:
+        days_left (array-like): Days until the flight
+        tickets_left (array-like): Seats remaining
+        demand_level (array-like): Current demand level
+    
+    Returns:
+        np.ndarray: Ticket prices (0 where no tickets are left)
+    """
+    days_left, tickets_left, demand_level = np.broadcast_arrays(
+        np.asarray(days_left, dtype=float),
+        np.asarray(tickets_left, dtype=float),
+        np.asarray(demand_level, dtype=float))
+    # At least 1-d so the in-place ufuncs also work for scalar quotes
+    shape = days_left.shape
+    days_left, tickets_left, demand_level = np.atleast_1d(days_left, tickets_left, demand_level)
+    
+    # In-place operations in the scalar order keep results bit-identical
+    base_price = 900
+    demand_factor = (demand_level - 25) / 25
+    np.maximum(demand_factor, 0, out=demand_factor)
+    demand_factor += 1
+    
+    total_seats = 50
+    inventory_factor = 1 - tickets_left/total_seats
+    np.maximum(inventory_factor, 0, out=inventory_factor)
+    inventory_factor *= 0.3
+    inventory_factor += 1
+    
+    time_factor = 1 - days_left/30
+    np.maximum(time_factor, 0, out=time_factor)
+    time_factor *= 0.2
+    time_factor += 1
+    
+    optimal_price = base_price * demand_factor
+    optimal_price *= inventory_factor
+    optimal_price *= time_factor
+    
+    # Demand level adjustment (multiplying by 1.0 is exact)
+    adjustment = np.ones_like(optimal_price)
+    np.putmask(adjustment, demand_level > 30, 1.1)
+    np.putmask(adjustment, demand_level < 20, 0.95)
+    optimal_price *= adjustment
+    
+    # Last minute pricing
+    adjustment.fill(1.1)
+    np.putmask(adjustment, tickets_left > 20, 0.9)
+    np.putmask(adjustment, days_left > 3, 1.0)
+    optimal_price *= adjustment
+    
+    np.minimum(optimal_price, 1200, out=optimal_price)
+    np.maximum(optimal_price, 800, out=optimal_price)
+    np.putmask(optimal_price, tickets_left <= 0, 0.0)
+    return optimal_price.reshape(shape)
+
+
+def calculate_expected_revenue_batch(price, demand_level, tickets_left):
+    """
+    Vectorized pricing_function.calculate_expected_revenue over arrays of quotes.
+    """
+    price, demand_level, tickets_left = np.broadcast_arrays(
+        np.asarray(price, dtype=float),
+        np.asarray(demand_level, dtype=float),
+        np.asarray(tickets_left))
+    shape = price.shape
+    price, demand_level, tickets_left = np.atleast_1d(price, demand_level, tickets_left)
+    
+    price_elasticity = 0.5
+    actual_demand = (price - 900) * price_elasticity
+    actual_demand /= 900
+    np.subtract(1, actual_demand, out=actual_demand)
+    actual_demand *= demand_level
+    np.minimum(actual_demand, demand_level, out=actual_demand)
+    np.maximum(actual_demand, 0, out=actual_demand)
+    
+    quantity = np.minimum(actual_demand, tickets_left, out=actual_demand)
+    return (price * quantity).reshape(shape)
@@ -2,7 +2,40 @@
 Pricing model implementation for airline ticket pricing optimization.
 """
 
-from typing import Tuple
+from dataclasses import dataclass, replace
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class PricingParameters:
+    """Tunable knobs of BusinessClassPricingModel."""
+    
+    base_price: float = 900
+    min_price: float = 800
+    max_price: float = 1200
+    price_elasticity: float = 0.5
+    
+    # Demand factor: 1 + max(0, (demand - demand_pivot) / demand_scale)
+    demand_pivot: float = 25
+    demand_scale: float = 25
+    high_demand_threshold: float = 30
+    high_demand_premium: float = 1.1
+    low_demand_threshold: float = 20
+    low_demand_discount: float = 0.95
+    
+    # Inventory and time pressure factors
+    total_seats: float = 50
+    inventory_weight: float = 0.3
+    time_horizon: float = 30
+    time_weight: float = 0.2
+    
+    # Last-minute pricing
+    last_minute_days: float = 3
+    last_minute_seat_threshold: float = 20
+    last_minute_discount: float = 0.9
+    last_minute_premium: float = 1.1
 
 
 class BusinessClassPricingModel:
@@ -12,7 +45,8 @@ class BusinessClassPricingModel:
                  base_price: float = 900,
                  min_price: float = 800,
                  max_price: float = 1200,
-                 price_elasticity: float = 0.5):
+                 price_elasticity: float = 0.5,
+                 parameters: Optional[PricingParameters] = None):
         """
         Initialize the pricing model.
         
@@ -21,11 +55,34 @@ class BusinessClassPricingModel:
             min_price: Minimum allowed price
             max_price: Maximum allowed price
             price_elasticity: Price elasticity of demand (0-1)
+            parameters: Full parameter set; overrides the arguments above
         """
-        self.base_price = base_price
-        self.min_price = min_price
-        self.max_price = max_price
-        self.price_elasticity = price_elasticity
+        if parameters is None:
+            parameters = PricingParameters(base_price=base_price,
+                                           min_price=min_price,
+                                           max_price=max_price,
+                                           price_elasticity=price_elasticity)
+        self.parameters = parameters
+    
+    @property
+    def base_price(self) -> float:
+        return self.parameters.base_price
+    
+    @property
+    def min_price(self) -> float:
+        return self.parameters.min_price
+    
+    @property
+    def max_price(self) -> float:
+        return self.parameters.max_price
+    
+    @property
+    def price_elasticity(self) -> float:
+        return self.parameters.price_elasticity
+    
+    def with_parameters(self, **changes) -> 'BusinessClassPricingModel':
+        """Return a copy of the model with some parameters changed."""
+        return BusinessClassPricingModel(parameters=replace(self.parameters, **changes))
     
     def calculate_price(self, 
                        days_left: int, 
@@ -44,35 +101,35 @@ class BusinessClassPricingModel:
         """
         if tickets_left <= 0:
             return 0
+        p = self.parameters
         
         # Calculate demand factor
-        demand_factor = 1 + max(0, (demand_level - 25) / 25)
+        demand_factor = 1 + max(0, (demand_level - p.demand_pivot) / p.demand_scale)
         
         # Calculate inventory factor
-        total_seats = 50  # Business class capacity
-        inventory_factor = 1 + max(0, (1 - tickets_left/total_seats)) * 0.3
+        inventory_factor = 1 + max(0, (1 - tickets_left/p.total_seats)) * p.inventory_weight
         
         # Calculate time factor
-        time_factor = 1 + max(0, (1 - days_left/30)) * 0.2
+        time_factor = 1 + max(0, (1 - days_left/p.time_horizon)) * p.time_weight
         
         # Calculate optimal price
-        optimal_price = self.base_price * demand_factor * inventory_factor * time_factor
+        optimal_price = p.base_price * demand_factor * inventory_factor * time_factor
         
         # Apply demand-based adjustments
-        if demand_level > 30:
-            optimal_price *= 1.1  # High demand premium
-        elif demand_level < 20:
-            optimal_price *= 0.95  # Low demand discount
+        if demand_level > p.high_demand_threshold:
+            optimal_price *= p.high_demand_premium
+        elif demand_level < p.low_demand_threshold:
+            optimal_price *= p.low_demand_discount
         
         # Apply last-minute pricing
-        if days_left <= 3:
-            if tickets_left > 20:
-                optimal_price *= 0.9  # Last-minute discount
+        if days_left <= p.last_minute_days:
+            if tickets_left > p.last_minute_seat_threshold:
+                optimal_price *= p.last_minute_discount
             else:
-                optimal_price *= 1.1  # Last-minute premium
+                optimal_price *= p.last_minute_premium
         
         # Ensure price stays within bounds
-        return max(self.min_price, min(optimal_price, self.max_price))
+        return max(p.min_price, min(optimal_price, p.max_price))
     
     def calculate_revenue(self, 
                          price: float, 
@@ -97,4 +154,104 @@ class BusinessClassPricingModel:
         quantity = min(actual_demand, tickets_left)
         revenue = price * quantity
         
-        return revenue, quantity 
\ No newline at end of file
+        return revenue, quantity 
+    
+    def calculate_prices(self,
+                         days_left: np.ndarray,
+                         tickets_left: np.ndarray,
+                         demand_level: np.ndarray) -> np.ndarray:
+        """
+        Vectorized counterpart of calculate_price.
+        
+        Evaluates the same formula element-wise, with the branches
+        expressed as masks, so each element matches the scalar result.
+        
+        Args:
+            days_left: Days until flight for each quote
+            tickets_left: Seats remaining for each quote
+            demand_level: Current demand level for each quote
+            
+        Returns:
+            np.ndarray: Optimal ticket prices (0 where no seats are left)
+        """
+        days_left, tickets_left, demand_level = np.broadcast_arrays(
+            np.asarray(days_left, dtype=float),
+            np.asarray(tickets_left, dtype=float),
+            np.asarray(demand_level, dtype=float))
+        # At least 1-d so the in-place ufuncs also work for scalar quotes
+        shape = days_left.shape
+        days_left, tickets_left, demand_level = np.atleast_1d(days_left, tickets_left, demand_level)
+        
+        p = self.parameters
+        
+        # Operations run in place but in the scalar path's order, so the
+        # rounding is identical; multiplying by 1.0 leaves values unchanged
+        demand_factor = (demand_level - p.demand_pivot) / p.demand_scale
+        np.maximum(demand_factor, 0, out=demand_factor)
+        demand_factor += 1
+        
+        inventory_factor = 1 - tickets_left/p.total_seats
+        np.maximum(inventory_factor, 0, out=inventory_factor)
+        inventory_factor *= p.inventory_weight
+        inventory_factor += 1
+        
+        time_factor = 1 - days_left/p.time_horizon
+        np.maximum(time_factor, 0, out=time_factor)
+        time_factor *= p.time_weight
+        time_factor += 1
+        
+        optimal_price = p.base_price * demand_factor
+        optimal_price *= inventory_factor
+        optimal_price *= time_factor
+        
+        # Demand-based adjustments (high demand takes precedence, as in
+        # the scalar if/elif)
+        adjustment = np.ones_like(optimal_price)
+        np.putmask(adjustment, demand_level < p.low_demand_threshold, p.low_demand_discount)
+        np.putmask(adjustment, demand_level > p.high_demand_threshold, p.high_demand_premium)
+        optimal_price *= adjustment
+        
+        # Last-minute pricing
+        adjustment.fill(p.last_minute_premium)
+        np.putmask(adjustment, tickets_left > p.last_minute_seat_threshold, p.last_minute_discount)
+        np.putmask(adjustment, days_left > p.last_minute_days, 1.0)
+        optimal_price *= adjustment
+        
+        np.minimum(optimal_price, p.max_price, out=optimal_price)
+        np.maximum(optimal_price, p.min_price, out=optimal_price)
+        np.putmask(optimal_price, tickets_left <= 0, 0.0)
+        return optimal_price.reshape(shape)
+    
+    def calculate_revenues(self,
+                           price: np.ndarray,
+                           demand_level: np.ndarray,
+                           tickets_left: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized counterpart of calculate_revenue.
+        
+        Args:
+            price: Ticket prices
+            demand_level: Current demand levels
+            tickets_left: Seats remaining
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (revenues, quantities_sold)
+        """
+        price, demand_level, tickets_left = np.broadcast_arrays(
+            np.asarray(price, dtype=float),
+            np.asarray(demand_level, dtype=float),
+            np.asarray(tickets_left))
+        shape = price.shape
+        price, demand_level, tickets_left = np.atleast_1d(price, demand_level, tickets_left)
+        
+        actual_demand = (price - self.base_price) * self.price_elasticity
+        actual_demand /= self.base_price
+        np.subtract(1, actual_demand, out=actual_demand)
+        actual_demand *= demand_level
+        np.minimum(actual_demand, demand_level, out=actual_demand)
+        np.maximum(actual_demand, 0, out=actual_demand)
+        
+        quantity = np.minimum(actual_demand, tickets_left, out=actual_demand)
+        revenue = price * quantity
+        
+        return revenue.reshape(shape), quantity.reshape(shape)
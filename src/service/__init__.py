@@ -0,0 +1,3 @@
+"""
+Network services exposing the pricing models.
+"""
\ No newline at end of file
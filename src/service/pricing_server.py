@@ -0,0 +1,386 @@
+"""
+Asyncio HTTP pricing service with micro-batching and a response cache.
+
+Endpoints:
+    POST /quote   body {"days_left": .., "tickets_left": .., "demand_level": ..}
+                  or {"quotes": [{...}, ...]}; returns {"price": ..} or
+                  {"prices": [...]}
+    GET  /stats   latency percentiles, cache hit rate and batch counters
+
+Run with:
+    python -m src.service.pricing_server --port 8080
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..models.pricing_model import BusinessClassPricingModel
+
+
+QuoteKey = Tuple[float, float, float]
+
+
+class PricingService:
+    """Long-lived pricing service wrapping a vectorized pricing model."""
+    
+    def __init__(self,
+                 pricing_model: Optional[Any] = None,
+                 max_batch_size: int = 1024,
+                 max_batch_delay: float = 0.002,
+                 cache_size: int = 100000,
+                 days_step: float = 1.0,
+                 seat_step: float = 0.01,
+                 demand_step: float = 0.01,
+                 latency_window: int = 10000):
+        """
+        Initialize the service.
+        
+        Args:
+            pricing_model: Model providing calculate_prices (defaults to
+                BusinessClassPricingModel)
+            max_batch_size: Maximum number of quotes priced per batch
+            max_batch_delay: Seconds to wait for more quotes before pricing
+                a partial batch
+            cache_size: Maximum number of cached quotes (LRU eviction)
+            days_step: Days left are rounded to this step before pricing
+            seat_step: Seats left are rounded to this step before pricing;
+                a positive seat count never rounds to zero
+            demand_step: Demand levels are rounded to this step before
+                pricing
+            latency_window: Number of recent request latencies kept for
+                the percentile counters
+        """
+        self.pricing_model = pricing_model or BusinessClassPricingModel()
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+        self.cache_size = cache_size
+        self.days_step = days_step
+        self.seat_step = seat_step
+        self.demand_step = demand_step
+        
+        self._cache: 'OrderedDict[QuoteKey, float]' = OrderedDict()
+        self._pending: List[Tuple[QuoteKey, asyncio.Future]] = []
+        self._inflight: Dict[QuoteKey, asyncio.Future] = {}
+        self._batch_ready: Optional[asyncio.Event] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        
+        # Counters
+        self._latencies = np.zeros(latency_window)
+        self._latency_count = 0
+        self.requests = 0
+        self.quotes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.batches = 0
+    
+    def quantize(self, days_left: float, tickets_left: float, demand_level: float) -> QuoteKey:
+        """
+        Map a quote onto its cache key, which is also the quote that is priced.
+        
+        All three inputs are rounded to their steps, so nearby requests
+        share cache entries. With the default steps, whole days and seats
+        to the hundredth (as the simulators carry them) are priced exactly.
+        A positive seat count rounds to at least one seat step, so a quote
+        with seats for sale is never priced as sold out.
+        
+        Raises:
+            ValueError: If an input is not a finite number
+        """
+        days_left, tickets_left, demand_level = float(days_left), float(tickets_left), float(demand_level)
+        if not (math.isfinite(days_left) and math.isfinite(tickets_left) and math.isfinite(demand_level)):
+            raise ValueError("Quote fields must be finite numbers")
+        seats = _snap(tickets_left, self.seat_step)
+        if tickets_left > 0 and seats <= 0:
+            seats = self.seat_step
+        return _snap(days_left, self.days_step), seats, _snap(demand_level, self.demand_step)
+    
+    async def price(self, days_left: float, tickets_left: float, demand_level: float) -> float:
+        """
+        Price one quote, from the cache or via the next micro-batch.
+        
+        Args:
+            days_left: Days until flight
+            tickets_left: Seats remaining
+            demand_level: Current demand level
+            
+        Returns:
+            float: Ticket price for the quantized quote
+        """
+        key = self.quantize(days_left, tickets_left, demand_level)
+        self.quotes += 1
+        
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return cached
+        self.cache_misses += 1
+        
+        # Identical quotes already waiting for a batch share its result;
+        # shielded so one caller giving up does not cancel it for the rest
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            self._pending.append((key, future))
+            self._batch_ready.set()
+        return await asyncio.shield(future)
+    
+    async def _run_batcher(self) -> None:
+        """Collect pending quotes into micro-batches and price them together."""
+        while True:
+            await self._batch_ready.wait()
+            if len(self._pending) < self.max_batch_size:
+                await asyncio.sleep(self.max_batch_delay)
+            
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            if not self._pending:
+                self._batch_ready.clear()
+            
+            # Any error fails this batch's quotes but keeps the batcher alive
+            try:
+                self._price_batch(batch)
+            except Exception as e:
+                for key, future in batch:
+                    self._inflight.pop(key, None)
+                    if not future.done():
+                        future.set_exception(e)
+    
+    def _price_batch(self, batch: List[Tuple[QuoteKey, asyncio.Future]]) -> None:
+        """Price one micro-batch and resolve its futures."""
+        keys = np.array([key for key, _ in batch], dtype=float)
+        prices = self.pricing_model.calculate_prices(keys[:, 0], keys[:, 1], keys[:, 2])
+        self.batches += 1
+        
+        for (key, future), price in zip(batch, np.asarray(prices, dtype=float).tolist()):
+            self._inflight.pop(key, None)
+            self._cache[key] = price
+            # Skip futures that were cancelled while waiting
+            if not future.done():
+                future.set_result(price)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+    
+    def _record_latency(self, seconds: float) -> None:
+        """Store a request latency in the ring buffer."""
+        self._latencies[self._latency_count % len(self._latencies)] = seconds
+        self._latency_count += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get service counters.
+        
+        Returns:
+            Dict with request/quote/batch counts, cache hit rate and p50/p99
+            request latency in milliseconds over the recent window
+        """
+        latencies = self._latencies[:min(self._latency_count, len(self._latencies))]
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            'requests': self.requests,
+            'quotes': self.quotes,
+            'batches': self.batches,
+            'cache_size': len(self._cache),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'cache_hit_rate': self.cache_hits / lookups if lookups else 0.0,
+            'latency_p50_ms': float(np.percentile(latencies, 50) * 1000) if len(latencies) else 0.0,
+            'latency_p99_ms': float(np.percentile(latencies, 99) * 1000) if len(latencies) else 0.0,
+        }
+    
+    async def _handle_quote(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle a POST /quote body."""
+        if 'quotes' in body:
+            prices = await asyncio.gather(*(
+                self.price(q['days_left'], q['tickets_left'], q['demand_level'])
+                for q in body['quotes']))
+            return {'prices': list(prices)}
+        price = await self.price(body['days_left'], body['tickets_left'], body['demand_level'])
+        return {'price': price}
+    
+    async def _handle_connection(self,
+                                 reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter) -> None:
+        """Serve HTTP/1.1 requests on one connection until it closes."""
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except ValueError as e:
+                    # The rest of the stream can't be framed, so answer and close
+                    await _respond(writer, '400 Bad Request', {'error': f"Malformed request: {e}"})
+                    break
+                if request is None:
+                    break
+                method, path, headers, body, start = request
+                
+                status = '200 OK'
+                try:
+                    if method == 'POST' and path == '/quote':
+                        self.requests += 1
+                        payload = await self._handle_quote(json.loads(body or b'{}'))
+                        self._record_latency(time.perf_counter() - start)
+                    elif method == 'GET' and path == '/stats':
+                        payload = self.stats()
+                    else:
+                        status, payload = '404 Not Found', {'error': f"No route for {method} {path}"}
+                except KeyError as e:
+                    status, payload = '400 Bad Request', {'error': f"Missing field {e}"}
+                except (TypeError, ValueError) as e:
+                    status, payload = '400 Bad Request', {'error': str(e)}
+                
+                await _respond(writer, status, payload)
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    async def start(self, host: str = '127.0.0.1', port: int = 8080) -> asyncio.AbstractServer:
+        """
+        Start serving on host:port (port 0 picks a free port).
+        
+        Returns:
+            asyncio.AbstractServer: The running server
+        """
+        self._batch_ready = asyncio.Event()
+        self._batcher = asyncio.create_task(self._run_batcher())
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server
+    
+    @property
+    def port(self) -> int:
+        """Port the service is listening on."""
+        return self._server.sockets[0].getsockname()[1]
+    
+    async def stop(self) -> None:
+        """Stop accepting connections and cancel the batcher."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+
+
+def _snap(value: float, step: float) -> float:
+    """Round value to the nearest multiple of step, without float noise."""
+    return round(round(value / step) * step, 10)
+
+
+async def _respond(writer: asyncio.StreamWriter, status: str, payload: Dict[str, Any]) -> None:
+    """Write one JSON response."""
+    data = json.dumps(payload).encode()
+    writer.write(f"HTTP/1.1 {status}\r\n"
+                 f"Content-Type: application/json\r\n"
+                 f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+    await writer.drain()
+
+
+# (method, path, lower-cased headers, body, arrival perf_counter time)
+Request = Tuple[str, str, Dict[str, str], bytes, float]
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    """
+    Read and parse one HTTP/1.1 request.
+    
+    Args:
+        reader: Connection stream
+    
+    Returns:
+        Request, or None once the client closed the connection
+    
+    Raises:
+        ValueError: If the request line, a header or Content-Length is
+            malformed, or a line is too long
+    """
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    start = time.perf_counter()
+    
+    parts = request_line.decode('latin-1').split()
+    if len(parts) != 3 or not parts[2].startswith('HTTP/'):
+        raise ValueError(f"bad request line {request_line[:100]!r}")
+    method, path, _ = parts
+    
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, colon, value = line.decode('latin-1').partition(':')
+        if not colon or not name.strip():
+            raise ValueError(f"bad header line {line[:100]!r}")
+        headers[name.strip().lower()] = value.strip()
+    
+    length = headers.get('content-length', '0')
+    if not length.isdigit():
+        raise ValueError(f"bad Content-Length {length[:100]!r}")
+    return method, path, headers, await reader.readexactly(int(length)), start
+
+
+async def request_quote(host: str, port: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Minimal client: send one POST /quote and return the decoded response.
+    
+    Args:
+        host: Service host
+        port: Service port
+        payload: Request body
+        
+    Returns:
+        Dict: Decoded JSON response
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        body = json.dumps(payload).encode()
+        writer.write(f"POST /quote HTTP/1.1\r\nHost: {host}\r\n"
+                     f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                     f"Connection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+        
+        await reader.readline()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return json.loads(await reader.readexactly(int(headers['content-length'])))
+    finally:
+        writer.close()
+
+
+async def _serve(host: str, port: int) -> None:
+    service = PricingService()
+    await service.start(host, port)
+    print(f"Pricing service listening on http://{host}:{service.port}")
+    await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the pricing service.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    args = parser.parse_args()
+    asyncio.run(_serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
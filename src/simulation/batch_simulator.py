@@ -0,0 +1,307 @@
+"""
+Vectorized multi-flight simulation engine.
+"""
+
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+from ..models.pricing_model import BusinessClassPricingModel
+from ..utils.data_loader import FlightDataLoader
+from .results import FleetResults
+
+
+class BatchFlightSimulator:
+    """
+    Simulator that advances many flights together, one day at a time.
+    
+    All per-flight state (remaining seats, revenue, daily statistics) lives
+    in NumPy arrays indexed by flight, so the simulator itself holds no
+    mutable per-run state and each flight produces exactly the numbers
+    FlightSimulator.run_simulation would.
+    """
+    
+    def __init__(self,
+                 total_seats: int = 50,
+                 data_path: str = 'data/synthetic/large_airline_pricing_simulation.csv',
+                 data_loader: Optional[FlightDataLoader] = None,
+                 pricing_model: Optional[BusinessClassPricingModel] = None,
+                 discrete: bool = False,
+                 arrivals: Optional[str] = None,
+                 seed: Optional[int] = None):
+        """
+        Initialize the batch simulator.
+        
+        Args:
+            total_seats: Number of seats available on each flight
+            data_path: Path to the synthetic data file (ignored if
+                data_loader is given)
+            data_loader: Already-loaded data loader to reuse
+            pricing_model: Pricing model; must provide calculate_prices
+                and calculate_revenues
+            discrete: Sell whole seats from integer inventory (see
+                simulate_paths)
+            arrivals: None, 'poisson' or 'binomial' random arrivals in
+                discrete mode
+            seed: Seed for random arrivals
+        """
+        self.total_seats = total_seats
+        self.pricing_model = pricing_model or BusinessClassPricingModel()
+        self.discrete = discrete
+        self.arrivals = arrivals
+        self.rng = np.random.default_rng(seed)
+        
+        if data_loader is None:
+            data_loader = FlightDataLoader(data_path)
+            data_loader.load_data()
+        self.data_loader = data_loader
+    
+    def demand_paths(self, flight_ids: Sequence[int]) -> np.ndarray:
+        """
+        Build the (n_flights, n_days) demand matrix in simulation-day order.
+        
+        Missing records fall back to random demand, as in the scalar path
+        (drawn from the loader's forecaster if it has one).
+        
+        Args:
+            flight_ids: Flight identifiers
+            
+        Returns:
+            np.ndarray: Demand for each flight (row) and simulated day (column)
+        """
+        max_days = self.data_loader.max_days
+        trajectories = self.data_loader.get_flight_trajectories(flight_ids)
+        # Day index d corresponds to max_days - d days before departure
+        paths = trajectories['demand'][:, max_days:0:-1].copy()
+        
+        missing = np.isnan(paths)
+        if missing.any():
+            forecaster = getattr(self.data_loader, 'forecaster', None)
+            if forecaster is not None:
+                rows, days = np.nonzero(missing)
+                paths[missing] = forecaster.sample_batch(np.asarray(flight_ids)[rows], max_days - days)
+            else:
+                paths[missing] = np.random.uniform(20, 40, size=int(missing.sum()))
+        return paths
+    
+    def run_flights(self, flight_ids: Sequence[int]) -> Dict[str, np.ndarray]:
+        """
+        Simulate every given flight from the loaded data in one batch.
+        
+        Args:
+            flight_ids: Flight identifiers
+            
+        Returns:
+            Dict of batch results (see run)
+        """
+        results = self.run(self.demand_paths(flight_ids))
+        results['flight_ids'] = np.asarray(flight_ids)
+        return results
+    
+    def run_fleet(self, flight_ids: Sequence[int]) -> FleetResults:
+        """
+        Simulate flights in one batch and return them as a FleetResults block.
+        
+        Args:
+            flight_ids: Flight identifiers
+            
+        Returns:
+            FleetResults: Stacked per-flight results
+        """
+        return FleetResults.from_batch(self.run_flights(flight_ids))
+    
+    def run_flight_stream(self,
+                          flights: Iterable[Tuple[int, Dict[str, np.ndarray]]],
+                          batch_size: int = 4096) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Simulate flights from a trajectory stream in bounded-size batches.
+        
+        Pairs with FlightDataLoader.iter_flights to process datasets that do
+        not fit in memory; only one batch of flights is held at a time.
+        
+        Args:
+            flights: Iterable of (flight_id, trajectory) pairs whose 'demand'
+                arrays all have the same length (max_days + 1)
+            batch_size: Number of flights simulated together
+            
+        Yields:
+            Dict of batch results (see run) with 'flight_ids'
+        """
+        flight_ids: List[int] = []
+        paths: List[np.ndarray] = []
+        
+        def run_batch():
+            demand = np.array(paths, dtype=float)
+            missing = np.isnan(demand)
+            if missing.any():
+                demand[missing] = np.random.uniform(20, 40, size=int(missing.sum()))
+            results = self.run(demand)
+            results['flight_ids'] = np.array(flight_ids)
+            return results
+        
+        for flight_id, trajectory in flights:
+            # Day index d corresponds to max_days - d days before departure
+            flight_ids.append(flight_id)
+            paths.append(trajectory['demand'][:0:-1])
+            if len(flight_ids) == batch_size:
+                yield run_batch()
+                flight_ids, paths = [], []
+        
+        if flight_ids:
+            yield run_batch()
+    
+    def run(self, demand_paths: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Simulate N flights over given demand paths.
+        
+        Args:
+            demand_paths: Array of shape (n_flights, n_days); column d is the
+                demand on simulated day d, with n_days - d days left
+            
+        Returns:
+            Dict with 'total_revenue', 'remaining_seats' and 'days_active'
+            of shape (n_flights,), and 'daily_revenue', 'daily_prices',
+            'daily_demand', 'daily_sales' of shape (n_flights, n_days).
+            Days after a flight sells out are recorded as 0 revenue/sales
+            and NaN price/demand.
+        """
+        return simulate_paths(demand_paths, self.total_seats, self.pricing_model,
+                              discrete=self.discrete, arrivals=self.arrivals, rng=self.rng)
+    
+    @staticmethod
+    def flight_result(results: Dict[str, np.ndarray], index: int) -> Dict[str, Any]:
+        """
+        Extract one flight's results in the FlightSimulator.run_simulation format.
+        
+        Args:
+            results: Batch results from run or run_flights
+            index: Row of the flight within the batch
+            
+        Returns:
+            Dict containing simulation results for that flight
+        """
+        n = int(results['days_active'][index])
+        return {
+            'total_revenue': float(results['total_revenue'][index]),
+            'remaining_seats': float(results['remaining_seats'][index]),
+            'daily_revenue': results['daily_revenue'][index, :n].tolist(),
+            'daily_prices': results['daily_prices'][index, :n].tolist(),
+            'daily_demand': results['daily_demand'][index, :n].tolist(),
+            'daily_sales': results['daily_sales'][index, :n].tolist()
+        }
+    
+    @property
+    def available_flights(self) -> List[int]:
+        """Get list of available flight IDs."""
+        return self.data_loader.available_flight_ids
+
+
+def simulate_paths(demand_paths: np.ndarray,
+                   total_seats: int,
+                   pricing_model: Any,
+                   discrete: bool = False,
+                   arrivals: Optional[str] = None,
+                   rng: Optional[np.random.Generator] = None) -> Dict[str, np.ndarray]:
+    """
+    Simulate N flights over given demand paths with one pricing model.
+    
+    In the default continuous mode the model's (fractional) quantity is
+    sold, exactly as in FlightSimulator. In discrete mode inventory is an
+    integer array and whole seats are sold. The uncapped quantity of the
+    model's own market response (calculate_revenues) at the chosen price
+    is rounded down, or used as the mean of Poisson arrivals, or as the
+    expected count of Binomial(floor(demand_level), quantity /
+    demand_level) arrivals, and then capped at the seats left. The market
+    response is the model's: a floored elasticity response for
+    BusinessClassPricingModel, and problem.txt's demand_level - price for
+    OptimalPricingModel.
+    
+    Args:
+        demand_paths: Array of shape (n_flights, n_days); column d is the
+            demand on simulated day d, with n_days - d days left
+        total_seats: Seats available on each flight
+        pricing_model: Object providing calculate_prices and
+            calculate_revenues
+        discrete: Sell whole seats from integer inventory
+        arrivals: None, 'poisson' or 'binomial' (discrete mode only)
+        rng: Generator for random arrivals
+        
+    Returns:
+        Dict of batch results (see BatchFlightSimulator.run); in discrete
+        mode 'remaining_seats' and 'daily_sales' are integer arrays
+    """
+    if arrivals not in (None, 'poisson', 'binomial'):
+        raise ValueError(f"Unknown arrival model: {arrivals}")
+    if arrivals is not None and not discrete:
+        raise ValueError("Random arrivals require discrete=True")
+    rng = rng or np.random.default_rng()
+    
+    demand_paths = np.asarray(demand_paths, dtype=float)
+    n_flights, n_days = demand_paths.shape
+    
+    if discrete:
+        seat_dtype = np.int16 if total_seats <= np.iinfo(np.int16).max else np.int32
+        remaining_seats = np.full(n_flights, total_seats, dtype=seat_dtype)
+        daily_sales = np.zeros((n_flights, n_days), dtype=seat_dtype)
+    else:
+        remaining_seats = np.full(n_flights, float(total_seats))
+        daily_sales = np.zeros((n_flights, n_days))
+    total_revenue = np.zeros(n_flights)
+    days_active = np.zeros(n_flights, dtype=np.int64)
+    
+    daily_revenue = np.zeros((n_flights, n_days))
+    daily_prices = np.full((n_flights, n_days), np.nan)
+    daily_demand = np.full((n_flights, n_days), np.nan)
+    
+    for day in range(n_days):
+        active = remaining_seats > 0
+        if not active.any():
+            break
+        
+        demand = demand_paths[active, day]
+        seats = remaining_seats[active]
+        
+        prices = pricing_model.calculate_prices(n_days - day, seats, demand)
+        if discrete:
+            quantity = _discrete_sales(pricing_model, prices, demand, seats, arrivals, rng)
+            revenue = prices * quantity
+        else:
+            revenue, quantity = pricing_model.calculate_revenues(prices, demand, seats)
+        
+        total_revenue[active] += revenue
+        remaining_seats[active] = seats - quantity
+        days_active[active] += 1
+        
+        daily_revenue[active, day] = revenue
+        daily_prices[active, day] = prices
+        daily_demand[active, day] = demand
+        daily_sales[active, day] = quantity
+    
+    return {
+        'total_revenue': total_revenue,
+        'remaining_seats': remaining_seats,
+        'days_active': days_active,
+        'daily_revenue': daily_revenue,
+        'daily_prices': daily_prices,
+        'daily_demand': daily_demand,
+        'daily_sales': daily_sales
+    }
+
+
+def _discrete_sales(pricing_model: Any,
+                    prices: np.ndarray,
+                    demand: np.ndarray,
+                    seats: np.ndarray,
+                    arrivals: Optional[str],
+                    rng: np.random.Generator) -> np.ndarray:
+    """Whole seats sold today from the model's market response, capped at the seats left."""
+    _, expected = pricing_model.calculate_revenues(prices, demand, np.inf)
+    if arrivals == 'poisson':
+        sold = rng.poisson(expected)
+    elif arrivals == 'binomial':
+        trials = np.floor(demand).astype(np.int64)
+        probability = np.clip(expected / np.maximum(demand, 1e-12), 0, 1)
+        sold = rng.binomial(trials, probability)
+    else:
+        # Tolerance keeps e.g. demand - (demand - q) == q - 1e-13 at q
+        sold = np.floor(expected + 1e-9)
+    return np.minimum(sold, seats).astype(seats.dtype)
@@ -0,0 +1,477 @@
+"""
+Sharded flight simulation across processes or machines over TCP.
+
+A SimulationCoordinator splits the flights into work units and serves
+them to SimulationWorker processes, which run each unit through a
+FlightSimulator and send back the compact per-flight results. Messages
+are length-prefixed frames holding a JSON header followed by the raw
+bytes of any NumPy arrays it describes, so no pickling crosses the wire.
+"""
+
+import json
+import multiprocessing
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from typing import Any, BinaryIO, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..utils.events import EventSink, TRACE_OFF
+from .results import FleetResults, _DAILY_KEYS
+from .simulator import FlightSimulator
+
+
+# Frame prefix: JSON header length, array body length
+_FRAME = struct.Struct('!II')
+
+# Fill for the days after a flight sold out, as in FleetResults
+_DAILY_FILL = {'daily_revenue': 0.0, 'daily_prices': np.nan,
+               'daily_demand': np.nan, 'daily_sales': 0.0}
+
+
+def send_message(sock: socket.socket,
+                 header: Mapping[str, Any],
+                 arrays: Optional[Mapping[str, np.ndarray]] = None) -> None:
+    """
+    Send one frame.
+    
+    Args:
+        sock: Connected socket
+        header: JSON-serializable message fields
+        arrays: Arrays to send after the header, by name
+    """
+    specs = []
+    chunks = []
+    for name, array in (arrays or {}).items():
+        array = np.ascontiguousarray(array)
+        specs.append([name, array.dtype.str, list(array.shape)])
+        chunks.append(memoryview(array).cast('B'))
+    
+    head = json.dumps(dict(header, arrays=specs)).encode()
+    sock.sendall(_FRAME.pack(len(head), sum(len(chunk) for chunk in chunks)) + head)
+    for chunk in chunks:
+        sock.sendall(chunk)
+
+
+def recv_message(rfile: BinaryIO) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """
+    Receive one frame.
+    
+    Args:
+        rfile: Buffered binary reader over the socket (socket.makefile('rb'))
+    
+    Returns:
+        Tuple of the header dict and the arrays it carried, by name
+    
+    Raises:
+        ConnectionError: If the peer closed the connection
+    """
+    head_len, body_len = _FRAME.unpack(_read_exact(rfile, _FRAME.size))
+    header = json.loads(_read_exact(rfile, head_len))
+    body = _read_exact(rfile, body_len)
+    
+    arrays = {}
+    offset = 0
+    for name, dtype, shape in header.pop('arrays', []):
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape, dtype=np.int64))
+        arrays[name] = np.frombuffer(body, dtype=dtype, count=count, offset=offset).reshape(shape)
+        offset += count * dtype.itemsize
+    return header, arrays
+
+
+def _read_exact(rfile: BinaryIO, n: int) -> bytes:
+    """Read exactly n bytes or raise ConnectionError."""
+    data = rfile.read(n)
+    if len(data) < n:
+        raise ConnectionError("Connection closed by peer")
+    return data
+
+
+def simulate_unit(simulator: FlightSimulator, flight_ids: Sequence[int]) -> Dict[str, np.ndarray]:
+    """
+    Simulate a work unit and pack the per-flight results as arrays.
+    
+    Args:
+        simulator: Simulator to run each flight through
+        flight_ids: Flights in the unit
+    
+    Returns:
+        Dict with 'flight_ids', 'days_active', 'total_revenue',
+        'remaining_seats' and the (n_flights, n_days) daily arrays
+    """
+    fleet = FleetResults.from_results([simulator.run_simulation(fid) for fid in flight_ids])
+    arrays = {
+        'flight_ids': np.asarray(flight_ids, dtype=np.int64),
+        'days_active': fleet.days_active,
+        'total_revenue': fleet.total_revenue,
+        'remaining_seats': fleet.remaining_seats,
+    }
+    for key, field in _DAILY_KEYS.items():
+        arrays[key] = fleet.daily[field]
+    return arrays
+
+
+class SimulationCoordinator:
+    """
+    Serves work units of flights to workers and merges their results.
+    
+    Each connected worker is handled by its own thread: the coordinator
+    sends the worker the job configuration, then one unit at a time,
+    waiting for the unit's results before sending the next. When no
+    units are left to hand out, an idle worker steals a copy of the
+    oldest unit that has been running for at least steal_after seconds
+    (up to max_copies copies per unit), so a straggler does not hold up
+    the run; the first result to arrive is kept. When a worker's
+    connection drops, or it reports that simulating a unit raised, the
+    unit goes back to the front of the queue unless another worker is
+    still on it. A unit that fails max_attempts times fails the run.
+    """
+    
+    def __init__(self,
+                 flight_ids: Sequence[int],
+                 data_path: str,
+                 total_seats: int = 50,
+                 unit_size: int = 64,
+                 host: str = '127.0.0.1',
+                 port: int = 0,
+                 steal_after: float = 0.5,
+                 max_copies: int = 2,
+                 max_attempts: int = 3,
+                 events: Optional[EventSink] = None):
+        """
+        Initialize the coordinator and start listening.
+        
+        Args:
+            flight_ids: Flights to simulate
+            data_path: Dataset path sent to workers (they may override it)
+            total_seats: Seats per flight
+            unit_size: Flights per work unit
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free one; see address)
+            steal_after: Seconds a unit must have run before idle workers
+                may steal a copy of it
+            max_copies: Most workers running the same unit at once
+            max_attempts: Failed attempts (errors or lost workers) after
+                which a unit fails the run
+            events: Sink for log messages
+        """
+        if not len(flight_ids):
+            raise ValueError("No flights to simulate")
+        flight_ids = [int(fid) for fid in flight_ids]
+        self.units: List[List[int]] = [flight_ids[start:start + unit_size]
+                                       for start in range(0, len(flight_ids), unit_size)]
+        self.config = {'data_path': str(data_path), 'total_seats': total_seats}
+        self.steal_after = steal_after
+        self.max_copies = max_copies
+        self.max_attempts = max_attempts
+        self.events = events or EventSink()
+        
+        self.stats = {'workers': 0, 'dispatched': 0, 'stolen': 0, 'requeued': 0, 'duplicates': 0,
+                      'failures': 0}
+        self._pending = deque(range(len(self.units)))
+        # Unit -> (workers running it, monotonic time it was first sent)
+        self._running: Dict[int, Tuple[set, float]] = {}
+        self._results: Dict[int, Dict[str, np.ndarray]] = {}
+        self._attempts: Dict[int, int] = {}
+        # Reason the run failed, once a unit has used up its attempts
+        self._failure: Optional[str] = None
+        self._cond = threading.Condition()
+        
+        self._server = socket.create_server((host, port))
+        self.address: Tuple[str, int] = self._server.getsockname()[:2]
+        self._acceptor: Optional[threading.Thread] = None
+        self._closed = False
+    
+    @property
+    def done(self) -> bool:
+        """Whether every unit has a result."""
+        return len(self._results) == len(self.units)
+    
+    def start(self) -> None:
+        """Start accepting workers in the background."""
+        if self._acceptor is None:
+            self._acceptor = threading.Thread(target=self._accept, daemon=True)
+            self._acceptor.start()
+    
+    def run(self, timeout: Optional[float] = None) -> FleetResults:
+        """
+        Accept workers and wait until every unit has a result.
+        
+        Args:
+            timeout: Seconds to wait before giving up (None waits forever)
+        
+        Returns:
+            FleetResults: Per-flight results in the order of flight_ids
+        
+        Raises:
+            TimeoutError: If the units did not all finish in time
+            RuntimeError: If a unit failed max_attempts times
+        """
+        self.start()
+        with self._cond:
+            finished = self._cond.wait_for(lambda: self.done or self._failure is not None, timeout)
+        if not finished:
+            raise TimeoutError(f"{len(self._results)} of {len(self.units)} units finished in time")
+        self.close()
+        if self._failure is not None:
+            raise RuntimeError(self._failure)
+        self.events.summary(
+            f"Coordinator: {len(self.units)} units, {self.stats['workers']} workers, "
+            f"{self.stats['stolen']} stolen, {self.stats['requeued']} requeued, "
+            f"{self.stats['failures']} failed attempts")
+        return self.merge()
+    
+    def close(self) -> None:
+        """Stop accepting workers; connected workers are told to stop."""
+        self._server.close()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+    
+    def merge(self) -> FleetResults:
+        """Concatenate the unit results in unit order."""
+        parts = [self._results[unit] for unit in range(len(self.units))]
+        n_days = max(part['daily_revenue'].shape[1] for part in parts)
+        merged = {key: np.concatenate([part[key] for part in parts])
+                  for key in ('flight_ids', 'days_active', 'total_revenue', 'remaining_seats')}
+        for key, fill in _DAILY_FILL.items():
+            merged[key] = np.full((len(merged['flight_ids']), n_days), fill)
+            row = 0
+            for part in parts:
+                block = part[key]
+                merged[key][row:row + len(block), :block.shape[1]] = block
+                row += len(block)
+        return FleetResults.from_batch(merged)
+    
+    def _accept(self) -> None:
+        """Hand every incoming connection to its own thread."""
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            with self._cond:
+                self.stats['workers'] += 1
+                worker = self.stats['workers']
+            threading.Thread(target=self._serve, args=(conn, worker), daemon=True).start()
+    
+    def _serve(self, conn: socket.socket, worker: int) -> None:
+        """Feed one worker units until the run is done or it disconnects."""
+        unit = None
+        reason = 'worker lost'
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            with conn, conn.makefile('rb') as rfile:
+                header, _ = recv_message(rfile)
+                self.events.detail(f"Worker {worker} ({header.get('name')}) connected")
+                send_message(conn, dict(self.config, type='config'))
+                while True:
+                    unit = self._next_unit(worker)
+                    if unit is None:
+                        send_message(conn, {'type': 'stop'})
+                        return
+                    send_message(conn, {'type': 'unit', 'unit': unit, 'flight_ids': self.units[unit]})
+                    header, arrays = recv_message(rfile)
+                    if header.get('type') == 'error' and header.get('unit') == unit:
+                        self.events.summary(f"Worker {worker} failed unit {unit}: {header.get('error')}")
+                        self._release(unit, worker, header.get('error'))
+                    else:
+                        self._check_result(unit, header, arrays)
+                        self._finish(unit, arrays)
+                    unit = None
+        except (OSError, ValueError) as e:
+            reason = f"worker lost: {e}"
+            self.events.summary(f"Worker {worker} lost: {e}")
+        finally:
+            if unit is not None:
+                self._release(unit, worker, reason)
+    
+    def _check_result(self, unit: int, header: Mapping[str, Any], arrays: Mapping[str, np.ndarray]) -> None:
+        """Reject a reply that is not the result of the unit that was sent."""
+        if header.get('type') != 'result' or header.get('unit') != unit:
+            raise ValueError(f"expected the result of unit {unit}, got {header.get('type')} "
+                             f"for unit {header.get('unit')}")
+        if not np.array_equal(arrays.get('flight_ids', ()), self.units[unit]):
+            raise ValueError(f"result of unit {unit} has the wrong flights")
+    
+    def _next_unit(self, worker: int) -> Optional[int]:
+        """Next unit for a worker: a pending one, else a stolen copy; None when done."""
+        with self._cond:
+            while not self.done and not self._closed and self._failure is None:
+                if self._pending:
+                    unit = self._pending.popleft()
+                    self._running[unit] = ({worker}, time.monotonic())
+                    self.stats['dispatched'] += 1
+                    return unit
+                
+                now = time.monotonic()
+                candidates = [(since, unit) for unit, (workers, since) in self._running.items()
+                              if worker not in workers and len(workers) < self.max_copies]
+                if candidates:
+                    since, unit = min(candidates)
+                    if now - since >= self.steal_after:
+                        self._running[unit][0].add(worker)
+                        self.stats['stolen'] += 1
+                        return unit
+                    self._cond.wait(self.steal_after - (now - since))
+                else:
+                    self._cond.wait()
+            return None
+    
+    def _finish(self, unit: int, arrays: Dict[str, np.ndarray]) -> None:
+        """Record a unit's results; later copies of the same unit are dropped."""
+        with self._cond:
+            if unit in self._results:
+                self.stats['duplicates'] += 1
+            else:
+                self._results[unit] = arrays
+            self._running.pop(unit, None)
+            self._cond.notify_all()
+    
+    def _release(self, unit: int, worker: int, reason: str) -> None:
+        """
+        Count a failed attempt at a unit and requeue it unless another worker is still on it.
+        
+        Args:
+            unit: Unit the worker was running
+            worker: Worker that failed or was lost
+            reason: Error reported by the worker, or why it was lost
+        """
+        with self._cond:
+            if unit not in self._results:
+                self.stats['failures'] += 1
+                self._attempts[unit] = self._attempts.get(unit, 0) + 1
+                if self._attempts[unit] >= self.max_attempts and self._failure is None:
+                    self._failure = f"Unit {unit} failed {self._attempts[unit]} times; last error: {reason}"
+            if unit in self._running:
+                workers, _ = self._running[unit]
+                workers.discard(worker)
+                if not workers:
+                    del self._running[unit]
+                    self._pending.appendleft(unit)
+                    self.stats['requeued'] += 1
+            self._cond.notify_all()
+
+
+class SimulationWorker:
+    """
+    Connects to a SimulationCoordinator and simulates the units it sends.
+    """
+    
+    def __init__(self,
+                 address: Tuple[str, int],
+                 data_path: Optional[str] = None,
+                 name: Optional[str] = None,
+                 events: Optional[EventSink] = None):
+        """
+        Initialize the worker.
+        
+        Args:
+            address: Coordinator (host, port)
+            data_path: Local dataset path (defaults to the coordinator's)
+            name: Name reported to the coordinator (defaults to host:pid)
+            events: Sink for log messages (defaults to no output)
+        """
+        self.address = tuple(address)
+        self.data_path = data_path
+        self.name = name or f"{socket.gethostname()}:{multiprocessing.current_process().pid}"
+        self.events = events or EventSink(TRACE_OFF)
+    
+    def run(self, connect_timeout: float = 10.0) -> int:
+        """
+        Work until the coordinator says stop or goes away.
+        
+        Args:
+            connect_timeout: Seconds to keep retrying the first connection
+        
+        Returns:
+            int: Number of units simulated
+        """
+        sock = self._connect(connect_timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        completed = 0
+        try:
+            with sock, sock.makefile('rb') as rfile:
+                send_message(sock, {'type': 'hello', 'name': self.name})
+                config, _ = recv_message(rfile)
+                simulator = FlightSimulator(total_seats=config['total_seats'],
+                                            data_path=self.data_path or config['data_path'],
+                                            events=self.events)
+                while True:
+                    header, _ = recv_message(rfile)
+                    if header['type'] == 'stop':
+                        break
+                    try:
+                        arrays = simulate_unit(simulator, header['flight_ids'])
+                    except Exception as e:
+                        # Report and stay connected; the coordinator decides on retries
+                        send_message(sock, {'type': 'error', 'unit': header['unit'],
+                                            'error': f"{type(e).__name__}: {e}"})
+                        continue
+                    send_message(sock, {'type': 'result', 'unit': header['unit']}, arrays)
+                    completed += 1
+        except ConnectionError:
+            # The coordinator finished without us or died; nothing to hand back
+            pass
+        return completed
+    
+    def _connect(self, timeout: float) -> socket.socket:
+        """Connect, retrying while the coordinator is not listening yet."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return socket.create_connection(self.address)
+            except ConnectionRefusedError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.1)
+
+
+def _worker_main(address: Tuple[str, int], data_path: Optional[str]) -> None:
+    """Process entry point for run_local workers."""
+    SimulationWorker(address, data_path).run()
+
+
+def run_local(flight_ids: Sequence[int],
+              data_path: str,
+              n_workers: int = 2,
+              total_seats: int = 50,
+              unit_size: int = 64,
+              timeout: Optional[float] = None,
+              max_attempts: int = 3,
+              events: Optional[EventSink] = None) -> FleetResults:
+    """
+    Run a coordinator with n_workers worker processes on localhost.
+    
+    Args:
+        flight_ids: Flights to simulate
+        data_path: Path to the synthetic data file
+        n_workers: Worker processes to start
+        total_seats: Seats per flight
+        unit_size: Flights per work unit
+        timeout: Seconds to wait for the run (None waits forever)
+        max_attempts: Failed attempts after which a unit fails the run
+        events: Sink for coordinator log messages
+    
+    Returns:
+        FleetResults: Per-flight results in the order of flight_ids
+    """
+    coordinator = SimulationCoordinator(flight_ids, data_path, total_seats=total_seats,
+                                        unit_size=unit_size, max_attempts=max_attempts, events=events)
+    coordinator.start()
+    workers = [multiprocessing.Process(target=_worker_main, args=(coordinator.address, data_path))
+               for _ in range(n_workers)]
+    for process in workers:
+        process.start()
+    try:
+        return coordinator.run(timeout)
+    finally:
+        coordinator.close()
+        for process in workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
@@ -0,0 +1,317 @@
+"""
+Shared-cabin simulation of several fare classes on the same flights.
+"""
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+import numpy as np
+
+from ..models.pricing_model import BusinessClassPricingModel, PricingParameters
+from ..utils.data_loader import FlightDataLoader
+
+
+# Economy counterpart of the Business defaults, scaled to the synthetic
+# Economy data (prices 200-400, demand 100-200)
+ECONOMY_PARAMETERS = PricingParameters(
+    base_price=300,
+    min_price=200,
+    max_price=400,
+    demand_pivot=150,
+    demand_scale=150,
+    high_demand_threshold=175,
+    low_demand_threshold=125,
+    total_seats=150,
+    last_minute_seat_threshold=60
+)
+
+# Seats per cabin, ordered from the lowest to the highest fare class
+DEFAULT_CABINS = {'Economy': 150, 'Business': 50}
+
+
+def default_pricing_model(class_type: str) -> BusinessClassPricingModel:
+    """
+    Get the default pricing model for a cabin class.
+    
+    Args:
+        class_type: 'Business' or 'Economy'
+    
+    Returns:
+        BusinessClassPricingModel: A fresh model instance for the cabin
+    """
+    if class_type == 'Business':
+        return BusinessClassPricingModel()
+    if class_type == 'Economy':
+        return BusinessClassPricingModel(parameters=ECONOMY_PARAMETERS)
+    raise ValueError(f"No default pricing model for class {class_type}; pass one explicitly")
+
+
+class MultiClassSimulator:
+    """
+    Simulator that sells every cabin of many flights together, day by day.
+    
+    Each cabin has its own seat inventory and its own pricing model
+    instance. On each day every cabin first sells to its own demand; demand
+    turned away by a sold-out (or selling-out) cabin can then move to a
+    neighbouring cabin at that cabin's price for the day: a fraction
+    upgrade_rate buys up into the next higher class and a fraction
+    spill_rate spills down into the next lower one.
+    """
+    
+    def __init__(self,
+                 cabins: Optional[Mapping[str, int]] = None,
+                 data_path: str = 'data/synthetic/large_airline_pricing_simulation.csv',
+                 loaders: Optional[Mapping[str, FlightDataLoader]] = None,
+                 pricing_models: Optional[Mapping[str, Any]] = None,
+                 upgrade_rate: float = 0.0,
+                 spill_rate: float = 0.0):
+        """
+        Initialize the multi-class simulator.
+        
+        Args:
+            cabins: Seats per class, ordered from the lowest to the highest
+                fare class (defaults to DEFAULT_CABINS)
+            data_path: Path to the synthetic data file (ignored if loaders
+                are given)
+            loaders: Already-loaded data loaders keyed by class
+            pricing_models: Pricing models keyed by class; missing classes
+                get default_pricing_model
+            upgrade_rate: Fraction of a cabin's turned-away demand that buys
+                up into the next higher cabin
+            spill_rate: Fraction of a cabin's turned-away demand that spills
+                down into the next lower cabin
+        """
+        self.cabins = dict(cabins or DEFAULT_CABINS)
+        pricing_models = pricing_models or {}
+        self.pricing_models = {name: pricing_models.get(name) or default_pricing_model(name)
+                               for name in self.cabins}
+        self.upgrade_rate = upgrade_rate
+        self.spill_rate = spill_rate
+        
+        if loaders is None:
+            loaders = FlightDataLoader(data_path).load_classes(list(self.cabins))
+        self.loaders = {name: loaders[name] for name in self.cabins}
+    
+    def demand_paths(self, flight_ids: Sequence[int]) -> np.ndarray:
+        """
+        Build the (n_cabins, n_flights, n_days) demand array in simulation-day order.
+        
+        All cabins share the longest horizon among the loaders; days with
+        no record for a cabin have zero demand.
+        
+        Args:
+            flight_ids: Flight identifiers
+        
+        Returns:
+            np.ndarray: Demand for each cabin, flight and simulated day
+        """
+        max_days = max(loader.max_days for loader in self.loaders.values())
+        paths = np.zeros((len(self.cabins), len(flight_ids), max_days))
+        
+        for k, loader in enumerate(self.loaders.values()):
+            demand = loader.get_flight_trajectories(flight_ids)['demand']
+            # Day index d corresponds to max_days - d days before departure
+            days_before = np.arange(max_days, 0, -1)
+            in_range = days_before <= loader.max_days
+            paths[k][:, in_range] = demand[:, days_before[in_range]]
+        
+        return np.nan_to_num(paths, nan=0.0)
+    
+    def run_flights(self, flight_ids: Sequence[int]) -> Dict[str, Any]:
+        """
+        Simulate every cabin of the given flights in one batch.
+        
+        Args:
+            flight_ids: Flight identifiers
+        
+        Returns:
+            Dict of results (see run) with 'flight_ids'
+        """
+        results = self.run(self.demand_paths(flight_ids))
+        results['flight_ids'] = np.asarray(flight_ids)
+        return results
+    
+    def run(self, demand_paths: np.ndarray) -> Dict[str, Any]:
+        """
+        Simulate all cabins of N flights over given demand paths.
+        
+        Args:
+            demand_paths: Array of shape (n_cabins, n_flights, n_days) with
+                cabins in the order of self.cabins
+        
+        Returns:
+            Dict of results (see simulate_cabins) with 'cabins' naming the
+            first axis of the per-cabin arrays
+        """
+        results = simulate_cabins(demand_paths,
+                                  list(self.cabins.values()),
+                                  list(self.pricing_models.values()),
+                                  upgrade_rate=self.upgrade_rate,
+                                  spill_rate=self.spill_rate)
+        results['cabins'] = list(self.cabins)
+        return results
+    
+    @staticmethod
+    def cabin_result(results: Dict[str, Any], cabin: str) -> Dict[str, np.ndarray]:
+        """
+        Extract one cabin's results in the BatchFlightSimulator.run format.
+        
+        Args:
+            results: Results from run or run_flights
+            cabin: Class name
+        
+        Returns:
+            Dict of batch results for that cabin
+        """
+        k = results['cabins'].index(cabin)
+        cabin_results = {
+            'total_revenue': results['cabin_revenue'][k],
+            'remaining_seats': results['remaining_seats'][k],
+            'days_active': results['days_active'][k],
+        }
+        for key in ('daily_revenue', 'daily_prices', 'daily_demand', 'daily_sales', 'daily_transfers'):
+            cabin_results[key] = results[key][k]
+        if 'flight_ids' in results:
+            cabin_results['flight_ids'] = results['flight_ids']
+        return cabin_results
+    
+    @staticmethod
+    def print_results(results: Dict[str, Any]) -> None:
+        """
+        Print fleet totals for each cabin.
+        
+        Args:
+            results: Results from run or run_flights
+        """
+        n_flights = len(results['total_revenue'])
+        print(f"\nMulti-class simulation of {n_flights} flights:")
+        for k, cabin in enumerate(results['cabins']):
+            print(f"  {cabin:<10} revenue ${results['cabin_revenue'][k].sum():,.2f}, "
+                  f"seats sold {results['daily_sales'][k].sum():,.1f}, "
+                  f"via transfers {results['daily_transfers'][k].sum():,.1f}, "
+                  f"mean seats left {results['remaining_seats'][k].mean():.2f}")
+        print(f"  Total revenue: ${results['total_revenue'].sum():,.2f}")
+    
+    @property
+    def available_flights(self) -> List[int]:
+        """Get flight IDs present in every cabin's data."""
+        common = None
+        for loader in self.loaders.values():
+            ids = set(loader.available_flight_ids)
+            common = ids if common is None else common & ids
+        return sorted(common or [])
+
+
+def simulate_cabins(demand_paths: np.ndarray,
+                    cabin_seats: Sequence[int],
+                    pricing_models: Sequence[Any],
+                    upgrade_rate: float = 0.0,
+                    spill_rate: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    Simulate several cabins of N flights together.
+    
+    Every cabin is priced and sold for all flights at once each day. A
+    cabin's turned-away demand is its demand level scaled by the share of
+    price-responsive buyers it could not seat (all of it once the cabin is
+    sold out). Fractions of it are offered to the neighbouring cabins at
+    their prices for the day, after their own buyers have been served.
+    With both rates at zero each cabin matches simulate_paths exactly.
+    
+    Args:
+        demand_paths: Array of shape (n_cabins, n_flights, n_days), cabins
+            ordered from the lowest to the highest fare class
+        cabin_seats: Seats in each cabin
+        pricing_models: One object per cabin providing calculate_prices and
+            calculate_revenues
+        upgrade_rate: Fraction of turned-away demand moving one cabin up
+        spill_rate: Fraction of turned-away demand moving one cabin down
+    
+    Returns:
+        Dict with 'total_revenue' of shape (n_flights,), 'cabin_revenue',
+        'remaining_seats' and 'days_active' of shape (n_cabins, n_flights),
+        and 'daily_revenue', 'daily_prices', 'daily_demand', 'daily_sales'
+        and 'daily_transfers' (seats sold to demand from other cabins,
+        included in daily_sales) of shape (n_cabins, n_flights, n_days).
+        Days after a cabin sells out are recorded as 0 revenue/sales and
+        NaN price/demand.
+    """
+    demand_paths = np.asarray(demand_paths, dtype=float)
+    n_cabins, n_flights, n_days = demand_paths.shape
+    if len(cabin_seats) != n_cabins or len(pricing_models) != n_cabins:
+        raise ValueError("Need one seat count and one pricing model per cabin")
+    
+    remaining_seats = np.repeat(np.asarray(cabin_seats, dtype=float)[:, None], n_flights, axis=1)
+    cabin_revenue = np.zeros((n_cabins, n_flights))
+    days_active = np.zeros((n_cabins, n_flights), dtype=np.int64)
+    
+    daily_revenue = np.zeros((n_cabins, n_flights, n_days))
+    daily_prices = np.full((n_cabins, n_flights, n_days), np.nan)
+    daily_demand = np.full((n_cabins, n_flights, n_days), np.nan)
+    daily_sales = np.zeros((n_cabins, n_flights, n_days))
+    daily_transfers = np.zeros((n_cabins, n_flights, n_days))
+    
+    for day in range(n_days):
+        active = remaining_seats > 0
+        if not active.any():
+            break
+        
+        prices = np.zeros((n_cabins, n_flights))
+        turned_away = np.zeros((n_cabins, n_flights))
+        
+        # Each cabin sells to its own demand first
+        for k, model in enumerate(pricing_models):
+            live = active[k]
+            demand = demand_paths[k, live, day]
+            seats = remaining_seats[k, live]
+            
+            cabin_prices = model.calculate_prices(n_days - day, seats, demand)
+            revenue, quantity = model.calculate_revenues(cabin_prices, demand, seats)
+            
+            prices[k, live] = cabin_prices
+            cabin_revenue[k, live] += revenue
+            remaining_seats[k, live] = seats - quantity
+            days_active[k, live] += 1
+            
+            daily_revenue[k, live, day] = revenue
+            daily_prices[k, live, day] = cabin_prices
+            daily_demand[k, live, day] = demand
+            daily_sales[k, live, day] = quantity
+            
+            if upgrade_rate or spill_rate:
+                _, wanted = model.calculate_revenues(cabin_prices, demand, np.inf)
+                unserved = np.divide(wanted - quantity, wanted,
+                                     out=np.zeros_like(wanted), where=wanted > 0)
+                turned_away[k, live] = demand * unserved
+                # Demand for a cabin that was already sold out goes unserved
+                turned_away[k, ~live] = demand_paths[k, ~live, day]
+        
+        if not (upgrade_rate or spill_rate):
+            continue
+        
+        # Offer turned-away demand to the neighbouring cabins
+        transferred = np.zeros((n_cabins, n_flights))
+        transferred[1:] += upgrade_rate * turned_away[:-1]
+        transferred[:-1] += spill_rate * turned_away[1:]
+        
+        for k, model in enumerate(pricing_models):
+            live = active[k] & (remaining_seats[k] > 0) & (transferred[k] > 0)
+            if not live.any():
+                continue
+            seats = remaining_seats[k, live]
+            revenue, quantity = model.calculate_revenues(prices[k, live], transferred[k, live], seats)
+            
+            cabin_revenue[k, live] += revenue
+            remaining_seats[k, live] = seats - quantity
+            daily_revenue[k, live, day] += revenue
+            daily_sales[k, live, day] += quantity
+            daily_transfers[k, live, day] = quantity
+    
+    return {
+        'total_revenue': cabin_revenue.sum(axis=0),
+        'cabin_revenue': cabin_revenue,
+        'remaining_seats': remaining_seats,
+        'days_active': days_active,
+        'daily_revenue': daily_revenue,
+        'daily_prices': daily_prices,
+        'daily_demand': daily_demand,
+        'daily_sales': daily_sales,
+        'daily_transfers': daily_transfers
+    }
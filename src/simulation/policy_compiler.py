@@ -0,0 +1,304 @@
+"""
+Compile pricing policies into precomputed lookup grids.
+"""
+
+import json
+import math
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from ..models.pricing_model import BusinessClassPricingModel
+from .tournament import POLICIES
+
+
+class CompiledPolicy:
+    """
+    A pricing policy tabulated over (days left, seats left, demand level).
+    
+    The table holds the policy's price at every integer days_left in
+    [0, max_days], every integer tickets_left in [0, max_seats] and demand
+    levels demand_low + k * demand_step. Queries are answered by indexing:
+    days are truncated and fractional seats rounded up to whole seats (so
+    0 < tickets_left < 1 still counts as a seat for sale), both clipped to
+    the grid. Demand is linearly interpolated between grid points, or
+    snapped to the nearest one with interpolate=False, and clipped to the
+    grid range.
+    
+    It provides calculate_price / calculate_prices like the models, and
+    calculate_revenue / calculate_revenues from its market response, so it
+    can stand in for the original policy in the simulators and tournaments.
+    """
+    
+    def __init__(self,
+                 table: np.ndarray,
+                 demand_low: float,
+                 demand_step: float,
+                 interpolate: bool = True,
+                 error: Optional[Dict[str, float]] = None,
+                 market: Optional[Any] = None):
+        """
+        Wrap an already computed table.
+        
+        Args:
+            table: Prices of shape (max_days + 1, max_seats + 1, n_demand)
+            demand_low: Demand level of the first demand column
+            demand_step: Spacing of the demand columns
+            interpolate: Interpolate linearly between demand columns
+            error: Measured error against the original (see measure_error)
+            market: Object whose calculate_revenue / calculate_revenues
+                define how many seats sell at a price (defaults to the
+                BusinessClassPricingModel elasticity response)
+        
+        Raises:
+            ValueError: If the table has fewer than two demand columns
+        """
+        if table.ndim != 3 or table.shape[2] < 2:
+            raise ValueError(f"Policy table needs at least two demand columns, got shape {table.shape}")
+        self.table = table
+        self.demand_low = demand_low
+        self.demand_step = demand_step
+        self.interpolate = interpolate
+        self.error = error
+        self.market = market or BusinessClassPricingModel()
+        self.max_days = table.shape[0] - 1
+        self.max_seats = table.shape[1] - 1
+        self.n_demand = table.shape[2]
+        
+        # Flat view (still memory-mapped if the table is) for single-index
+        # lookups, which are much cheaper than 3-D fancy indexing
+        self._flat = np.asarray(table).reshape(-1)
+        self._item = self._flat.item
+        self._row_stride = (self.max_seats + 1) * self.n_demand
+    
+    @property
+    def demand_high(self) -> float:
+        """Demand level of the last demand column."""
+        return self.demand_low + (self.n_demand - 1) * self.demand_step
+    
+    def calculate_price(self, days_left: int, tickets_left: float, demand_level: float) -> float:
+        """
+        Look up the price for one quote.
+        
+        Args:
+            days_left: Number of days until flight
+            tickets_left: Number of seats remaining
+            demand_level: Current demand level
+        
+        Returns:
+            float: Tabulated ticket price
+        """
+        day = min(max(int(days_left), 0), self.max_days)
+        seats = min(max(math.ceil(tickets_left), 0), self.max_seats)
+        x = (demand_level - self.demand_low) / self.demand_step
+        row = day * self._row_stride + seats * self.n_demand
+        
+        if not self.interpolate:
+            return self._item(row + min(max(int(round(x)), 0), self.n_demand - 1))
+        if x <= 0:
+            return self._item(row)
+        if x >= self.n_demand - 1:
+            return self._item(row + self.n_demand - 1)
+        i = int(x)
+        w = x - i
+        return self._item(row + i) * (1 - w) + self._item(row + i + 1) * w
+    
+    def calculate_prices(self,
+                         days_left: np.ndarray,
+                         tickets_left: np.ndarray,
+                         demand_level: np.ndarray) -> np.ndarray:
+        """
+        Vectorized counterpart of calculate_price.
+        
+        Args:
+            days_left: Days until flight for each quote
+            tickets_left: Seats remaining for each quote
+            demand_level: Current demand level for each quote
+        
+        Returns:
+            np.ndarray: Tabulated ticket prices
+        """
+        days_left, tickets_left, demand_level = np.broadcast_arrays(
+            np.asarray(days_left, dtype=float),
+            np.asarray(tickets_left, dtype=float),
+            np.asarray(demand_level, dtype=float))
+        
+        row = np.clip(days_left, 0, self.max_days).astype(np.intp)
+        row *= self._row_stride
+        seats = np.clip(np.ceil(tickets_left), 0, self.max_seats).astype(np.intp)
+        seats *= self.n_demand
+        row += seats
+        x = (demand_level - self.demand_low) / self.demand_step
+        
+        if not self.interpolate:
+            row += np.clip(np.rint(x), 0, self.n_demand - 1).astype(np.intp)
+            return self._flat.take(row).astype(float)
+        
+        x = np.clip(x, 0, self.n_demand - 1)
+        column = np.minimum(x.astype(np.intp), self.n_demand - 2)
+        w = x - column
+        row += column
+        low = self._flat.take(row)
+        high = self._flat.take(row + 1)
+        high -= low
+        high *= w
+        high += low
+        return high
+    
+    def calculate_revenue(self, price: float, demand_level: float, tickets_left: float) -> Tuple[float, float]:
+        """
+        Revenue and seats sold at a price, from the market response.
+        
+        Args:
+            price: Ticket price
+            demand_level: Current demand level
+            tickets_left: Number of seats remaining
+        
+        Returns:
+            tuple: (revenue, quantity)
+        """
+        return self.market.calculate_revenue(price, demand_level, tickets_left)
+    
+    def calculate_revenues(self,
+                           price: np.ndarray,
+                           demand_level: np.ndarray,
+                           tickets_left: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized counterpart of calculate_revenue.
+        
+        Args:
+            price: Ticket price for each quote
+            demand_level: Current demand level for each quote
+            tickets_left: Seats remaining for each quote
+        
+        Returns:
+            tuple: (revenue, quantity) arrays
+        """
+        return self.market.calculate_revenues(price, demand_level, tickets_left)
+    
+    def measure_error(self,
+                      policy: Callable,
+                      n_samples: int = 100000,
+                      seed: Optional[int] = 0) -> Dict[str, float]:
+        """
+        Compare against the original policy on random in-grid quotes.
+        
+        Days are drawn as integers on the grid, and seats and demand
+        uniformly over their ranges, so the error reflects the rounding of
+        fractional seats (as the simulators carry) as well as the demand
+        quantization and interpolation.
+        
+        Args:
+            policy: Vectorized original policy
+            n_samples: Number of random quotes
+            seed: Random seed
+        
+        Returns:
+            Dict with 'max_abs', 'mean_abs', 'p99_abs' and 'max_rel' errors
+        """
+        rng = np.random.default_rng(seed)
+        days = rng.integers(0, self.max_days + 1, n_samples)
+        seats = rng.uniform(0, self.max_seats, n_samples)
+        demand = rng.uniform(self.demand_low, self.demand_high, n_samples)
+        
+        expected = np.asarray(policy(days, seats, demand), dtype=float)
+        error = np.abs(self.calculate_prices(days, seats, demand) - expected)
+        relative = error / np.maximum(np.abs(expected), 1e-12)
+        self.error = {
+            'max_abs': float(error.max()),
+            'mean_abs': float(error.mean()),
+            'p99_abs': float(np.quantile(error, 0.99)),
+            'max_rel': float(relative[expected != 0].max(initial=0.0)),
+        }
+        return self.error
+    
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Write the table to '<path>.npy' and the grid description to '<path>.json'.
+        
+        The market response is not saved; pass it again to load.
+        
+        Args:
+            path: Output path without extension (dots in it are kept)
+        """
+        table_path, meta_path = _file_paths(path)
+        np.save(table_path, np.ascontiguousarray(self.table))
+        with open(meta_path, 'w') as f:
+            json.dump({'demand_low': self.demand_low,
+                       'demand_step': self.demand_step,
+                       'interpolate': self.interpolate,
+                       'error': self.error}, f, indent=2)
+    
+    @classmethod
+    def load(cls,
+             path: Union[str, Path],
+             mmap: bool = True,
+             market: Optional[Any] = None) -> 'CompiledPolicy':
+        """
+        Load a table written by save.
+        
+        Args:
+            path: Path given to save
+            mmap: Memory-map the table instead of reading it into memory
+            market: Market response (see __init__)
+        
+        Returns:
+            CompiledPolicy: The compiled policy
+        """
+        table_path, meta_path = _file_paths(path)
+        with open(meta_path) as f:
+            meta = json.load(f)
+        table = np.load(table_path, mmap_mode='r' if mmap else None)
+        return cls(table, meta['demand_low'], meta['demand_step'],
+                   interpolate=meta['interpolate'], error=meta['error'], market=market)
+
+
+def _file_paths(path: Union[str, Path]) -> Tuple[Path, Path]:
+    """Table and metadata paths for a save path, appending the extensions."""
+    path = Path(path)
+    return path.with_name(path.name + '.npy'), path.with_name(path.name + '.json')
+
+
+def compile_policy(policy: Union[str, Callable],
+                   max_days: int = 30,
+                   max_seats: int = 50,
+                   demand_low: float = 0.0,
+                   demand_high: float = 60.0,
+                   demand_step: float = 0.1,
+                   interpolate: bool = True,
+                   n_check: int = 100000,
+                   market: Optional[Any] = None) -> CompiledPolicy:
+    """
+    Evaluate a policy once over a grid and return it as a CompiledPolicy.
+    
+    Args:
+        policy: Name of a registered policy (see tournament.POLICIES) or a
+            vectorized function of (days_left, tickets_left, demand_level)
+        max_days: Largest days_left on the grid
+        max_seats: Largest tickets_left on the grid
+        demand_low: Lowest demand level on the grid
+        demand_high: Highest demand level on the grid
+        demand_step: Demand grid spacing
+        interpolate: Interpolate linearly between demand grid points
+        n_check: Random quotes used to measure the error (0 to skip)
+        market: Market response of the compiled policy (see CompiledPolicy)
+    
+    Returns:
+        CompiledPolicy: Tabulated policy, with its measured error
+    """
+    if isinstance(policy, str):
+        policy = POLICIES[policy]
+    
+    n_demand = int(round((demand_high - demand_low) / demand_step)) + 1
+    days = np.arange(max_days + 1, dtype=float)[:, None, None]
+    seats = np.arange(max_seats + 1, dtype=float)[None, :, None]
+    demand = (demand_low + demand_step * np.arange(n_demand))[None, None, :]
+    
+    shape = (max_days + 1, max_seats + 1, n_demand)
+    table = np.broadcast_to(np.asarray(policy(days, seats, demand), dtype=float), shape).copy()
+    
+    compiled = CompiledPolicy(table, demand_low, demand_step, interpolate=interpolate, market=market)
+    if n_check:
+        compiled.measure_error(policy, n_check)
+    return compiled
@@ -0,0 +1,257 @@
+"""
+Compact, array-backed simulation result types.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# One record per simulated day
+DAILY_DTYPE = np.dtype([
+    ('revenue', np.float64),
+    ('price', np.float64),
+    ('demand', np.float64),
+    ('sales', np.float64),
+])
+
+# Keys of the dict format returned by FlightSimulator.run_simulation,
+# mapped to DAILY_DTYPE fields
+_DAILY_KEYS = {
+    'daily_revenue': 'revenue',
+    'daily_prices': 'price',
+    'daily_demand': 'demand',
+    'daily_sales': 'sales',
+}
+
+
+class SimulationResult(Mapping):
+    """
+    Result of simulating one flight.
+    
+    Daily statistics live in a single structured array (see DAILY_DTYPE).
+    The object is also a read-only mapping with the keys of the original
+    results dict ('total_revenue', 'remaining_seats', 'daily_revenue',
+    'daily_prices', 'daily_demand', 'daily_sales'); the daily entries are
+    views into the structured array rather than copies.
+    """
+    
+    __slots__ = ('flight_id', 'daily', 'total_revenue', 'remaining_seats')
+    
+    def __init__(self,
+                 daily: np.ndarray,
+                 total_revenue: float,
+                 remaining_seats: float,
+                 flight_id: Optional[int] = None):
+        """
+        Initialize the result.
+        
+        Args:
+            daily: Structured array of DAILY_DTYPE, one record per day
+            total_revenue: Total revenue over the run
+            remaining_seats: Seats left unsold
+            flight_id: Flight identifier, if known
+        """
+        self.daily = daily
+        self.total_revenue = total_revenue
+        self.remaining_seats = remaining_seats
+        self.flight_id = flight_id
+    
+    @classmethod
+    def from_lists(cls,
+                   revenue: Sequence[float],
+                   prices: Sequence[float],
+                   demand: Sequence[float],
+                   sales: Sequence[float],
+                   total_revenue: float,
+                   remaining_seats: float,
+                   flight_id: Optional[int] = None) -> 'SimulationResult':
+        """Pack per-day lists into a result."""
+        daily = np.empty(len(revenue), dtype=DAILY_DTYPE)
+        daily['revenue'] = revenue
+        daily['price'] = prices
+        daily['demand'] = demand
+        daily['sales'] = sales
+        return cls(daily, total_revenue, remaining_seats, flight_id)
+    
+    def __getitem__(self, key: str) -> Any:
+        if key in _DAILY_KEYS:
+            return self.daily[_DAILY_KEYS[key]]
+        if key in ('total_revenue', 'remaining_seats'):
+            return getattr(self, key)
+        raise KeyError(key)
+    
+    def __iter__(self) -> Iterator[str]:
+        yield 'total_revenue'
+        yield 'remaining_seats'
+        yield from _DAILY_KEYS
+    
+    def __len__(self) -> int:
+        return 2 + len(_DAILY_KEYS)
+    
+    def __eq__(self, other: object) -> bool:
+        """
+        Compare as the results dict: equal totals and equal daily values.
+        
+        Works against another SimulationResult or a plain results dict;
+        NaN days compare equal, flight_id is not part of the mapping.
+        """
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        if set(other) != set(self):
+            return False
+        return (self.total_revenue == other['total_revenue']
+                and self.remaining_seats == other['remaining_seats']
+                and all(np.array_equal(self[key], np.asarray(other[key], dtype=float), equal_nan=True)
+                        for key in _DAILY_KEYS))
+    
+    __hash__ = None  # type: ignore[assignment]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Copy into the original dict-of-lists format."""
+        result: Dict[str, Any] = {
+            'total_revenue': self.total_revenue,
+            'remaining_seats': self.remaining_seats,
+        }
+        for key, field in _DAILY_KEYS.items():
+            result[key] = self.daily[field].tolist()
+        return result
+    
+    def __repr__(self) -> str:
+        return (f"SimulationResult(flight_id={self.flight_id}, days={len(self.daily)}, "
+                f"total_revenue={self.total_revenue:.2f}, remaining_seats={self.remaining_seats:.1f})")
+
+
+class FleetResults:
+    """
+    Results of many flights stacked into one contiguous block.
+    
+    ``daily`` is a (n_flights, n_days) structured array of DAILY_DTYPE.
+    Days after a flight sold out hold 0 revenue/sales and NaN price/demand;
+    ``days_active`` gives each flight's number of simulated days.
+    """
+    
+    __slots__ = ('flight_ids', 'daily', 'days_active', 'total_revenue', 'remaining_seats')
+    
+    def __init__(self,
+                 daily: np.ndarray,
+                 days_active: np.ndarray,
+                 total_revenue: np.ndarray,
+                 remaining_seats: np.ndarray,
+                 flight_ids: Optional[np.ndarray] = None):
+        """
+        Initialize the container.
+        
+        Args:
+            daily: Structured array of DAILY_DTYPE, shape (n_flights, n_days)
+            days_active: Simulated days per flight
+            total_revenue: Total revenue per flight
+            remaining_seats: Unsold seats per flight
+            flight_ids: Flight identifiers, if known
+        """
+        self.daily = daily
+        self.days_active = days_active
+        self.total_revenue = total_revenue
+        self.remaining_seats = remaining_seats
+        self.flight_ids = flight_ids
+    
+    @classmethod
+    def from_batch(cls, results: Dict[str, np.ndarray]) -> 'FleetResults':
+        """Build from BatchFlightSimulator.run / run_flights output."""
+        daily = np.empty(results['daily_revenue'].shape, dtype=DAILY_DTYPE)
+        for key, field in _DAILY_KEYS.items():
+            daily[field] = results[key]
+        return cls(daily, results['days_active'], results['total_revenue'],
+                   results['remaining_seats'], results.get('flight_ids'))
+    
+    @classmethod
+    def from_results(cls, results: Sequence[SimulationResult]) -> 'FleetResults':
+        """Stack individual results, padding shorter runs."""
+        n_days = max((len(r.daily) for r in results), default=0)
+        daily = np.zeros((len(results), n_days), dtype=DAILY_DTYPE)
+        daily['price'] = np.nan
+        daily['demand'] = np.nan
+        for row, result in enumerate(results):
+            daily[row, :len(result.daily)] = result.daily
+        
+        flight_ids = None
+        if all(r.flight_id is not None for r in results):
+            flight_ids = np.array([r.flight_id for r in results])
+        return cls(daily,
+                   np.array([len(r.daily) for r in results], dtype=np.int64),
+                   np.array([r.total_revenue for r in results], dtype=float),
+                   np.array([r.remaining_seats for r in results], dtype=float),
+                   flight_ids)
+    
+    def __len__(self) -> int:
+        return len(self.daily)
+    
+    def __getitem__(self, index: int) -> SimulationResult:
+        """View of one flight's result (no copy of the daily records)."""
+        flight_id = int(self.flight_ids[index]) if self.flight_ids is not None else None
+        return SimulationResult(self.daily[index, :self.days_active[index]],
+                                float(self.total_revenue[index]),
+                                float(self.remaining_seats[index]),
+                                flight_id)
+    
+    def __iter__(self) -> Iterator[SimulationResult]:
+        for index in range(len(self)):
+            yield self[index]
+    
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Copy every flight into the original dict-of-lists format."""
+        return [result.to_dict() for result in self]
+
+
+@dataclass(frozen=True)
+class SimulatorSnapshot:
+    """
+    FlightSimulator state at the start of a day, cheap to take and restore.
+    
+    The days already simulated are kept as one DAILY_DTYPE array, so a
+    snapshot costs a copy of at most max_days records plus the RNG state.
+    A snapshot can also be built directly with at() to ask what-if
+    questions about a flight that was never simulated up to that day.
+    """
+    flight_id: int
+    day_index: int              # Next day to simulate
+    max_days: int
+    remaining_seats: float
+    total_revenue: float
+    daily: np.ndarray           # DAILY_DTYPE records of the days simulated so far
+    # np.random.get_state() (missing-record demand is drawn from np.random)
+    rng_state: Optional[Tuple[Any, ...]] = None
+    # DemandForecaster (count, mean, var) when the simulator has one
+    forecaster_state: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+    
+    @property
+    def days_left(self) -> int:
+        """Days until the flight at the snapshot."""
+        return self.max_days - self.day_index
+    
+    @classmethod
+    def at(cls,
+           flight_id: int,
+           days_left: int,
+           remaining_seats: float,
+           max_days: int = 30,
+           total_revenue: float = 0.0) -> 'SimulatorSnapshot':
+        """
+        Snapshot for a flight with days_left days and remaining_seats seats to go.
+        
+        Args:
+            flight_id: Flight identifier
+            days_left: Days until the flight
+            remaining_seats: Seats still for sale
+            max_days: Booking horizon of the flight
+            total_revenue: Revenue already booked
+            
+        Returns:
+            SimulatorSnapshot: Snapshot with no recorded days
+        """
+        if not 0 <= days_left <= max_days:
+            raise ValueError(f"days_left must be in [0, {max_days}]")
+        return cls(flight_id, max_days - days_left, max_days, remaining_seats, total_revenue,
+                   np.empty(0, dtype=DAILY_DTYPE))
@@ -2,11 +2,16 @@
 Flight pricing simulator implementation.
 """
 
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, List, Mapping, Optional
 import numpy as np
 
+from ..models.demand_forecaster import DemandForecaster, ForecastPricingModel
 from ..models.pricing_model import BusinessClassPricingModel
 from ..utils.data_loader import FlightDataLoader
+from ..utils.events import EventSink
+from ..utils.profiling import Profiler, default_profiler
+from .results import DAILY_DTYPE, SimulationResult, SimulatorSnapshot
 
 
 class FlightSimulator:
@@ -14,21 +19,48 @@ class FlightSimulator:
     
     def __init__(self, 
                  total_seats: int = 50,
-                 data_path: str = 'data/synthetic/large_airline_pricing_simulation.csv'):
+                 data_path: str = 'data/synthetic/large_airline_pricing_simulation.csv',
+                 pricing_model: Optional[Any] = None,
+                 events: Optional[EventSink] = None,
+                 forecaster: Optional[DemandForecaster] = None,
+                 forecast_weight: float = 0.5,
+                 learn_online: bool = True,
+                 profiler: Optional[Profiler] = None):
         """
         Initialize the simulator.
         
         Args:
             total_seats: Number of seats available
             data_path: Path to the synthetic data file
+            pricing_model: Pricing model to use (defaults to
+                BusinessClassPricingModel)
+            events: Sink for log messages and per-day traces (defaults to
+                summary level, i.e. no per-day output)
+            forecaster: Demand forecaster; when given, prices are quoted on
+                a blend of today's and expected future demand (see
+                ForecastPricingModel) and missing records are sampled from it
+            forecast_weight: Weight of the forecast in the quoted demand
+            learn_online: Update the forecaster with each observed day
+            profiler: Per-stage timing counters (defaults to the
+                process-wide profiler, see default_profiler)
         """
         self.total_seats = total_seats
         self.remaining_seats = total_seats
         self.total_revenue = 0.0
+        # Flight being simulated and the next day to simulate
+        self.flight_id = 0
+        self.day_index = 0
         
         # Initialize components
-        self.data_loader = FlightDataLoader(data_path)
-        self.pricing_model = BusinessClassPricingModel()
+        self.events = events or EventSink()
+        self.profiler = profiler or default_profiler()
+        self.data_loader = FlightDataLoader(data_path, events=self.events)
+        self.pricing_model = pricing_model or BusinessClassPricingModel()
+        self.forecaster = forecaster
+        self.learn_online = learn_online
+        if forecaster is not None:
+            self.pricing_model = ForecastPricingModel(self.pricing_model, forecaster, forecast_weight)
+            self.data_loader.forecaster = forecaster
         
         # Statistics tracking
         self.daily_stats: Dict[str, List[float]] = {
@@ -55,11 +87,17 @@ class FlightSimulator:
         if self.remaining_seats <= 0:
             return 0.0
         
+        timing = self.profiler.enabled
+        if timing:
+            t = time.perf_counter_ns()
+        
         # Get flight data
         flight_data = self.data_loader.get_flight_data(
             flight_id=flight_id,
             days_before=self.data_loader.max_days - day_index
         )
+        if timing:
+            t = self.profiler.lap('run_simulation;get_flight_data', t)
         
         # Calculate optimal price
         price = self.pricing_model.calculate_price(
@@ -67,6 +105,8 @@ class FlightSimulator:
             tickets_left=self.remaining_seats,
             demand_level=flight_data['demand']
         )
+        if timing:
+            t = self.profiler.lap('run_simulation;calculate_price', t)
         
         # Calculate revenue and sales
         revenue, quantity = self.pricing_model.calculate_revenue(
@@ -74,6 +114,12 @@ class FlightSimulator:
             demand_level=flight_data['demand'],
             tickets_left=self.remaining_seats
         )
+        if timing:
+            t = self.profiler.lap('run_simulation;calculate_revenue', t)
+        
+        # Learn from today's observation once it has been priced
+        if self.forecaster is not None and self.learn_online and flight_data['price'] is not None:
+            self.forecaster.update(flight_id, self.data_loader.max_days - day_index, flight_data['demand'])
         
         # Update state
         self.total_revenue += revenue
@@ -85,16 +131,16 @@ class FlightSimulator:
         self.daily_stats['demand'].append(flight_data['demand'])
         self.daily_stats['sales'].append(quantity)
         
-        # Print comparison with historical price if available
-        if flight_data['price'] is not None:
-            print(f"Day {day_index + 1}: "
-                  f"Our price: ${price:.2f}, "
-                  f"Historical: ${flight_data['price']:.2f}, "
-                  f"Demand: {flight_data['demand']:.1f}")
+        # Trace comparison with historical price
+        if self.events.per_day:
+            self.events.record_day(flight_id, day_index, price,
+                                   flight_data['price'], flight_data['demand'])
+        if timing:
+            self.profiler.lap('run_simulation;record', t)
         
         return revenue
     
-    def run_simulation(self, flight_id: int) -> Dict[str, Any]:
+    def run_simulation(self, flight_id: int) -> SimulationResult:
         """
         Run a complete simulation for one flight.
         
@@ -102,35 +148,151 @@ class FlightSimulator:
             flight_id: Flight identifier
             
         Returns:
-            Dict containing simulation results
+            SimulationResult, which also reads like the results dict
+            ('total_revenue', 'daily_prices', ...)
+        """
+        timing = self.profiler.enabled
+        if timing:
+            start = time.perf_counter_ns()
+        
+        self.start_flight(flight_id)
+        self.events.summary(f"\nRunning simulation for Flight ID: {flight_id}")
+        
+        # Run simulation for each day
+        self.advance()
+        result = self._finish_run()
+        if timing:
+            self.profiler.lap('run_simulation', start)
+        return result
+    
+    def start_flight(self, flight_id: int) -> None:
+        """
+        Reset the simulator to day 0 of a flight.
+        
+        Args:
+            flight_id: Flight identifier
         """
-        # Reset state
+        self.flight_id = flight_id
+        self.day_index = 0
         self.remaining_seats = self.total_seats
         self.total_revenue = 0.0
         self.daily_stats = {key: [] for key in self.daily_stats}
         
-        print(f"\nRunning simulation for Flight ID: {flight_id}")
+        if self.forecaster is not None:
+            self.pricing_model.set_flight(flight_id)
+    
+    def advance(self, until_day: Optional[int] = None) -> None:
+        """
+        Simulate the current flight from day_index up to (not including) until_day.
         
-        # Run simulation for each day
-        for day in range(self.data_loader.max_days):
-            self.simulate_day(day, flight_id)
-        
-        return {
-            'total_revenue': self.total_revenue,
-            'remaining_seats': self.remaining_seats,
-            'daily_revenue': self.daily_stats['revenue'],
-            'daily_prices': self.daily_stats['prices'],
-            'daily_demand': self.daily_stats['demand'],
-            'daily_sales': self.daily_stats['sales']
+        Args:
+            until_day: Day to stop at (defaults to the end of the horizon)
+        """
+        if until_day is None:
+            until_day = self.data_loader.max_days
+        for day in range(self.day_index, until_day):
+            self.simulate_day(day, self.flight_id)
+            self.day_index = day + 1
+    
+    def snapshot(self) -> SimulatorSnapshot:
+        """
+        Capture the state of the current flight at the start of day_index.
+        
+        Returns:
+            SimulatorSnapshot: State that restore or WhatIfEngine.fork
+            continue from without replaying the days before it
+        """
+        daily = np.empty(len(self.daily_stats['revenue']), dtype=DAILY_DTYPE)
+        daily['revenue'] = self.daily_stats['revenue']
+        daily['price'] = self.daily_stats['prices']
+        daily['demand'] = self.daily_stats['demand']
+        daily['sales'] = self.daily_stats['sales']
+        
+        forecaster_state = None
+        if self.forecaster is not None:
+            forecaster_state = (self.forecaster.count.copy(), self.forecaster.mean.copy(),
+                                self.forecaster.var.copy())
+        return SimulatorSnapshot(
+            flight_id=self.flight_id,
+            day_index=self.day_index,
+            max_days=self.data_loader.max_days,
+            remaining_seats=self.remaining_seats,
+            total_revenue=self.total_revenue,
+            daily=daily,
+            rng_state=np.random.get_state(),
+            forecaster_state=forecaster_state
+        )
+    
+    def restore(self, snapshot: SimulatorSnapshot) -> None:
+        """
+        Put the simulator back in the state captured by snapshot.
+        
+        Args:
+            snapshot: Snapshot from this simulator (or one built with
+                SimulatorSnapshot.at)
+        """
+        self.start_flight(snapshot.flight_id)
+        self.day_index = snapshot.day_index
+        self.remaining_seats = snapshot.remaining_seats
+        self.total_revenue = snapshot.total_revenue
+        self.daily_stats = {
+            'revenue': snapshot.daily['revenue'].tolist(),
+            'prices': snapshot.daily['price'].tolist(),
+            'demand': snapshot.daily['demand'].tolist(),
+            'sales': snapshot.daily['sales'].tolist(),
         }
+        if snapshot.rng_state is not None:
+            np.random.set_state(snapshot.rng_state)
+        if snapshot.forecaster_state is not None and self.forecaster is not None:
+            for array, saved in zip((self.forecaster.count, self.forecaster.mean, self.forecaster.var),
+                                    snapshot.forecaster_state):
+                array[...] = saved
+    
+    def resume(self, snapshot: SimulatorSnapshot) -> SimulationResult:
+        """
+        Restore a snapshot and simulate the rest of the flight.
+        
+        Args:
+            snapshot: State to continue from
+            
+        Returns:
+            SimulationResult for the whole flight, including the days
+            before the snapshot
+        """
+        self.restore(snapshot)
+        self.advance()
+        return self._finish_run()
     
-    def print_results(self, results: Dict[str, Any]) -> None:
+    def _finish_run(self) -> SimulationResult:
+        """End the run's trace and pack the statistics into a result."""
+        timing = self.profiler.enabled
+        if timing:
+            t = time.perf_counter_ns()
+        self.events.end_run()
+        if timing:
+            self.profiler.lap('run_simulation;end_run', t)
+        
+        return SimulationResult.from_lists(
+            revenue=self.daily_stats['revenue'],
+            prices=self.daily_stats['prices'],
+            demand=self.daily_stats['demand'],
+            sales=self.daily_stats['sales'],
+            total_revenue=self.total_revenue,
+            remaining_seats=self.remaining_seats,
+            flight_id=self.flight_id
+        )
+    
+    def print_results(self, results: Mapping[str, Any]) -> None:
         """
         Print detailed results from a simulation.
         
         Args:
-            results: Simulation results dictionary
+            results: SimulationResult or simulation results dictionary
         """
+        timing = self.profiler.enabled
+        if timing:
+            t = time.perf_counter_ns()
+        
         print("\nSimulation Results:")
         print(f"Total Revenue: ${results['total_revenue']:.2f}")
         print(f"Remaining Seats: {results['remaining_seats']:.1f}")
@@ -138,6 +300,9 @@ class FlightSimulator:
         print(f"Average Demand: {np.mean(results['daily_demand']):.1f}")
         print(f"Total Sales: {sum(results['daily_sales']):.1f}")
         
+        if timing:
+            self.profiler.lap('print_results', t)
+        
     @property
     def available_flights(self) -> List[int]:
         """Get list of available flight IDs."""
@@ -0,0 +1,198 @@
+"""
+Common-random-numbers tournament for comparing pricing policies.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import numpy as np
+
+from ..models.pricing_function import pricing_function_batch
+from ..models.pricing_model import BusinessClassPricingModel
+from ..utils.data_loader import FlightDataLoader
+from .batch_simulator import simulate_paths
+
+
+# Vectorized policy: (days_left, tickets_left, demand_level) arrays -> prices
+Policy = Callable[[np.ndarray, np.ndarray, np.ndarray], np.ndarray]
+
+POLICIES: Dict[str, Policy] = {}
+
+
+def register_policy(name: str, policy: Callable, vectorized: bool = True) -> None:
+    """
+    Register a pricing policy for tournaments.
+    
+    Args:
+        name: Policy name used in reports
+        policy: Function of (days_left, tickets_left, demand_level)
+            returning prices
+        vectorized: Whether policy accepts arrays; scalar policies such
+            are wrapped element-wise
+    """
+    POLICIES[name] = policy if vectorized else np.vectorize(policy, otypes=[float])
+
+
+def static_base_price(days_left: np.ndarray,
+                      tickets_left: np.ndarray,
+                      demand_level: np.ndarray) -> np.ndarray:
+    """Reference policy: always charge the business class base price."""
+    tickets_left, demand_level = np.broadcast_arrays(tickets_left, demand_level)
+    return np.where(tickets_left > 0, 900.0, 0.0)
+
+
+register_policy('business_class', BusinessClassPricingModel().calculate_prices)
+register_policy('static_base_price', static_base_price)
+register_policy('pricing_function', pricing_function_batch)
+
+
+def paired_summary(names: Sequence[str], revenues: np.ndarray, baseline: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Mean revenue and paired difference to a baseline, with 95% intervals.
+    
+    Args:
+        names: Policy names, one per row of revenues
+        revenues: Array of shape (n_policies, n_paths) on shared paths
+        baseline: Name the others are compared against
+        
+    Returns:
+        Dict of per-policy rows with 'mean_revenue', 'revenue_ci',
+        'mean_difference' and 'difference_ci'
+    """
+    n_paths = revenues.shape[1]
+    base = revenues[list(names).index(baseline)]
+    summary = {}
+    for name, revenue in zip(names, revenues):
+        diff = revenue - base
+        revenue_half = 1.96 * revenue.std(ddof=1) / np.sqrt(n_paths) if n_paths > 1 else np.nan
+        diff_half = 1.96 * diff.std(ddof=1) / np.sqrt(n_paths) if n_paths > 1 else np.nan
+        summary[name] = {
+            'mean_revenue': float(revenue.mean()),
+            'revenue_ci': (float(revenue.mean() - revenue_half), float(revenue.mean() + revenue_half)),
+            'mean_difference': float(diff.mean()),
+            'difference_ci': (float(diff.mean() - diff_half), float(diff.mean() + diff_half)),
+        }
+    return summary
+
+
+class _PolicyModel:
+    """Adapter pairing a policy's prices with the shared market response."""
+    
+    def __init__(self, policy: Policy, market: Any):
+        self.calculate_prices = policy
+        self.calculate_revenues = market.calculate_revenues
+
+
+class PolicyTournament:
+    """
+    Evaluate several pricing policies on one shared set of demand paths.
+    
+    Every policy faces exactly the same demand realizations and the same
+    market response (common random numbers), so revenue differences are
+    compared path by path and their variance is much lower than with
+    independent draws.
+    """
+    
+    def __init__(self, total_seats: int = 50, market: Optional[Any] = None):
+        """
+        Initialize the tournament.
+        
+        Args:
+            total_seats: Seats available on each flight
+            market: Object whose calculate_revenues(prices, demand, seats)
+                defines how many seats sell at a price (defaults to the
+                BusinessClassPricingModel elasticity response)
+        """
+        self.total_seats = total_seats
+        self.market = market or BusinessClassPricingModel()
+    
+    @staticmethod
+    def synthetic_paths(n_paths: int,
+                        n_days: int,
+                        low: float = 20,
+                        high: float = 40,
+                        seed: Optional[int] = None) -> np.ndarray:
+        """
+        Draw a (n_paths, n_days) matrix of uniform demand levels.
+        
+        Args:
+            n_paths: Number of demand paths
+            n_days: Days per path
+            low: Lower demand bound
+            high: Upper demand bound
+            seed: Random seed
+            
+        Returns:
+            np.ndarray: Demand paths in simulation-day order
+        """
+        return np.random.default_rng(seed).uniform(low, high, size=(n_paths, n_days))
+    
+    @staticmethod
+    def data_paths(data_loader: FlightDataLoader,
+                   flight_ids: Optional[Sequence[int]] = None) -> np.ndarray:
+        """
+        Build demand paths from historical flights.
+        
+        Args:
+            data_loader: Loaded data loader
+            flight_ids: Flights to use (defaults to all)
+            
+        Returns:
+            np.ndarray: Demand paths in simulation-day order; flights with
+            missing days are dropped so every policy sees the same numbers
+        """
+        if flight_ids is None:
+            flight_ids = data_loader.available_flight_ids
+        max_days = data_loader.max_days
+        paths = data_loader.get_flight_trajectories(flight_ids)['demand'][:, max_days:0:-1]
+        return paths[~np.isnan(paths).any(axis=1)]
+    
+    def run(self,
+            demand_paths: np.ndarray,
+            policies: Optional[Sequence[str]] = None,
+            baseline: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Run every policy over the shared demand paths.
+        
+        Args:
+            demand_paths: Array of shape (n_paths, n_days)
+            policies: Registered policy names (defaults to all)
+            baseline: Policy the others are compared against (defaults to
+                the first)
+            
+        Returns:
+            Dict with 'policies', 'revenues' of shape (n_policies, n_paths),
+            and per-policy 'summary' rows holding the mean revenue, its 95%
+            confidence interval and the paired difference to the baseline
+            with its own 95% confidence interval
+        """
+        names: List[str] = list(policies) if policies is not None else list(POLICIES)
+        baseline = baseline or names[0]
+        
+        revenues = np.array([
+            simulate_paths(demand_paths, self.total_seats,
+                           _PolicyModel(POLICIES[name], self.market))['total_revenue']
+            for name in names
+        ])
+        
+        return {
+            'policies': names,
+            'baseline': baseline,
+            'n_paths': revenues.shape[1],
+            'revenues': revenues,
+            'summary': paired_summary(names, revenues, baseline),
+        }
+    
+    @staticmethod
+    def print_results(results: Dict[str, Any]) -> None:
+        """
+        Print a ranking of the policies with paired differences.
+        
+        Args:
+            results: Results from run
+        """
+        print(f"\nPolicy Tournament ({results['n_paths']} shared demand paths, "
+              f"baseline: {results['baseline']}):")
+        ranked = sorted(results['summary'].items(), key=lambda item: -item[1]['mean_revenue'])
+        for name, row in ranked:
+            low, high = row['difference_ci']
+            print(f"   {name:<24} ${row['mean_revenue']:.2f}  "
+                  f"diff ${row['mean_difference']:+.2f} [{low:+.2f}, {high:+.2f}]")
@@ -0,0 +1,265 @@
+"""
+Parallel parameter sweep and auto-tuner for BusinessClassPricingModel.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, fields, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..models.pricing_model import BusinessClassPricingModel, PricingParameters
+from ..utils.shared_data import SharedArrays, attach_arrays
+from .batch_simulator import simulate_paths
+
+
+# Demand paths and seat count owned by each worker process
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(shared: Dict[str, Any], total_seats: int) -> None:
+    """Attach to the demand paths in shared memory once per worker process."""
+    _worker_state['demand_paths'] = attach_arrays(shared)['demand_paths']
+    _worker_state['total_seats'] = total_seats
+
+
+def _evaluate(parameters: PricingParameters,
+              demand_paths: Optional[np.ndarray] = None,
+              total_seats: Optional[int] = None) -> float:
+    """Mean revenue per flight of one parameter set over the demand paths."""
+    if demand_paths is None:
+        demand_paths = _worker_state['demand_paths']
+        total_seats = _worker_state['total_seats']
+    model = BusinessClassPricingModel(parameters=parameters)
+    return float(simulate_paths(demand_paths, total_seats, model)['total_revenue'].mean())
+
+
+class ParameterSweep:
+    """
+    Search PricingParameters for the revenue-maximizing configuration.
+    
+    Candidates come from a grid or a seeded random search over the given
+    ranges, followed by a coordinate-wise local refinement around the best
+    candidate. Each candidate is scored by a batch simulation over the
+    demand paths, spread across a process pool. Scores are written to a
+    JSON checkpoint as they arrive; a resumed sweep re-derives the same
+    candidates and skips any that are already scored. The checkpoint
+    records the space, base parameters, seat count and a hash of the
+    demand paths, and is only resumed by a sweep that matches them.
+    """
+    
+    def __init__(self,
+                 demand_paths: np.ndarray,
+                 space: Dict[str, Tuple[float, float]],
+                 base: Optional[PricingParameters] = None,
+                 total_seats: int = 50,
+                 workers: int = 1,
+                 checkpoint_path: Optional[str] = None,
+                 checkpoint_every: int = 10):
+        """
+        Initialize the sweep.
+        
+        Args:
+            demand_paths: Array of shape (n_flights, n_days) to score on,
+                e.g. from PolicyTournament.data_paths
+            space: (low, high) range for each PricingParameters field tuned
+            base: Values of the parameters that are not tuned
+            total_seats: Seats available on each flight
+            workers: Number of worker processes (1 runs in-process)
+            checkpoint_path: JSON file recording every scored candidate
+            checkpoint_every: Rewrite the checkpoint after this many new
+                scores (and whenever evaluate returns or is interrupted)
+        
+        Raises:
+            ValueError: If checkpoint_path holds a checkpoint written for a
+                different space, base, seat count or set of demand paths
+        """
+        names = {f.name for f in fields(PricingParameters)}
+        unknown = set(space) - names
+        if unknown:
+            raise ValueError(f"Unknown pricing parameters: {sorted(unknown)}")
+        
+        self.demand_paths = np.asarray(demand_paths, dtype=float)
+        self.space = dict(space)
+        self.base = base or PricingParameters()
+        self.total_seats = total_seats
+        self.workers = workers
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path is not None else None
+        self.checkpoint_every = checkpoint_every
+        self._checkpoint_signature = self._signature() if self.checkpoint_path is not None else None
+        
+        self.scores: Dict[str, float] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._load_checkpoint()
+    
+    @staticmethod
+    def _key(candidate: Dict[str, float]) -> str:
+        return json.dumps(candidate, sort_keys=True)
+    
+    def _signature(self) -> Dict[str, Any]:
+        """What the scores depend on, as stored in the checkpoint."""
+        paths = np.ascontiguousarray(self.demand_paths)
+        signature = {
+            'space': self.space,
+            'base': asdict(self.base),
+            'total_seats': self.total_seats,
+            'demand_paths': [list(paths.shape), hashlib.sha256(paths.tobytes()).hexdigest()],
+        }
+        # Round-trip so tuples compare equal to the lists read back
+        return json.loads(json.dumps(signature))
+    
+    def _load_checkpoint(self) -> None:
+        if self.checkpoint_path is not None and self.checkpoint_path.exists():
+            with open(self.checkpoint_path) as f:
+                checkpoint = json.load(f)
+            if checkpoint.get('signature') != self._checkpoint_signature:
+                raise ValueError(f"Checkpoint {self.checkpoint_path} is for a different sweep configuration")
+            self.scores = checkpoint['scores']
+    
+    def _save_checkpoint(self) -> None:
+        if self.checkpoint_path is None:
+            return
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'signature': self._checkpoint_signature, 'scores': self.scores}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+    
+    def parameters(self, candidate: Dict[str, float]) -> PricingParameters:
+        """Full parameter set for a candidate."""
+        return replace(self.base, **candidate)
+    
+    def evaluate(self, candidates: Sequence[Dict[str, float]]) -> List[float]:
+        """
+        Score candidates, reusing checkpointed scores.
+        
+        Args:
+            candidates: Values for the tuned parameters
+            
+        Returns:
+            List[float]: Mean revenue per flight for each candidate
+        """
+        # Ordered and de-duplicated in one pass
+        todo = list(dict.fromkeys(key for key in map(self._key, candidates) if key not in self.scores))
+        
+        if todo:
+            params = [self.parameters(json.loads(key)) for key in todo]
+            if self._pool is not None:
+                results = self._pool.map(_evaluate, params)
+            else:
+                results = (_evaluate(p, self.demand_paths, self.total_seats) for p in params)
+            # Results arrive in order as they finish, so progress is saved
+            # during a long phase and on a crash or Ctrl-C
+            try:
+                for done, (key, score) in enumerate(zip(todo, results), 1):
+                    self.scores[key] = score
+                    if done % self.checkpoint_every == 0:
+                        self._save_checkpoint()
+            finally:
+                self._save_checkpoint()
+        
+        return [self.scores[self._key(candidate)] for candidate in candidates]
+    
+    def grid_candidates(self, points: int = 5) -> List[Dict[str, float]]:
+        """Cartesian grid with the given number of points per parameter."""
+        axes = {name: np.linspace(low, high, points).tolist() for name, (low, high) in self.space.items()}
+        return [dict(zip(axes, values)) for values in itertools.product(*axes.values())]
+    
+    def random_candidates(self, n_samples: int, seed: int = 0) -> List[Dict[str, float]]:
+        """Uniformly sampled candidates (deterministic for a given seed)."""
+        rng = np.random.default_rng(seed)
+        return [{name: float(rng.uniform(low, high)) for name, (low, high) in self.space.items()}
+                for _ in range(n_samples)]
+    
+    def refine(self,
+               start: Dict[str, float],
+               rounds: int = 10,
+               step_fraction: float = 0.1) -> Tuple[Dict[str, float], float]:
+        """
+        Coordinate-wise local search from a starting candidate.
+        
+        Each round scores a step up and down along every parameter at once
+        (in parallel) and moves to the best improvement; without one, the
+        step is halved.
+        
+        Args:
+            start: Starting candidate
+            rounds: Maximum number of rounds
+            step_fraction: Initial step as a fraction of each range
+            
+        Returns:
+            Tuple of the best candidate and its score
+        """
+        best = dict(start)
+        best_score = self.evaluate([best])[0]
+        steps = {name: (high - low) * step_fraction for name, (low, high) in self.space.items()}
+        
+        for _ in range(rounds):
+            neighbours = []
+            for name, (low, high) in self.space.items():
+                for direction in (-1, 1):
+                    value = min(high, max(low, best[name] + direction * steps[name]))
+                    if value != best[name]:
+                        neighbours.append(dict(best, **{name: value}))
+            if not neighbours:
+                break
+            
+            scores = self.evaluate(neighbours)
+            i = int(np.argmax(scores))
+            if scores[i] > best_score:
+                best, best_score = neighbours[i], scores[i]
+            else:
+                steps = {name: step / 2 for name, step in steps.items()}
+        
+        return best, best_score
+    
+    def run(self,
+            method: str = 'random',
+            n_samples: int = 64,
+            grid_points: int = 5,
+            seed: int = 0,
+            refine_rounds: int = 10) -> Tuple[PricingParameters, float]:
+        """
+        Run the search and return the revenue-maximizing configuration.
+        
+        Args:
+            method: 'grid' or 'random'
+            n_samples: Candidates for random search
+            grid_points: Points per parameter for grid search
+            seed: Random search seed
+            refine_rounds: Local refinement rounds (0 disables refinement)
+            
+        Returns:
+            Tuple of the best PricingParameters and its mean revenue per flight
+        """
+        if method == 'grid':
+            candidates = self.grid_candidates(grid_points)
+        elif method == 'random':
+            candidates = self.random_candidates(n_samples, seed)
+        else:
+            raise ValueError(f"Unknown search method: {method}")
+        
+        shared = None
+        if self.workers > 1:
+            shared = SharedArrays({'demand_paths': self.demand_paths})
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(shared.descriptor, self.total_seats))
+        try:
+            scores = self.evaluate(candidates)
+            best = candidates[int(np.argmax(scores))]
+            best_score = max(scores)
+            if refine_rounds:
+                best, best_score = self.refine(best, rounds=refine_rounds)
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+            if shared is not None:
+                shared.close()
+        
+        return self.parameters(best), best_score
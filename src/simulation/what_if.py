@@ -0,0 +1,243 @@
+"""
+Snapshot-and-fork what-if analysis for mid-horizon repricing.
+"""
+
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from ..models.demand_forecaster import DemandForecaster
+from ..models.pricing_model import BusinessClassPricingModel
+from ..utils.data_loader import FlightDataLoader
+from .results import SimulatorSnapshot
+from .tournament import POLICIES, Policy, paired_summary
+
+
+# A scenario is a registered policy name, a vectorized policy function, a
+# pricing model with calculate_prices, or a price ladder: an array with
+# one price per remaining day, starting today
+Scenario = Union[str, Callable, Any, np.ndarray]
+
+
+class WhatIfEngine:
+    """
+    Fork one simulator snapshot into K pricing scenarios x M demand samples.
+    
+    The fork starts from the snapshot's day, seats and booked revenue, so
+    the days before it are never replayed. All K x M runs advance together
+    one day at a time: each scenario prices its M runs with one vectorized
+    call, and the market response for every run is computed in one call.
+    Every scenario sees the same M demand samples (common random
+    numbers), so scenario differences are compared sample by sample, as
+    in PolicyTournament.
+    """
+    
+    def __init__(self,
+                 data_loader: Optional[FlightDataLoader] = None,
+                 market: Optional[Any] = None,
+                 forecaster: Optional[DemandForecaster] = None,
+                 demand_noise: float = 0.1):
+        """
+        Initialize the engine.
+        
+        Args:
+            data_loader: Loaded data loader whose records seed the demand
+                samples of known flights
+            market: Object whose calculate_revenues(prices, demand, seats)
+                defines how many seats sell at a price (defaults to the
+                BusinessClassPricingModel elasticity response)
+            forecaster: When given, demand samples are drawn from its
+                per-day estimates instead of the flight's records
+            demand_noise: Lognormal sigma applied to recorded demand to
+                draw samples around the flight's history (0 replays it)
+        """
+        self.data_loader = data_loader
+        self.market = market or BusinessClassPricingModel()
+        self.forecaster = forecaster
+        self.demand_noise = demand_noise
+    
+    def demand_samples(self,
+                       snapshot: SimulatorSnapshot,
+                       n_samples: int,
+                       rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        Draw demand for the days after the fork point.
+        
+        Uses the forecaster's mean and variance per day when there is one,
+        otherwise the flight's recorded demand with lognormal noise. Days
+        with neither fall back to uniform(20, 40) demand, as in the
+        simulators.
+        
+        Args:
+            snapshot: Fork point
+            n_samples: Number of demand samples
+            rng: Random generator
+        
+        Returns:
+            np.ndarray: Shape (n_samples, days_left); column d is the demand
+            d days after the fork point
+        """
+        rng = rng or np.random.default_rng()
+        days_before = snapshot.max_days - np.arange(snapshot.day_index, snapshot.max_days)
+        shape = (n_samples, len(days_before))
+        paths = rng.uniform(20, 40, size=shape)
+        
+        if self.forecaster is not None:
+            forecaster = self.forecaster
+            in_range = days_before <= forecaster.max_days
+            cells = (forecaster.route_of(snapshot.flight_id), days_before[in_range])
+            known = np.zeros(len(days_before), dtype=bool)
+            known[in_range] = forecaster.count[cells] > 0
+            mean = np.zeros(len(days_before))
+            std = np.zeros(len(days_before))
+            mean[in_range] = forecaster.mean[cells]
+            std[in_range] = np.sqrt(forecaster.var[cells])
+            draws = np.maximum(0.0, mean + std * rng.standard_normal(shape))
+            return np.where(known, draws, paths)
+        
+        trajectory = None
+        if self.data_loader is not None:
+            trajectory = self.data_loader.get_flight_trajectory(snapshot.flight_id)
+        if trajectory is None:
+            return paths
+        
+        recorded = np.asarray(trajectory['demand'], dtype=float)[days_before]
+        noise = self.demand_noise
+        draws = recorded * np.exp(rng.standard_normal(shape) * noise - noise ** 2 / 2) if noise else \
+            np.broadcast_to(recorded, shape)
+        return np.where(np.isnan(recorded), paths, draws)
+    
+    def fork(self,
+             snapshot: SimulatorSnapshot,
+             scenarios: Mapping[str, Scenario],
+             n_samples: int = 1000,
+             demand_paths: Optional[np.ndarray] = None,
+             baseline: Optional[str] = None,
+             seed: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Evaluate every scenario from the snapshot onward.
+        
+        Args:
+            snapshot: Fork point (see FlightSimulator.snapshot and
+                SimulatorSnapshot.at)
+            scenarios: Pricing scenarios by name (see Scenario)
+            n_samples: Demand samples per scenario (ignored if
+                demand_paths is given)
+            demand_paths: Demand to use instead of demand_samples, shape
+                (n_samples, days_left)
+            baseline: Scenario the others are compared against (defaults
+                to the first)
+            seed: Seed for the demand samples
+        
+        Returns:
+            Dict with 'scenarios', 'baseline', 'n_samples', 'days_left',
+            'demand_paths', (K, M) 'total_revenue' (including the revenue
+            booked before the fork) and 'remaining_seats', (K, M, days_left)
+            'daily_revenue', 'daily_prices' and 'daily_sales' (NaN prices
+            once sold out), and per-scenario 'summary' rows as in
+            PolicyTournament.run
+        """
+        names = list(scenarios)
+        if not names:
+            raise ValueError("No scenarios to evaluate")
+        baseline = baseline or names[0]
+        policies = [_as_policy(scenario, snapshot) for scenario in scenarios.values()]
+        
+        if demand_paths is None:
+            demand_paths = self.demand_samples(snapshot, n_samples, np.random.default_rng(seed))
+        demand_paths = np.asarray(demand_paths, dtype=float)
+        n_samples, n_days = demand_paths.shape
+        if n_days != snapshot.days_left:
+            raise ValueError(f"demand_paths has {n_days} days, the snapshot has {snapshot.days_left} left")
+        
+        shape = (len(names), n_samples)
+        remaining_seats = np.full(shape, float(snapshot.remaining_seats))
+        total_revenue = np.full(shape, float(snapshot.total_revenue))
+        daily_revenue = np.zeros(shape + (n_days,))
+        daily_prices = np.full(shape + (n_days,), np.nan)
+        daily_sales = np.zeros(shape + (n_days,))
+        prices = np.empty(shape)
+        
+        for day in range(n_days):
+            active = remaining_seats > 0
+            if not active.any():
+                break
+            days_left = n_days - day
+            demand = np.broadcast_to(demand_paths[:, day], shape)
+            
+            for k, policy in enumerate(policies):
+                rows = active[k]
+                if rows.any():
+                    prices[k, rows] = policy(days_left, remaining_seats[k, rows], demand_paths[rows, day])
+            
+            seats = remaining_seats[active]
+            revenue, quantity = self.market.calculate_revenues(prices[active], demand[active], seats)
+            total_revenue[active] += revenue
+            remaining_seats[active] = seats - quantity
+            
+            daily_revenue[active, day] = revenue
+            daily_prices[active, day] = prices[active]
+            daily_sales[active, day] = quantity
+        
+        return {
+            'scenarios': names,
+            'baseline': baseline,
+            'n_samples': n_samples,
+            'days_left': n_days,
+            'demand_paths': demand_paths,
+            'total_revenue': total_revenue,
+            'remaining_seats': remaining_seats,
+            'daily_revenue': daily_revenue,
+            'daily_prices': daily_prices,
+            'daily_sales': daily_sales,
+            'summary': paired_summary(names, total_revenue, baseline),
+        }
+    
+    @staticmethod
+    def print_results(results: Dict[str, Any]) -> None:
+        """
+        Print the scenarios ranked by mean revenue, with paired differences.
+        
+        Args:
+            results: Results from fork
+        """
+        print(f"\nWhat-if ({results['days_left']} days left, {results['n_samples']} demand samples, "
+              f"baseline: {results['baseline']}):")
+        ranked = sorted(results['summary'].items(), key=lambda item: -item[1]['mean_revenue'])
+        for name, row in ranked:
+            low, high = row['difference_ci']
+            unsold = results['remaining_seats'][results['scenarios'].index(name)].mean()
+            print(f"   {name:<24} ${row['mean_revenue']:.2f}  "
+                  f"diff ${row['mean_difference']:+.2f} [{low:+.2f}, {high:+.2f}]  "
+                  f"unsold {unsold:.1f}")
+
+
+def price_ladder(prices: Sequence[float]) -> np.ndarray:
+    """
+    Price ladder scenario: a fixed price for each remaining day, starting today.
+    
+    Args:
+        prices: One price per remaining day
+    
+    Returns:
+        np.ndarray: Ladder to pass as a scenario to WhatIfEngine.fork
+    """
+    return np.asarray(prices, dtype=float)
+
+
+def _as_policy(scenario: Scenario, snapshot: SimulatorSnapshot) -> Policy:
+    """Vectorized policy of (days_left, tickets_left, demand_level) for a scenario."""
+    if isinstance(scenario, str):
+        return POLICIES[scenario]
+    if isinstance(scenario, np.ndarray):
+        if scenario.shape != (snapshot.days_left,):
+            raise ValueError(f"Price ladder needs {snapshot.days_left} prices, got {scenario.shape}")
+        ladder = scenario
+        return lambda days_left, tickets_left, demand_level: np.full(
+            np.shape(tickets_left), ladder[snapshot.days_left - days_left])
+    if hasattr(scenario, 'calculate_prices'):
+        if hasattr(scenario, 'set_flight'):
+            # Forecast-aware models quote for the current flight
+            scenario.set_flight(snapshot.flight_id)
+        return scenario.calculate_prices
+    return scenario
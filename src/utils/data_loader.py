@@ -2,54 +2,427 @@
 Data loading and preprocessing utilities.
 """
 
+import json
+import os
+import shutil
+import uuid
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, Optional, Dict, Any, Iterator, Mapping, Sequence, Tuple
 
-import pandas as pd
 import numpy as np
 
+from .events import EventSink
+from .files import pid_alive, unique_sibling
+
+# pandas is only needed to parse the CSV, so it is imported on first use;
+# runs served from the columnar cache never pay for the import
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# CSV column backing each cached array
+CACHE_COLUMNS = {
+    'flight_id': 'Flight ID',
+    'days_before': 'Days Before Departure',
+    'demand': 'Demand',
+    'price': 'Price',
+}
+
+# Compact dtypes used by the streaming loader
+STREAM_DTYPES = {
+    'flight_id': np.int32,
+    'days_before': np.int16,
+    'demand': np.float32,
+    'price': np.float32,
+}
+
+# Bump when the cache layout changes so stale caches are rebuilt
+CACHE_VERSION = 2
+
+# Prefix of the per-writer directories holding a cache entry's arrays
+ENTRY_PREFIX = 'entry-'
+
 
 class FlightDataLoader:
     """Loader for flight pricing data."""
     
-    def __init__(self, data_path: str = 'data/synthetic/large_airline_pricing_simulation.csv'):
+    def __init__(self,
+                 data_path: str = 'data/synthetic/large_airline_pricing_simulation.csv',
+                 events: Optional[EventSink] = None,
+                 cache_dir: Optional[str] = None,
+                 use_cache: bool = True):
         """
         Initialize the data loader.
         
         Args:
             data_path: Path to the CSV data file
+            events: Sink for log messages (defaults to summary level)
+            cache_dir: Directory for the columnar cache (defaults to
+                '<data_path>.cache' next to the CSV)
+            use_cache: Whether to read and write the columnar cache
         """
         self.data_path = Path(data_path)
-        self.data: Optional[pd.DataFrame] = None
+        self.events = events or EventSink()
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else Path(f"{self.data_path}.cache")
+        self.use_cache = use_cache
+        self.missed_lookups = 0
+        # Optional DemandForecaster that missing records are sampled from
+        self.forecaster: Optional[Any] = None
+        
+        # Raw DataFrame, only populated when the CSV itself was parsed
+        self.data: Optional['pd.DataFrame'] = None
+        # Filtered columns keyed as in CACHE_COLUMNS; memory-mapped when
+        # loaded from the cache
+        self.columns: Optional[Dict[str, np.ndarray]] = None
         self.max_days: int = 0
+        
+        # Dense lookup tables built by load_data: one row per flight,
+        # one column per days-before-departure value (NaN where missing)
+        self.flight_ids: np.ndarray = np.empty(0, dtype=np.int64)
+        self.demand_table: np.ndarray = np.empty((0, 0))
+        self.price_table: np.ndarray = np.empty((0, 0))
+        self._flight_rows: Mapping[int, int] = {}
     
-    def load_data(self, class_type: str = 'Business') -> bool:
+    def load_data(self, class_type: str = 'Business', chunksize: Optional[int] = None) -> bool:
         """
         Load and preprocess the flight data.
         
+        The filtered columns and lookup tables are cached as .npy files per
+        class on first load; later loads memory-map them instead of parsing
+        the CSV, as long as the source file's mtime and size are unchanged.
+        
         Args:
             class_type: Type of flight class to filter for
+            chunksize: If given, stream the CSV in chunks of this many rows,
+                keeping only matching rows in compact dtypes (see
+                STREAM_DTYPES) so Economy rows never sit in memory
             
         Returns:
             bool: True if data was loaded successfully
         """
         try:
-            self.data = pd.read_csv(self.data_path)
-            print(f"\nLoaded data with columns: {self.data.columns.tolist()}")
+            if self.use_cache and self._load_cache(class_type, compact=chunksize is not None):
+                return True
             
-            # Filter for specified class
-            self.data = self.data[self.data['Class'] == class_type]
-            print(f"Number of {class_type} class records: {len(self.data)}")
-            
-            # Get maximum days
-            self.max_days = self.data['Days Before Departure'].max()
-            print(f"Maximum days before departure: {self.max_days}")
+            if chunksize is not None:
+                self._load_streaming(class_type, chunksize)
+            else:
+                self._load_frame(class_type)
             
+            self._finish_load(class_type, compact=chunksize is not None)
             return True
             
         except Exception as e:
-            print(f"Error loading data: {str(e)}")
+            self.events.summary(f"Error loading data: {str(e)}")
+            return False
+    
+    def load_classes(self, class_types: Optional[Sequence[str]] = None) -> Dict[str, 'FlightDataLoader']:
+        """
+        Load several cabin classes with a single pass over the CSV.
+        
+        Each class gets its own loader with its own dense tables; they share
+        this loader's path, event sink and cache settings, so a class loaded
+        here is also found by a later load_data(class_type). The CSV is only
+        parsed if some requested class has no valid cache entry.
+        
+        Args:
+            class_types: Classes to load (defaults to every class in the file)
+            
+        Returns:
+            Dict mapping class name to its loaded FlightDataLoader
+        """
+        loaders = {}
+        if class_types is not None:
+            for class_type in class_types:
+                loader = self._class_loader()
+                if not (self.use_cache and loader._load_cache(class_type)):
+                    break
+                loaders[class_type] = loader
+            else:
+                return loaders
+        
+        import pandas as pd
+        
+        frame = pd.read_csv(self.data_path, usecols=list(CACHE_COLUMNS.values()) + ['Class'])
+        self.events.summary(f"\nLoaded data with columns: {frame.columns.tolist()}")
+        groups = dict(iter(frame.groupby('Class', sort=False)))
+        if class_types is None:
+            class_types = list(groups)
+        
+        for class_type in class_types:
+            if class_type in loaders:
+                continue
+            if class_type not in groups:
+                raise ValueError(f"No {class_type} class records in {self.data_path}")
+            loader = self._class_loader()
+            loader.data = groups[class_type]
+            loader.columns = _frame_columns(loader.data)
+            self.events.summary(f"Number of {class_type} class records: {len(loader.data)}")
+            loader._finish_load(class_type)
+            loaders[class_type] = loader
+        return loaders
+    
+    def _class_loader(self) -> 'FlightDataLoader':
+        """Empty loader sharing this loader's source and settings."""
+        return FlightDataLoader(self.data_path, events=self.events,
+                                cache_dir=self.cache_dir, use_cache=self.use_cache)
+    
+    def _finish_load(self, class_type: str, compact: bool = False) -> None:
+        """Build the lookup tables from freshly parsed columns and cache them."""
+        # Get maximum days
+        self.max_days = int(self.columns['days_before'].max())
+        self.events.summary(f"Maximum days before departure: {self.max_days}")
+        
+        self._build_index()
+        
+        if self.use_cache:
+            self._write_cache(class_type, compact=compact)
+    
+    def _load_frame(self, class_type: str) -> None:
+        """Parse the whole CSV into a DataFrame and extract the class's columns."""
+        import pandas as pd
+        
+        self.data = pd.read_csv(self.data_path)
+        self.events.summary(f"\nLoaded data with columns: {self.data.columns.tolist()}")
+        
+        # Filter for specified class
+        self.data = self.data[self.data['Class'] == class_type]
+        self.events.summary(f"Number of {class_type} class records: {len(self.data)}")
+        
+        self.columns = _frame_columns(self.data)
+    
+    def _read_chunks(self, class_type: str, chunksize: int) -> Iterator['pd.DataFrame']:
+        """Yield CSV chunks already filtered to one class, in compact dtypes."""
+        import pandas as pd
+        
+        reader = pd.read_csv(
+            self.data_path,
+            usecols=list(CACHE_COLUMNS.values()) + ['Class'],
+            dtype={CACHE_COLUMNS[name]: dtype for name, dtype in STREAM_DTYPES.items()},
+            chunksize=chunksize
+        )
+        for chunk in reader:
+            yield chunk[chunk['Class'] == class_type]
+    
+    def _load_streaming(self, class_type: str, chunksize: int) -> None:
+        """Stream the CSV into preallocated compact arrays, growing them geometrically."""
+        capacity = chunksize
+        columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in STREAM_DTYPES.items()}
+        n_rows = 0
+        
+        for chunk in self._read_chunks(class_type, chunksize):
+            end = n_rows + len(chunk)
+            if end > capacity:
+                capacity = max(end, 2 * capacity)
+                for name in columns:
+                    grown = np.empty(capacity, dtype=columns[name].dtype)
+                    grown[:n_rows] = columns[name][:n_rows]
+                    columns[name] = grown
+            for name, csv_name in CACHE_COLUMNS.items():
+                columns[name][n_rows:end] = chunk[csv_name].to_numpy()
+            n_rows = end
+        
+        self.columns = {name: array[:n_rows] for name, array in columns.items()}
+        self.events.summary(f"\nStreamed {class_type} class data from {self.data_path}")
+        self.events.summary(f"Number of {class_type} class records: {n_rows}")
+    
+    def iter_flights(self,
+                     class_type: str = 'Business',
+                     chunksize: int = 100000,
+                     max_days: Optional[int] = None) -> Iterator[Tuple[int, Dict[str, np.ndarray]]]:
+        """
+        Stream one flight's trajectory at a time straight from the CSV.
+        
+        Only the current chunk and the flight being assembled are held in
+        memory, so peak memory is bounded regardless of file size. Rows of
+        each flight must be contiguous in the file (as they are in the
+        synthetic exports).
+        
+        Args:
+            class_type: Type of flight class to filter for
+            chunksize: Number of CSV rows read per chunk
+            max_days: Trajectory length is max_days + 1; defaults to the
+                loaded max_days, or to each flight's own maximum if no
+                data has been loaded
+            
+        Yields:
+            Tuple of flight ID and a dict with 'demand' and 'price' arrays
+            indexed by days before departure (NaN where missing)
+        """
+        horizon = max_days if max_days is not None else (self.max_days or None)
+        seen = set()
+        pending_id = None
+        pending = []
+        
+        def assemble(parts):
+            days = np.concatenate([part[0] for part in parts]).astype(np.int64)
+            demand = np.concatenate([part[1] for part in parts])
+            price = np.concatenate([part[2] for part in parts])
+            length = (horizon if horizon is not None else int(days.max())) + 1
+            in_range = days < length
+            trajectory = {'demand': np.full(length, np.nan), 'price': np.full(length, np.nan)}
+            # Reverse order so the first record wins on duplicates
+            trajectory['demand'][days[in_range][::-1]] = demand[in_range][::-1]
+            trajectory['price'][days[in_range][::-1]] = price[in_range][::-1]
+            return trajectory
+        
+        for chunk in self._read_chunks(class_type, chunksize):
+            flight_col = chunk['Flight ID'].to_numpy()
+            if not len(flight_col):
+                continue
+            days_col = chunk['Days Before Departure'].to_numpy()
+            demand_col = chunk['Demand'].to_numpy()
+            price_col = chunk['Price'].to_numpy()
+            
+            # Start of each run of identical flight IDs within the chunk
+            starts = np.flatnonzero(np.r_[True, flight_col[1:] != flight_col[:-1]])
+            stops = np.r_[starts[1:], len(flight_col)]
+            for start, stop in zip(starts, stops):
+                flight_id = int(flight_col[start])
+                part = (days_col[start:stop], demand_col[start:stop], price_col[start:stop])
+                if flight_id == pending_id:
+                    pending.append(part)
+                    continue
+                if pending_id is not None:
+                    yield pending_id, assemble(pending)
+                if flight_id in seen:
+                    raise ValueError(f"Rows for flight {flight_id} are not contiguous in {self.data_path}")
+                seen.add(flight_id)
+                pending_id, pending = flight_id, [part]
+        
+        if pending_id is not None:
+            yield pending_id, assemble(pending)
+    
+    def _cache_signature(self, class_type: str, compact: bool) -> Dict[str, Any]:
+        """Describe the source file a cache entry must match."""
+        stat = self.data_path.stat()
+        return {
+            'version': CACHE_VERSION,
+            'class_type': class_type,
+            'compact': compact,
+            'source_mtime_ns': stat.st_mtime_ns,
+            'source_size': stat.st_size,
+        }
+    
+    def _cache_class_dir(self, class_type: str, compact: bool) -> Path:
+        """Directory holding one cache entry."""
+        return self.cache_dir / (f"{class_type}-compact" if compact else class_type)
+    
+    def _load_cache(self, class_type: str, compact: bool = False) -> bool:
+        """Memory-map a valid cache entry; return False on a miss."""
+        class_dir = self._cache_class_dir(class_type, compact)
+        meta_path = class_dir / 'meta.json'
+        if not meta_path.exists():
+            return False
+        
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('signature') != self._cache_signature(class_type, compact):
+            return False
+        
+        entry_dir = class_dir / meta['entry']
+        try:
+            arrays = {name: np.load(entry_dir / f"{name}.npy", mmap_mode='r')
+                      for name in tuple(CACHE_COLUMNS) + ('flight_ids', 'demand_table', 'price_table')}
+        except (OSError, ValueError):
+            # Superseded by a newer entry and removed while we were loading
             return False
+        self.columns = {name: arrays[name] for name in CACHE_COLUMNS}
+        self.flight_ids = arrays['flight_ids']
+        self.demand_table = arrays['demand_table']
+        self.price_table = arrays['price_table']
+        self._remove_stale_entries(entry_dir)
+        self.set_row_index()
+        self.max_days = int(meta['max_days'])
+        
+        self.events.summary(f"\nLoaded cached {class_type} class data from {class_dir}")
+        self.events.summary(f"Number of {class_type} class records: {len(self.columns['flight_id'])}")
+        self.events.summary(f"Maximum days before departure: {self.max_days}")
+        return True
+    
+    def _write_cache(self, class_type: str, compact: bool = False) -> None:
+        """Write the cache entry into a new entry directory and publish it."""
+        try:
+            entry_dir = self._new_cache_entry(class_type, compact)
+            try:
+                arrays = dict(self.columns,
+                              flight_ids=self.flight_ids,
+                              demand_table=self.demand_table,
+                              price_table=self.price_table)
+                for name, array in arrays.items():
+                    np.save(entry_dir / f"{name}.npy", np.ascontiguousarray(array))
+                self._publish_cache_entry(entry_dir, class_type, compact, self.max_days)
+            except BaseException:
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                raise
+        except OSError as e:
+            self.events.summary(f"Could not write data cache: {str(e)}")
+    
+    def _new_cache_entry(self, class_type: str, compact: bool = False) -> Path:
+        """
+        Create an empty directory, private to this writer, for an entry's arrays.
+        
+        Each writer fills its own directory, so processes loading the same
+        uncached CSV at once never write over each other's files.
+        """
+        class_dir = self._cache_class_dir(class_type, compact)
+        entry_dir = class_dir / f"{ENTRY_PREFIX}{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        entry_dir.mkdir(parents=True)
+        return entry_dir
+    
+    def _publish_cache_entry(self, entry_dir: Path, class_type: str, compact: bool, max_days: int) -> None:
+        """
+        Make a complete entry directory the valid one.
+        
+        meta.json names the entry and is swapped in atomically, so readers
+        see either the previous entry or this one. Entries superseded by
+        this process or left by writers that no longer run are removed.
+        """
+        class_dir = entry_dir.parent
+        meta_path = class_dir / 'meta.json'
+        tmp_meta = unique_sibling(meta_path)
+        with open(tmp_meta, 'w') as f:
+            json.dump({'signature': self._cache_signature(class_type, compact),
+                       'max_days': max_days,
+                       'entry': entry_dir.name}, f)
+        os.replace(tmp_meta, meta_path)
+        self._remove_stale_entries(entry_dir)
+    
+    @staticmethod
+    def _remove_stale_entries(current: Path) -> None:
+        """Remove the entries next to current written by this process or by writers no longer running."""
+        for path in current.parent.glob(f"{ENTRY_PREFIX}*"):
+            pid = path.name[len(ENTRY_PREFIX):].split('-', 1)[0]
+            if path != current and pid.isdigit() and (int(pid) == os.getpid() or not pid_alive(int(pid))):
+                # Open memory maps of a removed entry stay valid on POSIX
+                shutil.rmtree(path, ignore_errors=True)
+    
+    def _build_index(self) -> None:
+        """Build the dense (flight, days_before) demand and price tables."""
+        days_col = self.columns['days_before']
+        
+        self.flight_ids, rows = np.unique(self.columns['flight_id'], return_inverse=True)
+        self.set_row_index()
+        
+        shape = (len(self.flight_ids), self.max_days + 1)
+        self.demand_table = np.full(shape, np.nan, dtype=self.columns['demand'].dtype)
+        self.price_table = np.full(shape, np.nan, dtype=self.columns['price'].dtype)
+        
+        # Reverse order so the first record wins on duplicates, as .iloc[0] did
+        self.demand_table[rows[::-1], days_col[::-1]] = self.columns['demand'][::-1]
+        self.price_table[rows[::-1], days_col[::-1]] = self.columns['price'][::-1]
+    
+    def set_row_index(self, row_index: Optional[Mapping[int, int]] = None) -> None:
+        """
+        Set the flight ID -> table row lookup used by the accessors.
+        
+        Args:
+            row_index: Mapping from flight ID to its row in flight_ids and
+                the tables (defaults to a dict built from flight_ids)
+        """
+        if row_index is None:
+            row_index = {int(fid): row for row, fid in enumerate(self.flight_ids)}
+        self._flight_rows = row_index
     
     def get_flight_data(self, 
                        flight_id: int, 
@@ -64,27 +437,85 @@ class FlightDataLoader:
         Returns:
             Dict containing demand and historical price
         """
-        if self.data is None:
-            return {'demand': np.random.uniform(20, 40), 'price': None}
+        if self.columns is None:
+            return {'demand': self._fallback_demand(flight_id, days_before), 'price': None}
         
-        try:
-            flight_data = self.data.loc[
-                (self.data['Flight ID'] == flight_id) & 
-                (self.data['Days Before Departure'] == days_before)
-            ].iloc[0]
+        row = self._flight_rows.get(flight_id)
+        if row is not None and 0 <= days_before <= self.max_days:
+            demand = self.demand_table[row, days_before]
+            if not np.isnan(demand):
+                return {
+                    'demand': float(demand),
+                    'price': float(self.price_table[row, days_before])
+                }
+        
+        self.missed_lookups += 1
+        if self.events.per_day:
+            self.events.detail(f"Error getting flight data: no record for flight {flight_id} "
+                               f"at {days_before} days before departure")
+        return {'demand': self._fallback_demand(flight_id, days_before), 'price': None}
+    
+    def _fallback_demand(self, flight_id: int, days_before: int) -> float:
+        """Demand used where no record exists."""
+        if self.forecaster is not None:
+            return self.forecaster.sample(flight_id, days_before)
+        return np.random.uniform(20, 40)
+    
+    def get_flight_trajectory(self, flight_id: int) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Get the full demand and price trajectory for a flight.
+        
+        Args:
+            flight_id: Flight identifier
             
-            return {
-                'demand': float(flight_data['Demand']),
-                'price': float(flight_data['Price'])
-            }
+        Returns:
+            Dict with 'demand' and 'price' arrays indexed by days before
+            departure (NaN where no record exists), or None if unknown
+        """
+        row = self._flight_rows.get(flight_id)
+        if row is None:
+            return None
+        return {
+            'demand': self.demand_table[row],
+            'price': self.price_table[row]
+        }
+    
+    def get_flight_trajectories(self, flight_ids) -> Dict[str, np.ndarray]:
+        """
+        Get demand and price trajectories for many flights at once.
+        
+        Args:
+            flight_ids: Sequence of flight identifiers
             
-        except Exception as e:
-            print(f"Error getting flight data: {str(e)}")
-            return {'demand': np.random.uniform(20, 40), 'price': None}
+        Returns:
+            Dict with 'demand' and 'price' arrays of shape
+            (len(flight_ids), max_days + 1), indexed by days before
+            departure; rows for unknown flights are all NaN
+        """
+        shape = (len(flight_ids), self.max_days + 1)
+        demand = np.full(shape, np.nan)
+        price = np.full(shape, np.nan)
+        
+        rows = np.array([self._flight_rows.get(int(fid), -1) for fid in flight_ids], dtype=np.int64)
+        known = rows >= 0
+        demand[known] = self.demand_table[rows[known]]
+        price[known] = self.price_table[rows[known]]
+        
+        return {'demand': demand, 'price': price}
     
     @property
     def available_flight_ids(self) -> list:
         """Get list of available flight IDs in the data."""
-        if self.data is None:
+        if self.columns is None:
             return []
-        return sorted(self.data['Flight ID'].unique()) 
\ No newline at end of file
+        return [int(fid) for fid in self.flight_ids]
+
+
+def _frame_columns(frame: 'pd.DataFrame') -> Dict[str, np.ndarray]:
+    """Extract the CACHE_COLUMNS arrays from a class-filtered frame."""
+    return {
+        'flight_id': frame['Flight ID'].to_numpy(dtype=np.int64),
+        'days_before': frame['Days Before Departure'].to_numpy(dtype=np.int64),
+        'demand': frame['Demand'].to_numpy(dtype=float),
+        'price': frame['Price'].to_numpy(dtype=float),
+    }
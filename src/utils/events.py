@@ -0,0 +1,148 @@
+"""
+Buffered event sink for simulation tracing.
+"""
+
+import sys
+from pathlib import Path
+from typing import Optional, TextIO
+
+import numpy as np
+
+
+# Trace levels
+TRACE_OFF = 0
+TRACE_SUMMARY = 1
+TRACE_PER_DAY = 2
+
+# Layout of one per-day record, both in memory and in the binary trace file
+DAY_EVENT_DTYPE = np.dtype([
+    ('flight_id', np.int64),
+    ('day', np.int32),
+    ('price', np.float64),
+    ('historical_price', np.float64),
+    ('demand', np.float64),
+])
+
+
+class EventSink:
+    """
+    Leveled sink for simulator messages and per-day trace records.
+    
+    Hot loops should guard calls with the ``per_day`` / ``summary_enabled``
+    attributes so that disabled tracing costs a single attribute check.
+    Per-day records are written into a preallocated structured array and
+    flushed in bulk, either appended to a binary file (one DAY_EVENT_DTYPE
+    record each) or formatted to a text stream.
+    """
+    
+    def __init__(self,
+                 level: int = TRACE_SUMMARY,
+                 path: Optional[str] = None,
+                 buffer_size: int = 65536,
+                 stream: Optional[TextIO] = None):
+        """
+        Initialize the sink.
+        
+        Args:
+            level: One of TRACE_OFF, TRACE_SUMMARY, TRACE_PER_DAY
+            path: Binary file per-day records are appended to; if None they
+                are printed to the stream when flushed
+            buffer_size: Number of per-day records buffered between flushes
+            stream: Text stream for messages (defaults to sys.stdout)
+        """
+        self.level = level
+        self.summary_enabled = level >= TRACE_SUMMARY
+        self.per_day = level >= TRACE_PER_DAY
+        self.path = Path(path) if path is not None else None
+        self.stream = stream
+        
+        self._buffer = np.empty(buffer_size if self.per_day else 0, dtype=DAY_EVENT_DTYPE)
+        self._count = 0
+    
+    def summary(self, message: str) -> None:
+        """Emit a summary-level message."""
+        if self.summary_enabled:
+            print(message, file=self.stream or sys.stdout)
+    
+    def detail(self, message: str) -> None:
+        """Emit a per-day-level message."""
+        if self.per_day:
+            print(message, file=self.stream or sys.stdout)
+    
+    def record_day(self,
+                   flight_id: int,
+                   day: int,
+                   price: float,
+                   historical_price: Optional[float],
+                   demand: float) -> None:
+        """
+        Buffer one per-day record.
+        
+        Args:
+            flight_id: Flight identifier
+            day: Day index within the simulation
+            price: Price charged
+            historical_price: Historical price, or None if unknown
+            demand: Demand level
+        """
+        if historical_price is None:
+            historical_price = np.nan
+        self._buffer[self._count] = (flight_id, day, price, historical_price, demand)
+        self._count += 1
+        if self._count == len(self._buffer):
+            self.flush()
+    
+    def flush(self) -> None:
+        """Write all buffered per-day records in one go."""
+        if not self._count:
+            return
+        records = self._buffer[:self._count]
+        
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'ab') as f:
+                f.write(records.tobytes())
+        else:
+            lines = []
+            for record in records:
+                line = (f"Flight {record['flight_id']} Day {record['day'] + 1}: "
+                        f"Our price: ${record['price']:.2f}, ")
+                if not np.isnan(record['historical_price']):
+                    line += f"Historical: ${record['historical_price']:.2f}, "
+                lines.append(line + f"Demand: {record['demand']:.1f}")
+            (self.stream or sys.stdout).write('\n'.join(lines) + '\n')
+        
+        self._count = 0
+    
+    def end_run(self) -> None:
+        """
+        Mark the end of a simulation run.
+        
+        Text output is flushed so it stays next to the run's summary;
+        file output keeps buffering until the buffer fills or close().
+        """
+        if self.path is None:
+            self.flush()
+    
+    def close(self) -> None:
+        """Flush any buffered records."""
+        self.flush()
+    
+    def __enter__(self) -> 'EventSink':
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_day_events(path: str) -> np.ndarray:
+    """
+    Read a binary per-day trace file written by EventSink.
+    
+    Args:
+        path: Trace file path
+        
+    Returns:
+        np.ndarray: Structured array of DAY_EVENT_DTYPE records
+    """
+    return np.fromfile(path, dtype=DAY_EVENT_DTYPE)
@@ -0,0 +1,37 @@
+"""
+Helpers for publishing files safely when several processes write the same path.
+"""
+
+import os
+import uuid
+from pathlib import Path
+from typing import Union
+
+
+def unique_sibling(path: Union[str, Path]) -> Path:
+    """
+    Temporary path next to path, unique to this process and call.
+    
+    Write here and os.replace onto path, so concurrent writers never share
+    a temporary file and readers only ever see a complete file. The
+    suffix is kept (e.g. '.npy', which np.save would otherwise append).
+    
+    Args:
+        path: Final path
+    
+    Returns:
+        Path: '<stem>.<pid>-<random>.tmp<suffix>' in the same directory
+    """
+    path = Path(path)
+    return path.with_name(f"{path.stem}.{os.getpid()}-{uuid.uuid4().hex[:8]}.tmp{path.suffix}")
+
+
+def pid_alive(pid: int) -> bool:
+    """Whether a process with this pid exists."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
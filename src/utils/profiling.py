@@ -0,0 +1,272 @@
+"""
+Lightweight per-stage timing counters and optional profiler capture.
+"""
+
+import argparse
+import atexit
+import cProfile
+import json
+import multiprocessing
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+# Environment variables read by default_profiler
+PROFILE_ENV = 'AIRLINE_PROFILE'
+PROFILE_OUTPUT_ENV = 'AIRLINE_PROFILE_OUTPUT'
+
+# Profiling modes: stage counters only, plus cProfile, or plus stack sampling
+PROFILE_MODES = ('stages', 'cprofile', 'sample')
+
+
+class Profiler:
+    """
+    Monotonic-clock counters and call counts per named stage.
+    
+    Stage names are ';'-separated paths ('run_simulation;calculate_price'),
+    which is also how they are nested in the collapsed-stack export. Hot
+    loops should read ``enabled`` once and time with lap, e.g.::
+        
+        timing = profiler.enabled
+        if timing:
+            t = time.perf_counter_ns()
+        ...
+        if timing:
+            t = profiler.lap('run;stage', t)
+    
+    so a disabled profiler costs a single attribute check. Stages timed
+    with lap are recorded under the current scope, so a caller can push
+    'run_analysis' and have the simulator's stages nest beneath it.
+    
+    In 'cprofile' mode a cProfile.Profile runs between start and stop; in
+    'sample' mode a background thread records the main thread's Python
+    stack every sample_interval seconds.
+    """
+    
+    def __init__(self, mode: Optional[str] = None, sample_interval: float = 0.001):
+        """
+        Initialize the profiler.
+        
+        Args:
+            mode: None (disabled) or one of PROFILE_MODES
+            sample_interval: Seconds between stack samples in 'sample' mode
+        """
+        if mode is not None and mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        self.mode = mode
+        self.enabled = mode is not None
+        self.sample_interval = sample_interval
+        
+        self.total_ns: Dict[str, int] = {}
+        self.calls: Dict[str, int] = {}
+        self.samples: Counter = Counter()
+        self.prefix = ''
+        self._scopes = []
+        
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[threading.Thread] = None
+        self._stop_sampling = threading.Event()
+    
+    def add(self, stage: str, elapsed_ns: int, calls: int = 1) -> None:
+        """Add elapsed time and calls to a stage."""
+        self.total_ns[stage] = self.total_ns.get(stage, 0) + elapsed_ns
+        self.calls[stage] = self.calls.get(stage, 0) + calls
+    
+    def push(self, scope: str) -> None:
+        """Nest stages timed from now on under scope."""
+        self._scopes.append(self.prefix)
+        self.prefix = f"{self.prefix}{scope};"
+    
+    def pop(self) -> None:
+        """Leave the scope entered by the matching push."""
+        self.prefix = self._scopes.pop()
+    
+    def lap(self, stage: str, start_ns: int) -> int:
+        """
+        Charge the time since start_ns to a stage in the current scope.
+        
+        Args:
+            stage: Stage name
+            start_ns: time.perf_counter_ns() at the start of the stage
+        
+        Returns:
+            int: The current time, to start the next stage from
+        """
+        now = time.perf_counter_ns()
+        self.add(self.prefix + stage, now - start_ns)
+        return now
+    
+    def merge(self, other: 'Profiler') -> 'Profiler':
+        """Fold another profiler's counters and samples into this one."""
+        for stage, elapsed in other.total_ns.items():
+            self.add(stage, elapsed, other.calls.get(stage, 0))
+        self.samples.update(other.samples)
+        return self
+    
+    def start(self) -> None:
+        """Start cProfile or stack sampling, depending on the mode."""
+        if self.mode == 'cprofile' and self._cprofile is None:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        elif self.mode == 'sample' and self._sampler is None:
+            self._stop_sampling.clear()
+            self._sampler = threading.Thread(target=self._sample,
+                                             args=(threading.main_thread().ident,),
+                                             daemon=True)
+            self._sampler.start()
+    
+    def stop(self) -> None:
+        """Stop cProfile or stack sampling."""
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._sampler is not None:
+            self._stop_sampling.set()
+            self._sampler.join()
+            self._sampler = None
+    
+    def _sample(self, thread_id: int) -> None:
+        """Record the target thread's stack until stopped."""
+        while not self._stop_sampling.wait(self.sample_interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{Path(code.co_filename).name}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+    
+    def report(self) -> Dict[str, Any]:
+        """
+        Summarize the counters.
+        
+        Returns:
+            Dict with per-stage 'calls', 'total_s' and 'mean_us', and the
+            top cProfile entries or the sample count when captured
+        """
+        stages = {
+            stage: {
+                'calls': self.calls[stage],
+                'total_s': elapsed / 1e9,
+                'mean_us': elapsed / 1e3 / max(self.calls[stage], 1),
+            }
+            for stage, elapsed in sorted(self.total_ns.items())
+        }
+        report: Dict[str, Any] = {'mode': self.mode, 'stages': stages}
+        
+        if self._cprofile is not None:
+            stats = pstats.Stats(self._cprofile)
+            top = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:30]
+            report['cprofile'] = [
+                {'function': f"{Path(filename).name}:{line}({name})",
+                 'calls': calls,
+                 'total_s': total,
+                 'cumulative_s': cumulative}
+                for (filename, line, name), (_, calls, total, cumulative, _) in top
+            ]
+        if self.samples:
+            report['samples'] = sum(self.samples.values())
+        return report
+    
+    def collapsed_stacks(self) -> Dict[str, int]:
+        """
+        Flame-graph weights keyed by ';'-joined stack.
+        
+        Uses the stack samples when there are any (weight = sample count),
+        otherwise the stage counters (weight = self time in microseconds,
+        i.e. the stage's time minus that of its direct children).
+        """
+        if self.samples:
+            return dict(self.samples)
+        
+        stacks = {}
+        for stage, elapsed in self.total_ns.items():
+            children = sum(child_elapsed for child, child_elapsed in self.total_ns.items()
+                           if child.rpartition(';')[0] == stage)
+            weight = (elapsed - children) // 1000
+            if weight > 0:
+                stacks[stage] = weight
+        return stacks
+    
+    def write(self, prefix: str) -> None:
+        """
+        Write '<prefix>.json', '<prefix>.collapsed' and, in 'cprofile'
+        mode, '<prefix>.prof' (readable with pstats or snakeviz).
+        
+        Args:
+            prefix: Output path without extension
+        """
+        with open(f"{prefix}.json", 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        with open(f"{prefix}.collapsed", 'w') as f:
+            for stack, weight in sorted(self.collapsed_stacks().items()):
+                f.write(f"{stack} {weight}\n")
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(f"{prefix}.prof")
+    
+    def print_report(self) -> None:
+        """Print the stage counters as a table."""
+        print("\nProfile (per stage):")
+        print(f"{'stage':<50} {'calls':>10} {'total s':>10} {'mean us':>10}")
+        for stage, row in self.report()['stages'].items():
+            print(f"{stage:<50} {row['calls']:>10} {row['total_s']:>10.4f} {row['mean_us']:>10.2f}")
+
+
+_default_profiler: Optional[Profiler] = None
+
+
+def default_profiler() -> Profiler:
+    """
+    Get the process-wide profiler.
+    
+    Its mode comes from the AIRLINE_PROFILE environment variable ('' or
+    unset disables it). When enabled in the main process, capture starts
+    immediately and the results are written at exit to
+    AIRLINE_PROFILE_OUTPUT (default 'profile') with the extensions listed
+    in Profiler.write; worker processes only count stages.
+    """
+    global _default_profiler
+    if _default_profiler is None:
+        _default_profiler = Profiler(os.environ.get(PROFILE_ENV) or None)
+        if _default_profiler.enabled and multiprocessing.parent_process() is None:
+            _start_until_exit(_default_profiler, os.environ.get(PROFILE_OUTPUT_ENV, 'profile'))
+    return _default_profiler
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add --profile and --profile-output flags to a command-line parser."""
+    parser.add_argument('--profile', choices=PROFILE_MODES, default=None,
+                        help=f"collect per-stage timings (overrides ${PROFILE_ENV})")
+    parser.add_argument('--profile-output', default='profile',
+                        help="output path prefix for the .json/.collapsed/.prof files")
+
+
+def profiler_from_args(args: argparse.Namespace) -> Profiler:
+    """
+    Build the profiler selected on the command line.
+    
+    Falls back to default_profiler when --profile is not given. The chosen
+    profiler becomes the process-wide default, starts capturing, and
+    writes its results at exit.
+    """
+    global _default_profiler
+    if args.profile is None:
+        return default_profiler()
+    _default_profiler = Profiler(args.profile)
+    _start_until_exit(_default_profiler, args.profile_output)
+    return _default_profiler
+
+
+def _start_until_exit(profiler: Profiler, prefix: str) -> None:
+    """Start capturing and write the results when the process exits."""
+    def finish():
+        profiler.stop()
+        profiler.write(prefix)
+    profiler.start()
+    atexit.register(finish)
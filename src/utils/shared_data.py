@@ -0,0 +1,244 @@
+"""
+Zero-copy sharing of arrays, and of a loaded dataset, between processes.
+"""
+
+import multiprocessing
+import os
+import sys
+import weakref
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+import numpy as np
+
+from .data_loader import CACHE_COLUMNS, FlightDataLoader
+from .events import EventSink
+from .files import pid_alive
+
+
+# Segment names are '<prefix><owner pid>_<token>_<array index>', short
+# enough for macOS, so leftovers from a crashed owner can be recognized
+# by cleanup_stale_segments
+SEGMENT_PREFIX = 'airline_'
+
+# Loader arrays published to shared memory
+SHARED_ARRAYS = tuple(CACHE_COLUMNS) + ('flight_ids', 'demand_table', 'price_table')
+
+
+class SharedArrays:
+    """
+    A set of named NumPy arrays published in shared memory.
+    
+    The owning process creates one multiprocessing.shared_memory segment
+    per array and copies the data in once. Worker processes receive the
+    small, picklable ``descriptor`` (segment names, shapes, dtypes and any
+    metadata) and call attach_arrays to map the same pages as read-only
+    arrays, with no pickling or copying of the data itself.
+    
+    The owner unlinks the segments on close, on leaving a with block, at
+    interpreter exit, or when garbage collected (via weakref.finalize, so
+    nothing keeps an unused instance alive). Segments left behind by an
+    owner that was killed are removed by cleanup_stale_segments, which
+    every new owner runs before publishing.
+    """
+    
+    def __init__(self, arrays: Mapping[str, np.ndarray], meta: Optional[Dict[str, Any]] = None):
+        """
+        Publish arrays.
+        
+        Args:
+            arrays: Arrays to share, by name
+            meta: Small picklable values passed along in the descriptor
+        """
+        cleanup_stale_segments()
+        self._segments: Dict[str, shared_memory.SharedMemory] = {}
+        self._finalizer = weakref.finalize(self, _release_segments, self._segments)
+        token = os.urandom(4).hex()
+        specs = {}
+        try:
+            for index, (name, array) in enumerate(arrays.items()):
+                array = np.ascontiguousarray(array)
+                segment = shared_memory.SharedMemory(
+                    name=f"{SEGMENT_PREFIX}{os.getpid()}_{token}_{index}",
+                    create=True, size=max(array.nbytes, 1))
+                self._segments[name] = segment
+                np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+                specs[name] = (segment.name, array.shape, array.dtype.str)
+        except BaseException:
+            self.close()
+            raise
+        
+        self.descriptor = {'arrays': specs, 'meta': dict(meta or {})}
+    
+    @property
+    def nbytes(self) -> int:
+        """Total size of the published segments."""
+        return sum(segment.size for segment in self._segments.values())
+    
+    def close(self) -> None:
+        """Release and unlink every segment (safe to call more than once)."""
+        self._finalizer()
+    
+    def __enter__(self) -> 'SharedArrays':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _release_segments(segments: Dict[str, shared_memory.SharedMemory]) -> None:
+    """Close and unlink owned segments; the finalizer of SharedArrays."""
+    while segments:
+        _, segment = segments.popitem()
+        segment.close()
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedRowIndex(Mapping):
+    """Flight ID -> row mapping backed by a sorted, shared flight_ids array."""
+    
+    def __init__(self, flight_ids: np.ndarray):
+        self.flight_ids = flight_ids
+    
+    def __getitem__(self, flight_id: int) -> int:
+        row = int(np.searchsorted(self.flight_ids, flight_id))
+        if row < len(self.flight_ids) and self.flight_ids[row] == flight_id:
+            return row
+        raise KeyError(flight_id)
+    
+    def __iter__(self) -> Iterator[int]:
+        return (int(fid) for fid in self.flight_ids)
+    
+    def __len__(self) -> int:
+        return len(self.flight_ids)
+
+
+# Segments attached by this process, kept open for the views' lifetime
+_attached: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def attach_arrays(descriptor: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Map arrays published by SharedArrays into this process.
+    
+    Args:
+        descriptor: SharedArrays.descriptor from the owning process
+    
+    Returns:
+        Dict of read-only arrays by name
+    """
+    views = {}
+    for name, (segment_name, shape, dtype) in descriptor['arrays'].items():
+        segment = _attached.get(segment_name)
+        if segment is None:
+            segment = _attach_segment(segment_name)
+            _attached[segment_name] = segment
+        view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+        view.flags.writeable = False
+        views[name] = view
+    return views
+
+
+def share_loader(loader: FlightDataLoader) -> SharedArrays:
+    """
+    Publish a loaded FlightDataLoader's filtered columns and lookup tables.
+    
+    The flight-ID to row index is shared the same way, as the sorted
+    flight_ids array that the rows of the tables follow.
+    
+    Args:
+        loader: Loader whose load_data has succeeded
+    
+    Returns:
+        SharedArrays: Owner of the segments; pass its descriptor to
+            attach_loader in the workers
+    """
+    if loader.columns is None:
+        raise ValueError("Loader has no data to share; call load_data first")
+    arrays = dict(loader.columns,
+                  flight_ids=loader.flight_ids,
+                  demand_table=loader.demand_table,
+                  price_table=loader.price_table)
+    return SharedArrays({name: arrays[name] for name in SHARED_ARRAYS},
+                        meta={'data_path': str(loader.data_path), 'max_days': loader.max_days})
+
+
+def attach_loader(descriptor: Mapping[str, Any],
+                  events: Optional[EventSink] = None) -> FlightDataLoader:
+    """
+    Build a FlightDataLoader on top of arrays published by share_loader.
+    
+    Args:
+        descriptor: Descriptor of the SharedArrays returned by share_loader
+        events: Sink for log messages
+    
+    Returns:
+        FlightDataLoader: Loader with read-only shared arrays, ready to use
+            without calling load_data
+    """
+    views = attach_arrays(descriptor)
+    meta = descriptor['meta']
+    loader = FlightDataLoader(meta['data_path'], events=events, use_cache=False)
+    loader.columns = {name: views[name] for name in CACHE_COLUMNS}
+    loader.flight_ids = views['flight_ids']
+    loader.demand_table = views['demand_table']
+    loader.price_table = views['price_table']
+    loader.max_days = meta['max_days']
+    loader.set_row_index(SharedRowIndex(loader.flight_ids))
+    return loader
+
+
+def _attach_segment(name: str) -> shared_memory.SharedMemory:
+    """Open an existing segment without taking ownership of it."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    segment = shared_memory.SharedMemory(name=name)
+    # Before 3.13 attaching registers the segment with this process's
+    # resource tracker, which would unlink it when this process exits.
+    # Drop that one registration, unless the tracker is the owner's
+    # (the owner itself, or a pool worker it forked or spawned), where
+    # the registration is the owner's own entry
+    # (POSIX only; the tracker knows the segment by its '/'-prefixed name)
+    if os.name == 'posix' and not _shares_owner_tracker(name):
+        resource_tracker.unregister('/' + segment.name, 'shared_memory')
+    return segment
+
+
+def _shares_owner_tracker(name: str) -> bool:
+    """Whether this process uses the resource tracker of the segment's owner."""
+    pid = name[len(SEGMENT_PREFIX):].split('_', 1)[0]
+    if not name.startswith(SEGMENT_PREFIX) or not pid.isdigit():
+        return False
+    parent = multiprocessing.parent_process()
+    return int(pid) in (os.getpid(), parent.pid if parent is not None else None)
+
+
+def cleanup_stale_segments(shm_dir: str = '/dev/shm') -> int:
+    """
+    Unlink segments whose owning process no longer exists.
+    
+    Only needed after an owner was killed without running its exit
+    handlers, and run by every new SharedArrays; a no-op where shared
+    memory is not backed by shm_dir.
+    
+    Args:
+        shm_dir: Directory backing POSIX shared memory
+    
+    Returns:
+        int: Number of segments removed
+    """
+    removed = 0
+    for path in Path(shm_dir).glob(f"{SEGMENT_PREFIX}*"):
+        pid = path.name[len(SEGMENT_PREFIX):].split('_', 1)[0]
+        if not pid.isdigit() or pid_alive(int(pid)):
+            continue
+        try:
+            path.unlink()
+            removed += 1
+        except OSError:
+            pass
+    return removed
@@ -0,0 +1,268 @@
+"""
+Streaming, mergeable statistics accumulators.
+"""
+
+import math
+from typing import Dict, Tuple, Union
+
+import numpy as np
+
+
+class RunningStats:
+    """
+    Welford accumulator for count, mean, variance, min and max.
+    
+    Works element-wise over a fixed shape, so a single instance can track
+    e.g. one statistic per simulated day. NaN observations are skipped per
+    element. Partial accumulators (e.g. from parallel workers) combine
+    exactly with merge.
+    """
+    
+    def __init__(self, shape: Union[int, Tuple[int, ...]] = ()):
+        """
+        Initialize an empty accumulator.
+        
+        Args:
+            shape: Shape of each observation
+        """
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+    
+    def update(self, value) -> None:
+        """
+        Add one observation.
+        
+        Args:
+            value: Scalar or array of the accumulator's shape (NaN skipped)
+        """
+        value = np.asarray(value, dtype=float)
+        valid = ~np.isnan(value)
+        if not valid.any():
+            return
+        if self.mean.ndim == 0:
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (value - self.mean)
+            self.min = np.minimum(self.min, value)
+            self.max = np.maximum(self.max, value)
+            return
+        
+        self.count[valid] += 1
+        delta = value[valid] - self.mean[valid]
+        self.mean[valid] += delta / self.count[valid]
+        self.m2[valid] += delta * (value[valid] - self.mean[valid])
+        self.min[valid] = np.minimum(self.min[valid], value[valid])
+        self.max[valid] = np.maximum(self.max[valid], value[valid])
+    
+    def update_batch(self, values) -> None:
+        """
+        Add many observations at once.
+        
+        The batch is summarized with NumPy and folded in with merge, which
+        is the exact pairwise form of the Welford update.
+        
+        Args:
+            values: Array of shape (n, *shape); NaN entries are skipped
+        """
+        values = np.asarray(values, dtype=float)
+        valid = ~np.isnan(values)
+        batch = RunningStats(self.mean.shape)
+        batch.count = valid.sum(axis=0)
+        if not batch.count.any():
+            return
+        safe = np.maximum(batch.count, 1)
+        batch.mean = np.where(valid, values, 0).sum(axis=0) / safe
+        batch.m2 = np.where(valid, (values - batch.mean) ** 2, 0).sum(axis=0)
+        batch.min = np.where(valid, values, np.inf).min(axis=0)
+        batch.max = np.where(valid, values, -np.inf).max(axis=0)
+        self.merge(batch)
+    
+    def merge(self, other: 'RunningStats') -> 'RunningStats':
+        """
+        Fold another accumulator into this one (Chan et al. pairwise update).
+        
+        Args:
+            other: Accumulator of the same shape
+            
+        Returns:
+            RunningStats: self
+        """
+        count = self.count + other.count
+        safe = np.maximum(count, 1)
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * other.count / safe
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / safe
+        self.count = count
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        return self
+    
+    def to_arrays(self, prefix: str = '') -> Dict[str, np.ndarray]:
+        """
+        Export the state as named arrays (e.g. for np.savez).
+        
+        Args:
+            prefix: Prefix for the array names
+            
+        Returns:
+            Dict of arrays that from_arrays restores exactly
+        """
+        return {f"{prefix}{name}": np.asarray(getattr(self, name))
+                for name in ('count', 'mean', 'm2', 'min', 'max')}
+    
+    @classmethod
+    def from_arrays(cls, arrays, prefix: str = '') -> 'RunningStats':
+        """Restore an accumulator exported with to_arrays."""
+        stats = cls(np.shape(arrays[f"{prefix}count"]))
+        for name in ('count', 'mean', 'm2', 'min', 'max'):
+            setattr(stats, name, np.array(arrays[f"{prefix}{name}"]))
+        return stats
+    
+    @property
+    def variance(self) -> np.ndarray:
+        """Population variance (ddof=0, as np.var)."""
+        return np.where(self.count > 0, self.m2 / np.maximum(self.count, 1), np.nan)
+    
+    @property
+    def std(self) -> np.ndarray:
+        """Population standard deviation (ddof=0, as np.std)."""
+        return np.sqrt(self.variance)
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with bounded relative error.
+    
+    Values are counted in logarithmically spaced buckets (as in DDSketch),
+    so any quantile is returned within relative_accuracy of the true value
+    using memory proportional to the log of the value range, independent
+    of the number of observations.
+    """
+    
+    def __init__(self, relative_accuracy: float = 0.001):
+        """
+        Initialize an empty sketch.
+        
+        Args:
+            relative_accuracy: Maximum relative error of returned quantiles
+        """
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+    
+    def _bucket(self, magnitude: float) -> int:
+        return math.ceil(math.log(magnitude) / self._log_gamma)
+    
+    def _value(self, bucket: int) -> float:
+        return 2 * self.gamma ** bucket / (self.gamma + 1)
+    
+    def update(self, value: float) -> None:
+        """Add one observation (NaN is skipped)."""
+        value = float(value)
+        if math.isnan(value):
+            return
+        self.count += 1
+        if value > 0:
+            bucket = self._bucket(value)
+            self.positive[bucket] = self.positive.get(bucket, 0) + 1
+        elif value < 0:
+            bucket = self._bucket(-value)
+            self.negative[bucket] = self.negative.get(bucket, 0) + 1
+        else:
+            self.zero_count += 1
+    
+    def update_batch(self, values) -> None:
+        """Add many observations at once (NaN entries are skipped)."""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        self.zero_count += int(np.count_nonzero(values == 0))
+        for store, magnitudes in ((self.positive, values[values > 0]),
+                                  (self.negative, -values[values < 0])):
+            if not len(magnitudes):
+                continue
+            buckets = np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+            for bucket, n in zip(*np.unique(buckets, return_counts=True)):
+                store[int(bucket)] = store.get(int(bucket), 0) + int(n)
+    
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """
+        Fold another sketch with the same accuracy into this one.
+        
+        Returns:
+            QuantileSketch: self
+        """
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for bucket, n in other.positive.items():
+            self.positive[bucket] = self.positive.get(bucket, 0) + n
+        for bucket, n in other.negative.items():
+            self.negative[bucket] = self.negative.get(bucket, 0) + n
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+    
+    def to_arrays(self, prefix: str = '') -> Dict[str, np.ndarray]:
+        """
+        Export the state as named arrays (e.g. for np.savez).
+        
+        Args:
+            prefix: Prefix for the array names
+            
+        Returns:
+            Dict of arrays that from_arrays restores exactly
+        """
+        return {
+            f"{prefix}relative_accuracy": np.asarray(self.relative_accuracy),
+            f"{prefix}positive_buckets": np.fromiter(self.positive.keys(), np.int64, len(self.positive)),
+            f"{prefix}positive_counts": np.fromiter(self.positive.values(), np.int64, len(self.positive)),
+            f"{prefix}negative_buckets": np.fromiter(self.negative.keys(), np.int64, len(self.negative)),
+            f"{prefix}negative_counts": np.fromiter(self.negative.values(), np.int64, len(self.negative)),
+            f"{prefix}zero_count": np.asarray(self.zero_count),
+            f"{prefix}count": np.asarray(self.count),
+        }
+    
+    @classmethod
+    def from_arrays(cls, arrays, prefix: str = '') -> 'QuantileSketch':
+        """Restore a sketch exported with to_arrays."""
+        sketch = cls(float(arrays[f"{prefix}relative_accuracy"]))
+        for sign in ('positive', 'negative'):
+            buckets = arrays[f"{prefix}{sign}_buckets"].tolist()
+            counts = arrays[f"{prefix}{sign}_counts"].tolist()
+            setattr(sketch, sign, dict(zip(buckets, counts)))
+        sketch.zero_count = int(arrays[f"{prefix}zero_count"])
+        sketch.count = int(arrays[f"{prefix}count"])
+        return sketch
+    
+    def quantile(self, q: float) -> float:
+        """
+        Estimate the q-quantile (0 <= q <= 1).
+        
+        Returns:
+            float: Estimated quantile, or NaN for an empty sketch
+        """
+        if not self.count:
+            return float('nan')
+        rank = q * (self.count - 1)
+        
+        seen = 0
+        for bucket in sorted(self.negative, reverse=True):
+            seen += self.negative[bucket]
+            if seen > rank:
+                return -self._value(bucket)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for bucket in sorted(self.positive):
+            seen += self.positive[bucket]
+            if seen > rank:
+                return self._value(bucket)
+        return self._value(max(self.positive))
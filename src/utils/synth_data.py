@@ -0,0 +1,402 @@
+"""
+Vectorized synthetic flight pricing datasets for scale testing.
+"""
+
+import os
+import shutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from .data_loader import CACHE_COLUMNS, FlightDataLoader
+from .files import unique_sibling
+
+
+CSV_HEADER = 'Flight ID,Days Before Departure,Class,Price,Demand\n'
+
+
+@dataclass
+class CabinProfile:
+    """Demand curve and price history parameters of one cabin class."""
+    base_demand: float        # Mean daily demand far from departure
+    base_price: float         # Typical historical price
+    min_price: float          # Historical prices are clipped to
+    max_price: float          # [min_price, max_price]
+    booking_scale: float      # Days over which the late-booking surge builds
+    late_surge: float         # Extra demand on the last day, relative to base
+    demand_noise: float       # Lognormal sigma of daily demand
+    price_noise: float        # Lognormal sigma of daily price
+    price_response: float     # Elasticity of the historical price to demand
+    late_markup: float        # Price markup on the last day
+
+
+DEFAULT_PROFILES: Dict[str, CabinProfile] = {
+    'Business': CabinProfile(base_demand=25.0, base_price=950.0, min_price=800.0, max_price=1200.0,
+                             booking_scale=7.0, late_surge=0.6, demand_noise=0.15,
+                             price_noise=0.04, price_response=0.3, late_markup=0.15),
+    'Economy': CabinProfile(base_demand=130.0, base_price=280.0, min_price=200.0, max_price=400.0,
+                            booking_scale=14.0, late_surge=0.4, demand_noise=0.2,
+                            price_noise=0.05, price_response=0.4, late_markup=0.25),
+}
+
+
+@dataclass
+class Seasonality:
+    """Flight-level demand multipliers shared by every cabin of a flight."""
+    annual_amplitude: float = 0.2   # Peak-to-mean swing over the year
+    peak_day: int = 196             # Day of year with the highest demand
+    # Multipliers for departures on each weekday, Monday first
+    weekly: Tuple[float, ...] = (0.95, 0.85, 0.85, 0.95, 1.15, 1.05, 1.2)
+    popularity_sigma: float = 0.2   # Lognormal spread of route popularity
+
+
+@dataclass
+class SyntheticDataset:
+    """
+    Generator for Flight ID x Days Before Departure x Class tables.
+    
+    Each flight gets a departure day of the year and a popularity, which
+    scale the demand of all its cabins by the annual and weekly season.
+    Within a cabin, demand follows a booking curve that surges towards
+    departure, with lognormal day-to-day noise. The price history follows
+    demand with the cabin's price_response elasticity, adds a late-booking
+    markup and is clipped to the cabin's price range. Prices and demand
+    are rounded to cents.
+    
+    Flights are generated in chunks of chunk_flights, each from its own
+    seeded stream, so the output depends on (seed, chunk_flights) but not
+    on how many worker processes write it.
+    """
+    n_flights: int
+    n_days: int = 30
+    seed: int = 0
+    profiles: Mapping[str, CabinProfile] = field(default_factory=lambda: dict(DEFAULT_PROFILES))
+    seasonality: Seasonality = field(default_factory=Seasonality)
+    chunk_flights: int = 20000
+    
+    @property
+    def n_chunks(self) -> int:
+        return -(-self.n_flights // self.chunk_flights)
+    
+    @property
+    def n_rows(self) -> int:
+        return self.n_flights * self.n_days * len(self.profiles)
+    
+    def chunk_flight_range(self, chunk: int) -> Tuple[int, int]:
+        """First and one-past-last zero-based flight index of a chunk."""
+        start = chunk * self.chunk_flights
+        return start, min(start + self.chunk_flights, self.n_flights)
+    
+    def generate_chunk(self, chunk: int) -> Dict[str, np.ndarray]:
+        """
+        Generate one chunk of flights.
+        
+        Args:
+            chunk: Chunk index (0 .. n_chunks - 1)
+        
+        Returns:
+            Dict of (n_flights_in_chunk, n_days, n_classes) arrays:
+            'flight_id', 'days_before', 'class_code' (index into profiles),
+            'price' and 'demand'
+        """
+        rng = np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(chunk,)))
+        start, stop = self.chunk_flight_range(chunk)
+        n = stop - start
+        shape = (n, self.n_days, len(self.profiles))
+        season = self.seasonality
+        
+        # Flight-level factors, shape (n, 1, 1)
+        day_of_year = rng.integers(0, 365, n)
+        flight_factor = (1 + season.annual_amplitude * np.cos(2 * np.pi * (day_of_year - season.peak_day) / 365))
+        flight_factor *= np.asarray(season.weekly)[day_of_year % 7]
+        sigma = season.popularity_sigma
+        flight_factor *= rng.lognormal(-sigma ** 2 / 2, sigma, n)
+        flight_factor = flight_factor[:, None, None]
+        
+        # Per-cabin parameters, shape (1, 1, n_classes)
+        profiles = list(self.profiles.values())
+        
+        def param(name):
+            return np.array([getattr(p, name) for p in profiles])[None, None, :]
+        
+        days = np.arange(1, self.n_days + 1, dtype=float)[None, :, None]
+        late = np.exp(-(days - 1) / param('booking_scale'))
+        
+        base_demand = param('base_demand') * flight_factor
+        noise = param('demand_noise')
+        demand = base_demand * (1 + param('late_surge') * late)
+        demand *= np.exp(rng.standard_normal(shape) * noise - noise ** 2 / 2)
+        
+        noise = param('price_noise')
+        price = param('base_price') * (demand / base_demand) ** param('price_response')
+        price *= 1 + param('late_markup') * late
+        price *= np.exp(rng.standard_normal(shape) * noise - noise ** 2 / 2)
+        price = np.clip(price, param('min_price'), param('max_price'))
+        
+        return {
+            'flight_id': np.broadcast_to(np.arange(start + 1, stop + 1)[:, None, None], shape),
+            'days_before': np.broadcast_to(np.arange(1, self.n_days + 1)[None, :, None], shape),
+            'class_code': np.broadcast_to(np.arange(len(profiles))[None, None, :], shape),
+            # Cents, rounded so that parsing the CSV text gives these exact doubles
+            'price': np.rint(price * 100) / 100,
+            'demand': np.rint(demand * 100) / 100,
+        }
+    
+    def iter_chunks(self, workers: int = 1) -> Iterator[Tuple[int, Dict[str, np.ndarray], bytes]]:
+        """
+        Yield (chunk, arrays, CSV rows) in chunk order.
+        
+        Args:
+            workers: Processes generating chunks ahead of the consumer
+        """
+        if workers <= 1:
+            for chunk in range(self.n_chunks):
+                arrays = self.generate_chunk(chunk)
+                yield chunk, arrays, format_csv_rows(arrays, list(self.profiles))
+            return
+        
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Keep a bounded window of chunks in flight so memory stays flat
+            pending = deque()
+            next_chunk = 0
+            while pending or next_chunk < self.n_chunks:
+                while next_chunk < self.n_chunks and len(pending) < 2 * workers:
+                    pending.append((next_chunk, pool.submit(_generate_formatted, self, next_chunk)))
+                    next_chunk += 1
+                chunk, future = pending.popleft()
+                arrays, rows = future.result()
+                yield chunk, arrays, rows
+    
+    def write(self,
+              path: str,
+              columnar: bool = True,
+              workers: int = 1) -> Path:
+        """
+        Write the dataset as CSV and, optionally, in the loader's columnar format.
+        
+        The columnar output is the FlightDataLoader cache entry of every
+        class ('<path>.cache/<Class>/'), written chunk by chunk into
+        memory-mapped .npy files in a directory private to this writer. It
+        is published after the CSV is closed, so the loader accepts it
+        without ever parsing the CSV.
+        
+        Args:
+            path: Output CSV path
+            columnar: Also write the columnar cache
+            workers: Processes generating and formatting chunks
+        
+        Returns:
+            Path: The written CSV
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        writer = _ColumnarWriter(path, list(self.profiles), self.n_flights, self.n_days) if columnar else None
+        
+        tmp_path = unique_sibling(path)
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(CSV_HEADER.encode())
+                for chunk, arrays, rows in self.iter_chunks(workers):
+                    f.write(rows)
+                    if writer is not None:
+                        writer.write(self.chunk_flight_range(chunk), arrays)
+            os.replace(tmp_path, path)
+            if writer is not None:
+                writer.finish()
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            if writer is not None:
+                writer.discard()
+        return path
+
+
+def _generate_formatted(dataset: SyntheticDataset, chunk: int) -> Tuple[Dict[str, np.ndarray], bytes]:
+    """Process pool task: one chunk's arrays and CSV rows."""
+    arrays = dataset.generate_chunk(chunk)
+    return arrays, format_csv_rows(arrays, list(dataset.profiles))
+
+
+def generate_dataset(path: str,
+                     n_flights: int,
+                     n_days: int = 30,
+                     seed: int = 0,
+                     columnar: bool = True,
+                     workers: int = 1,
+                     **kwargs) -> Path:
+    """
+    Write a CSV with the same layout as large_airline_pricing_simulation.csv.
+    
+    Every flight has one row per class per day before departure (1 ..
+    n_days), so the file has n_flights * n_days * n_classes rows.
+    
+    Args:
+        path: Output CSV path
+        n_flights: Number of flights
+        n_days: Days before departure per flight
+        seed: Random seed
+        columnar: Also write the loader's columnar cache
+        workers: Processes generating and formatting chunks
+        **kwargs: Further SyntheticDataset fields (profiles, seasonality,
+            chunk_flights)
+    
+    Returns:
+        Path: The written file
+    """
+    dataset = SyntheticDataset(n_flights, n_days, seed, **kwargs)
+    return dataset.write(path, columnar=columnar, workers=workers)
+
+
+class _ColumnarWriter:
+    """Streams chunks into a FlightDataLoader cache entry per class."""
+    
+    def __init__(self, csv_path: Path, class_names: Sequence[str], n_flights: int, n_days: int):
+        self.loader = FlightDataLoader(csv_path, use_cache=True)
+        self.class_names = list(class_names)
+        self.n_flights = n_flights
+        self.n_days = n_days
+        
+        n_rows = n_flights * n_days
+        self.entries: Dict[str, Path] = {}
+        self.files: Dict[str, Dict[str, np.ndarray]] = {}
+        for class_type in self.class_names:
+            entry_dir = self.loader._new_cache_entry(class_type)
+            self.entries[class_type] = entry_dir
+            
+            specs = {
+                'flight_id': (np.int64, (n_rows,)),
+                'days_before': (np.int64, (n_rows,)),
+                'demand': (np.float64, (n_rows,)),
+                'price': (np.float64, (n_rows,)),
+                'flight_ids': (np.int64, (n_flights,)),
+                'demand_table': (np.float64, (n_flights, n_days + 1)),
+                'price_table': (np.float64, (n_flights, n_days + 1)),
+            }
+            self.files[class_type] = {}
+            for name, (dtype, shape) in specs.items():
+                self.files[class_type][name] = np.lib.format.open_memmap(
+                    entry_dir / f"{name}.npy", mode='w+', dtype=dtype, shape=shape)
+            
+            files = self.files[class_type]
+            files['flight_ids'][:] = np.arange(1, n_flights + 1)
+            # No records for 0 days before departure
+            files['demand_table'][:, 0] = np.nan
+            files['price_table'][:, 0] = np.nan
+    
+    def write(self, flight_range: Tuple[int, int], arrays: Dict[str, np.ndarray]) -> None:
+        """Store one chunk, given its zero-based [start, stop) flight range."""
+        start, stop = flight_range
+        rows = slice(start * self.n_days, stop * self.n_days)
+        for code, class_type in enumerate(self.class_names):
+            files = self.files[class_type]
+            for name in CACHE_COLUMNS:
+                files[name][rows] = arrays[name][:, :, code].reshape(-1)
+            files['demand_table'][start:stop, 1:] = arrays['demand'][:, :, code]
+            files['price_table'][start:stop, 1:] = arrays['price'][:, :, code]
+    
+    def finish(self) -> None:
+        """Flush the arrays, then publish each class's entry."""
+        for files in self.files.values():
+            for array in files.values():
+                array.flush()
+        # Drop the memory maps before publishing
+        self.files = {}
+        
+        entries, self.entries = self.entries, {}
+        for class_type, entry_dir in entries.items():
+            self.loader._publish_cache_entry(entry_dir, class_type, False, self.n_days)
+    
+    def discard(self) -> None:
+        """Remove entries that were never published (after a failure)."""
+        self.files = {}
+        for entry_dir in self.entries.values():
+            shutil.rmtree(entry_dir, ignore_errors=True)
+        self.entries = {}
+
+
+def format_csv_rows(arrays: Mapping[str, np.ndarray], class_names: Sequence[str]) -> bytes:
+    """
+    Format generated rows as CSV text without a per-row Python loop.
+    
+    Every field is rendered right-aligned into fixed-width columns of one
+    (n_rows, line_width) byte matrix, alongside a mask of the bytes in
+    use; the masked bytes, read row by row, are the CSV text.
+    
+    Args:
+        arrays: Output of SyntheticDataset.generate_chunk
+        class_names: Class label for each class_code
+    
+    Returns:
+        bytes: The rows, without a header
+    """
+    flight_id = arrays['flight_id'].reshape(-1)
+    days_before = arrays['days_before'].reshape(-1)
+    price = np.rint(arrays['price'].reshape(-1) * 100).astype(np.int64)
+    demand = np.rint(arrays['demand'].reshape(-1) * 100).astype(np.int64)
+    codes = arrays['class_code'].reshape(-1)
+    
+    # Field widths, each followed by one separator byte
+    widths = [_digit_count(flight_id), _digit_count(days_before),
+              max(len(label) for label in class_names),
+              max(_digit_count(price), 3) + 1, max(_digit_count(demand), 3) + 1]
+    n = len(flight_id)
+    text = np.empty((n, sum(widths) + len(widths)), dtype=np.uint8)
+    used = np.ones(text.shape, dtype=bool)
+    
+    column = 0
+    for index, width in enumerate(widths):
+        block = slice(column, column + width)
+        if index == 2:
+            _put_labels(codes, class_names, text[:, block], used[:, block])
+        elif index < 2:
+            _put_digits((flight_id, days_before)[index], text[:, block], used[:, block])
+        else:
+            _put_cents((price, demand)[index - 3], text[:, block], used[:, block])
+        column += width
+        text[:, column] = ord(',')
+        column += 1
+    text[:, -1] = ord('\n')
+    return text[used].tobytes()
+
+
+def _digit_count(values: np.ndarray) -> int:
+    """Digits in the largest of some non-negative integers."""
+    return len(str(int(values.max(initial=0))))
+
+
+def _put_digits(values: np.ndarray, text: np.ndarray, used: np.ndarray) -> None:
+    """Write non-negative integers right-aligned, masking leading zeros."""
+    top = int(values.max(initial=0))
+    # 32-bit division is about twice as fast where the values fit
+    remaining = values.astype(np.int32 if top < 2**31 else np.int64)
+    for position in range(text.shape[1] - 1, -1, -1):
+        used[:, position] = remaining > 0
+        remaining, digit = np.divmod(remaining, 10)
+        text[:, position] = digit
+    text += ord('0')
+    used[:, -1] = True
+
+
+def _put_cents(cents: np.ndarray, text: np.ndarray, used: np.ndarray) -> None:
+    """Write amounts given in cents with two decimals, as '%.2f' prints them."""
+    _put_digits(cents // 100, text[:, :-3], used[:, :-3])
+    text[:, -3] = ord('.')
+    used[:, -3] = True
+    _put_digits(cents % 100, text[:, -2:], used[:, -2:])
+    used[:, -2:] = True
+
+
+def _put_labels(codes: np.ndarray, labels: Sequence[str], text: np.ndarray, used: np.ndarray) -> None:
+    """Write the label of each code, left-aligned."""
+    width = text.shape[1]
+    table = np.zeros((len(labels), width), dtype=np.uint8)
+    mask = np.zeros((len(labels), width), dtype=bool)
+    for code, label in enumerate(labels):
+        table[code, :len(label)] = np.frombuffer(label.encode(), dtype=np.uint8)
+        mask[code, :len(label)] = True
+    text[...] = table[codes]
+    used[...] = mask[codes]
@@ -0,0 +1,153 @@
+"""
+Localhost tests for the TCP coordinator/worker mode.
+"""
+
+import socket
+import threading
+
+import numpy as np
+import pytest
+
+from src.simulation import distributed
+from src.simulation.distributed import (SimulationCoordinator, SimulationWorker, recv_message,
+                                        run_local, send_message)
+from src.simulation.simulator import FlightSimulator
+from src.utils.events import EventSink, TRACE_OFF
+from src.utils.synth_data import generate_dataset
+
+
+N_FLIGHTS = 24
+
+
+@pytest.fixture(scope='module')
+def data_path(tmp_path_factory):
+    return str(generate_dataset(tmp_path_factory.mktemp('data') / 'flights.csv', N_FLIGHTS, n_days=10))
+
+
+@pytest.fixture(scope='module')
+def serial(data_path):
+    """Flight IDs and their revenue from a plain serial run."""
+    simulator = FlightSimulator(data_path=data_path, events=EventSink(TRACE_OFF))
+    simulator.data_loader.load_data()
+    flight_ids = sorted(int(fid) for fid in simulator.data_loader.available_flight_ids)
+    return flight_ids, np.array([simulator.run_simulation(fid).total_revenue for fid in flight_ids])
+
+
+class FakeWorker:
+    """Speaks the protocol by hand: takes one unit and then misbehaves."""
+    
+    def __init__(self, address):
+        self.sock = socket.create_connection(address)
+        self.rfile = self.sock.makefile('rb')
+        send_message(self.sock, {'type': 'hello', 'name': 'fake'})
+        recv_message(self.rfile)
+        self.unit, _ = recv_message(self.rfile)
+    
+    def close(self):
+        self.rfile.close()
+        self.sock.close()
+
+
+def _start_worker(coordinator, data_path):
+    thread = threading.Thread(target=SimulationWorker(coordinator.address, data_path).run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_run_local_matches_serial(data_path, serial):
+    flight_ids, revenue = serial
+    fleet = run_local(flight_ids, data_path, n_workers=3, unit_size=5, timeout=60,
+                      events=EventSink(TRACE_OFF))
+    assert fleet.flight_ids.tolist() == flight_ids
+    np.testing.assert_array_equal(fleet.total_revenue, revenue)
+
+
+def test_disconnected_worker_unit_is_requeued(data_path, serial):
+    flight_ids, revenue = serial
+    coordinator = SimulationCoordinator(flight_ids, data_path, unit_size=5, steal_after=60,
+                                        events=EventSink(TRACE_OFF))
+    coordinator.start()
+    fake = FakeWorker(coordinator.address)
+    fake.close()
+    
+    _start_worker(coordinator, data_path)
+    fleet = coordinator.run(timeout=60)
+    assert coordinator.stats['requeued'] == 1
+    np.testing.assert_array_equal(fleet.total_revenue, revenue)
+
+
+def test_idle_worker_steals_stalled_unit(data_path, serial):
+    flight_ids, revenue = serial
+    coordinator = SimulationCoordinator(flight_ids, data_path, unit_size=5, steal_after=0.1,
+                                        events=EventSink(TRACE_OFF))
+    coordinator.start()
+    # Holds its unit without ever answering
+    fake = FakeWorker(coordinator.address)
+    try:
+        _start_worker(coordinator, data_path)
+        fleet = coordinator.run(timeout=60)
+    finally:
+        fake.close()
+    assert coordinator.stats['stolen'] >= 1
+    assert coordinator.stats['requeued'] == 0
+    np.testing.assert_array_equal(fleet.total_revenue, revenue)
+
+
+def test_result_for_wrong_unit_is_rejected(data_path, serial):
+    flight_ids, revenue = serial
+    coordinator = SimulationCoordinator(flight_ids, data_path, unit_size=5, steal_after=60,
+                                        events=EventSink(TRACE_OFF))
+    coordinator.start()
+    fake = FakeWorker(coordinator.address)
+    # Answer with another unit's number and bogus results
+    send_message(fake.sock, {'type': 'result', 'unit': fake.unit['unit'] + 1},
+                 {'flight_ids': np.asarray(fake.unit['flight_ids']),
+                  'total_revenue': np.zeros(len(fake.unit['flight_ids']))})
+    
+    _start_worker(coordinator, data_path)
+    fleet = coordinator.run(timeout=60)
+    fake.close()
+    assert coordinator.stats['requeued'] == 1
+    np.testing.assert_array_equal(fleet.total_revenue, revenue)
+
+
+def _failing_units(monkeypatch, bad_flight, failures):
+    """Make simulate_unit raise for units holding bad_flight, at most failures times."""
+    real = distributed.simulate_unit
+    calls = []
+    
+    def simulate_unit(simulator, flight_ids):
+        if bad_flight in flight_ids and len(calls) < failures:
+            calls.append(bad_flight)
+            raise RuntimeError(f"cannot simulate flight {bad_flight}")
+        return real(simulator, flight_ids)
+    
+    monkeypatch.setattr(distributed, 'simulate_unit', simulate_unit)
+
+
+def test_failed_unit_is_retried(data_path, serial, monkeypatch):
+    flight_ids, revenue = serial
+    _failing_units(monkeypatch, flight_ids[7], failures=1)
+    coordinator = SimulationCoordinator(flight_ids, data_path, unit_size=5, steal_after=60,
+                                        events=EventSink(TRACE_OFF))
+    coordinator.start()
+    _start_worker(coordinator, data_path)
+    fleet = coordinator.run(timeout=60)
+    assert coordinator.stats['failures'] == coordinator.stats['requeued'] == 1
+    np.testing.assert_array_equal(fleet.total_revenue, revenue)
+
+
+def test_unit_failing_every_attempt_fails_the_run(data_path, serial, monkeypatch):
+    flight_ids, _ = serial
+    _failing_units(monkeypatch, flight_ids[7], failures=10)
+    coordinator = SimulationCoordinator(flight_ids, data_path, unit_size=5, steal_after=60,
+                                        max_attempts=3, events=EventSink(TRACE_OFF))
+    coordinator.start()
+    workers = [_start_worker(coordinator, data_path) for _ in range(2)]
+    with pytest.raises(RuntimeError, match=f"failed 3 times.*cannot simulate flight {flight_ids[7]}"):
+        coordinator.run(timeout=60)
+    assert coordinator.stats['failures'] == 3
+    # Workers are told to stop rather than left waiting
+    for worker in workers:
+        worker.join(timeout=10)
+        assert not worker.is_alive()
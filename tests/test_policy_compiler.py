@@ -0,0 +1,40 @@
+"""
+CompiledPolicy stands in for a pricing model and round-trips through save/load.
+"""
+
+import numpy as np
+
+from src.models.pricing_model import BusinessClassPricingModel
+from src.simulation.batch_simulator import simulate_paths
+from src.simulation.policy_compiler import CompiledPolicy, compile_policy
+from src.simulation.simulator import FlightSimulator
+from src.utils.events import EventSink, TRACE_OFF
+from src.utils.synth_data import generate_dataset
+
+
+def test_compiled_policy_runs_in_simulators(tmp_path):
+    model = BusinessClassPricingModel()
+    compiled = compile_policy('business_class', demand_step=0.05, n_check=0)
+    
+    paths = np.random.default_rng(0).uniform(10, 50, (64, 30))
+    compiled_run = simulate_paths(paths, 50, compiled)
+    model_run = simulate_paths(paths, 50, model)
+    np.testing.assert_allclose(compiled_run['total_revenue'], model_run['total_revenue'], rtol=1e-2)
+    
+    data_path = generate_dataset(tmp_path / 'flights.csv', 4, n_days=10)
+    simulator = FlightSimulator(data_path=str(data_path), pricing_model=compiled, events=EventSink(TRACE_OFF))
+    simulator.data_loader.load_data()
+    flight_id = int(simulator.data_loader.available_flight_ids[0])
+    assert simulator.run_simulation(flight_id).total_revenue > 0
+
+
+def test_save_load_keeps_dotted_names(tmp_path):
+    compiled = compile_policy('pricing_function', max_days=5, max_seats=10, n_check=1000)
+    path = tmp_path / 'run.v2'
+    compiled.save(path)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['run.v2.json', 'run.v2.npy']
+    
+    loaded = CompiledPolicy.load(path)
+    np.testing.assert_array_equal(loaded.table, compiled.table)
+    assert loaded.error == compiled.error
+    assert loaded.calculate_price(3, 4.5, 31.25) == compiled.calculate_price(3, 4.5, 31.25)
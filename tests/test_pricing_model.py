@@ -0,0 +1,52 @@
+"""
+Batch pricing APIs agree with the scalar ones for scalar, 1-d and broadcast inputs.
+"""
+
+import numpy as np
+import pytest
+
+from pricing_function import (calculate_expected_revenue, calculate_expected_revenue_batch,
+                              pricing_function, pricing_function_batch)
+from src.models.pricing_model import BusinessClassPricingModel
+
+
+MODEL = BusinessClassPricingModel()
+
+QUOTES = [
+    # Scalars
+    (5, 10, 30.0),
+    (0, 0, 45.0),
+    # 1-d arrays
+    (np.arange(8.0), np.linspace(0, 50, 8), np.linspace(10, 45, 8)),
+    # Broadcast: column of days against a row of seats and a scalar demand
+    (np.arange(0, 31, 5.0)[:, None], np.array([0.5, 10, 25, 50]), 32.5),
+]
+
+
+@pytest.mark.parametrize('days_left, tickets_left, demand_level', QUOTES)
+@pytest.mark.parametrize('batch, scalar', [
+    (MODEL.calculate_prices, MODEL.calculate_price),
+    (pricing_function_batch, pricing_function),
+])
+def test_prices_match_scalar(batch, scalar, days_left, tickets_left, demand_level):
+    prices = batch(days_left, tickets_left, demand_level)
+    expected = np.vectorize(scalar, otypes=[float])(days_left, tickets_left, demand_level)
+    assert prices.shape == expected.shape
+    np.testing.assert_array_equal(prices, expected)
+
+
+@pytest.mark.parametrize('price, demand_level, tickets_left', [
+    (1000.0, 30.0, 10),
+    (np.array([800.0, 900, 1200]), np.array([20.0, 35, 50]), np.array([5, 50, 0])),
+    (np.array([[800.0], [1100]]), np.array([20.0, 35, 50]), 12.5),
+])
+def test_revenues_match_scalar(price, demand_level, tickets_left):
+    revenue, quantity = MODEL.calculate_revenues(price, demand_level, tickets_left)
+    expected = np.vectorize(MODEL.calculate_revenue, otypes=[float, float])(price, demand_level, tickets_left)
+    assert revenue.shape == expected[0].shape
+    np.testing.assert_array_equal(revenue, expected[0])
+    np.testing.assert_array_equal(quantity, expected[1])
+    
+    expected_revenue = np.vectorize(calculate_expected_revenue, otypes=[float])(price, demand_level, tickets_left)
+    np.testing.assert_array_equal(calculate_expected_revenue_batch(price, demand_level, tickets_left),
+                                  expected_revenue)
@@ -0,0 +1,155 @@
+"""
+Localhost tests for the asyncio pricing service.
+"""
+
+import asyncio
+import json
+
+from src.models.pricing_model import BusinessClassPricingModel
+from src.service.pricing_server import PricingService, request_quote
+
+
+async def _request(port, method, path, body=b''):
+    """Send one raw HTTP request and return (status code, decoded body)."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return status, json.loads(await reader.readexactly(int(headers['content-length'])))
+    finally:
+        writer.close()
+
+
+def _run(test, **kwargs):
+    """Run test(service) against a service started on a free localhost port."""
+    async def main():
+        service = PricingService(**kwargs)
+        await service.start('127.0.0.1', 0)
+        try:
+            return await test(service)
+        finally:
+            await service.stop()
+    return asyncio.run(main())
+
+
+def test_quote_matches_model():
+    model = BusinessClassPricingModel()
+    quotes = [(10, 20, 32.5), (2, 0.9, 40.0), (25, 49.5, 18.25), (5, 0, 30.0)]
+    
+    async def test(service):
+        for days_left, tickets_left, demand_level in quotes:
+            response = await request_quote('127.0.0.1', service.port, {
+                'days_left': days_left, 'tickets_left': tickets_left, 'demand_level': demand_level})
+            assert response['price'] == model.calculate_price(days_left, tickets_left, demand_level)
+    
+    _run(test)
+
+
+def test_concurrent_quotes_are_micro_batched_and_cached():
+    async def test(service):
+        payloads = [{'days_left': i % 30, 'tickets_left': 10 + i % 7, 'demand_level': 20 + i % 11}
+                    for i in range(200)]
+        first = await asyncio.gather(*(request_quote('127.0.0.1', service.port, p) for p in payloads))
+        assert 0 < service.batches < len(payloads)
+        
+        misses = service.cache_misses
+        second = await asyncio.gather(*(request_quote('127.0.0.1', service.port, p) for p in payloads))
+        assert second == first
+        assert service.cache_misses == misses
+        
+        status, stats = await _request(service.port, 'GET', '/stats')
+        assert status == 200
+        assert stats['requests'] == stats['quotes'] == 2 * len(payloads)
+        assert stats['cache_hits'] + stats['cache_misses'] == stats['quotes']
+        assert stats['cache_hits'] >= len(payloads)
+        assert stats['batches'] == service.batches
+        assert stats['latency_p99_ms'] >= stats['latency_p50_ms'] > 0
+    
+    _run(test)
+
+
+def test_cancelled_caller_does_not_break_batcher():
+    async def test(service):
+        # A caller that gives up leaves its quote in the pending batch
+        try:
+            await asyncio.wait_for(service.price(10, 20, 30), timeout=0.001)
+        except asyncio.TimeoutError:
+            pass
+        
+        # Coalesced callers still get the shared result if one cancels
+        waiting = [asyncio.ensure_future(service.price(12, 20, 30)) for _ in range(3)]
+        await asyncio.sleep(0)
+        waiting[0].cancel()
+        prices = await asyncio.gather(*waiting[1:])
+        assert prices[0] == prices[1] == BusinessClassPricingModel().calculate_price(12, 20, 30)
+        
+        response = await request_quote('127.0.0.1', service.port,
+                                       {'days_left': 10, 'tickets_left': 20, 'demand_level': 30})
+        assert response['price'] == BusinessClassPricingModel().calculate_price(10, 20, 30)
+    
+    _run(test, max_batch_delay=0.05)
+
+
+def test_bad_input_returns_400():
+    async def test(service):
+        bodies = [b'{"days_left": 1, "tickets_left": 2}',
+                  b'{"days_left": 1, "tickets_left": 2, "demand_level": 1e999}',
+                  b'{"days_left": 1, "tickets_left": "many", "demand_level": 30}',
+                  b'not json']
+        for body in bodies:
+            status, payload = await _request(service.port, 'POST', '/quote', body)
+            assert status == 400
+            assert 'error' in payload
+        
+        status, _ = await _request(service.port, 'GET', '/missing')
+        assert status == 404
+        response = await request_quote('127.0.0.1', service.port,
+                                       {'days_left': 1, 'tickets_left': 2, 'demand_level': 30})
+        assert response['price'] > 0
+    
+    _run(test)
+
+
+def test_malformed_request_returns_400():
+    async def send(port, raw):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            writer.write(raw)
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            # The connection is closed after the response
+            await asyncio.wait_for(reader.read(), timeout=5)
+            return status
+        finally:
+            writer.close()
+    
+    async def test(service):
+        requests = [b'GARBAGE\r\n\r\n',
+                    b'POST /quote HTTP/1.1\r\nContent-Length: lots\r\n\r\n',
+                    b'POST /quote HTTP/1.1\r\nContent-Length: -5\r\n\r\n',
+                    b'POST /quote HTTP/1.1\r\nno colon here\r\n\r\n']
+        for raw in requests:
+            assert await send(service.port, raw) == 400
+        response = await request_quote('127.0.0.1', service.port,
+                                       {'days_left': 1, 'tickets_left': 2, 'demand_level': 30})
+        assert response['price'] > 0
+    
+    _run(test)
+
+
+def test_all_inputs_are_quantized():
+    service = PricingService(days_step=1.0, seat_step=0.5, demand_step=0.25)
+    assert service.quantize(9.6, 20.2, 32.4) == (10.0, 20.0, 32.5)
+    assert service.quantize(2, 0.9, 40) == (2.0, 1.0, 40.0)
+    # Seats for sale never round down to a sold-out quote
+    assert service.quantize(5, 0.1, 30) == (5.0, 0.5, 30.0)
+    assert service.quantize(5, 0, 30) == (5.0, 0.0, 30.0)
@@ -0,0 +1,31 @@
+"""
+SimulationResult compares like the results dict it replaces.
+"""
+
+import numpy as np
+
+from src.simulation.results import SimulationResult
+
+
+def _result(**overrides):
+    lists = dict(revenue=[1000.0, 0.0], prices=[1000.0, np.nan], demand=[30.0, np.nan],
+                 sales=[1.0, 0.0], total_revenue=1000.0, remaining_seats=49.0)
+    lists.update(overrides)
+    return SimulationResult.from_lists(**lists)
+
+
+def test_equal_results_compare_equal():
+    result = _result()
+    assert result == _result()
+    assert result == result.to_dict()
+    assert result.to_dict() == result
+    assert not result != _result()
+
+
+def test_different_results_compare_unequal():
+    result = _result()
+    assert result != _result(total_revenue=999.0)
+    assert result != _result(prices=[1100.0, np.nan])
+    assert result != _result(revenue=[1000.0], prices=[1000.0], demand=[30.0], sales=[1.0])
+    assert result != {'total_revenue': 1000.0}
+    assert result != 1000.0
@@ -0,0 +1,58 @@
+"""
+Shared-memory publishing of a loaded dataset to worker processes.
+"""
+
+import multiprocessing
+import os
+import subprocess
+import sys
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pytest
+
+from src.utils.data_loader import FlightDataLoader
+from src.utils.events import EventSink, TRACE_OFF
+from src.utils.shared_data import SEGMENT_PREFIX, SharedArrays, attach_loader, share_loader
+from src.utils.synth_data import generate_dataset
+
+
+@pytest.fixture(scope='module')
+def loader(tmp_path_factory):
+    path = generate_dataset(tmp_path_factory.mktemp('data') / 'flights.csv', 12, n_days=10)
+    loader = FlightDataLoader(str(path), events=EventSink(TRACE_OFF), use_cache=False)
+    assert loader.load_data()
+    return loader
+
+
+def _trajectory_demand(descriptor, flight_ids):
+    """Worker: sum the demand trajectories read through the shared arrays."""
+    loader = attach_loader(descriptor, events=EventSink(TRACE_OFF))
+    return float(np.nansum(loader.get_flight_trajectories(flight_ids)['demand']))
+
+
+def test_attached_loader_matches_owner(loader):
+    flight_ids = loader.available_flight_ids
+    expected = float(np.nansum(loader.get_flight_trajectories(flight_ids)['demand']))
+    with share_loader(loader) as shared:
+        local = attach_loader(shared.descriptor)
+        np.testing.assert_array_equal(local.get_flight_trajectory(flight_ids[3])['demand'],
+                                      loader.get_flight_trajectory(flight_ids[3])['demand'])
+        with multiprocessing.get_context('spawn').Pool(2) as pool:
+            totals = pool.starmap(_trajectory_demand, [(shared.descriptor, flight_ids)] * 2)
+    assert totals == [expected, expected]
+
+
+@pytest.mark.skipif(not os.path.isdir('/dev/shm'), reason='needs /dev/shm')
+def test_new_owner_removes_stale_segments():
+    # A pid that is certainly not running any more
+    dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+    dead.wait()
+    name = f"{SEGMENT_PREFIX}{dead.pid}_deadbeef_0"
+    segment = shared_memory.SharedMemory(name=name, create=True, size=16)
+    # Left behind as if by a killed owner, so not tracked by this process
+    resource_tracker.unregister('/' + segment.name, 'shared_memory')
+    segment.close()
+    
+    with SharedArrays({'x': np.arange(3)}):
+        assert not os.path.exists(f"/dev/shm/{name}")